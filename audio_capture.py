@@ -0,0 +1,276 @@
+"""
+One persistent microphone stream shared by everything that listens.
+
+AudioCaptureService opens the microphone once and runs every chunk through
+a ring buffer and the voice activity detector (see wake_word.py), whose
+noise floor adapts as it goes instead of being recalibrated before each
+phrase. Consumers subscribe and receive AudioBlocks: frame-aligned audio
+with a speech flag per frame, in stream order.
+
+    service = AudioCaptureService().open()
+    with service.subscribe(pre_roll_ms=300) as audio:     # or since=<stream position>
+        samples = audio.utterance(timeout=4, max_seconds=8)
+
+A subscription can start in the past, up to the ring buffer's length: the
+wake-word thread hands the command capture the position where the wake
+phrase ended, so nothing said after it is lost.
+"""
+import contextlib
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from wake_word import RING_SECONDS, SAMPLE_RATE, AudioRingBuffer, UtteranceSegmenter, VoiceActivityDetector
+
+CHUNK = 1024                   # samples per microphone read
+SUBSCRIPTION_SECONDS = 10      # audio a subscriber may fall behind before its oldest blocks are dropped
+COMMAND_HANGOVER_MS = 600      # silence that ends a command (longer than a pause between words)
+
+# Frame-aligned audio: `samples` start at stream position `position`, one VAD flag per frame
+AudioBlock = namedtuple("AudioBlock", "position samples flags")
+
+
+@contextlib.contextmanager
+def microphone_stream(rate=SAMPLE_RATE):
+    """The default microphone through speech_recognition (PyAudio), 16-bit mono."""
+    import speech_recognition as sr
+    with sr.Microphone(sample_rate=rate, chunk_size=CHUNK) as source:
+        yield source.stream
+
+
+class AudioSubscription:
+    """AudioBlocks from an AudioCaptureService, in order. Close it (or use `with`) when done."""
+
+    def __init__(self, service, maxlen):
+        self.service = service
+        self._cond = threading.Condition()
+        self._blocks = deque(maxlen=maxlen)
+        self._closed = False
+        self.dropped = 0     # blocks discarded because the consumer fell behind
+
+    def _put(self, block):
+        with self._cond:
+            if len(self._blocks) == self._blocks.maxlen:
+                self.dropped += 1
+            self._blocks.append(block)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Next block, or None on timeout or once closed (or the service stopped) and drained."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._blocks or self._closed, timeout)
+            return self._blocks.popleft() if self._blocks else None
+
+    def wait_for_speech(self, timeout):
+        """Whether a queued block has speech within `timeout` seconds. Nothing is consumed."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed or any(block.flags.any() for block in self._blocks), timeout
+            ) and not self._closed
+
+    def clear(self):
+        """Drop the queued blocks."""
+        with self._cond:
+            self._blocks.clear()
+
+    def _close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def close(self):
+        self.service.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def utterance(self, timeout=4, max_seconds=8, hangover_ms=COMMAND_HANGOVER_MS):
+        """
+        The first utterance in the subscribed audio, as int16 samples.
+        Args:
+            timeout: seconds to wait for speech to start (counted from now).
+            max_seconds: the utterance is cut at this length.
+            hangover_ms: silence that ends it.
+        Returns: samples, or None when nobody spoke in time.
+        """
+        pieces = list(self.stream_utterance(timeout, max_seconds, hangover_ms))
+        return np.concatenate(pieces) if pieces else None
+
+    def stream_utterance(self, timeout=4, max_seconds=8, hangover_ms=COMMAND_HANGOVER_MS):
+        """
+        The first utterance in the subscribed audio, yielded in pieces (int16
+        samples) as it is spoken: first everything from its onset (with a
+        little pre-roll), then each new block, up to where it ends. Yields
+        nothing when nobody spoke within `timeout` seconds. Arguments as for
+        utterance().
+        """
+        segmenter = UtteranceSegmenter(self.service.frame_len, self.service.rate, hangover_ms=hangover_ms,
+                                       max_ms=1000 * max_seconds)
+        pre_roll = segmenter.pre_roll * segmenter.frame_len
+        blocks = deque()     # received audio not yet yielded
+        emitted = None       # stream position up to which the utterance was yielded
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = None if segmenter.active else deadline - time.monotonic()
+            block = self.get(timeout=max(0.0, wait) if wait is not None else 1.0)
+            if block is None:
+                if self._closed or (not segmenter.active and time.monotonic() >= deadline):
+                    return
+                continue
+            blocks.append(block)
+            segmenter.frame = block.position // segmenter.frame_len
+            done = segmenter.feed(block.flags)
+            if done:
+                begin, end = done[0]
+            elif segmenter.active:
+                # Up to the latest speech frame; trailing silence waits to see if speech resumes
+                begin = max(0, segmenter.start * segmenter.frame_len - pre_roll)
+                end = (segmenter.last_speech + 1) * segmenter.frame_len
+            else:
+                # Before the onset only the pre-roll is needed
+                while len(blocks) > 1 and blocks[1].position <= block.position - pre_roll:
+                    blocks.popleft()
+                continue
+            base = blocks[0].position
+            start = begin if emitted is None else emitted
+            piece = np.concatenate([b.samples for b in blocks])[max(start - base, 0):max(end - base, 0)]
+            emitted = max(end, start)
+            while blocks and blocks[0].position + len(blocks[0].samples) <= emitted:
+                blocks.popleft()
+            if len(piece):
+                yield piece
+            if done:
+                return
+
+
+class AudioCaptureService(threading.Thread):
+    """
+    Owns the microphone stream: reads it on its own thread, keeps the last
+    RING_SECONDS of audio and its VAD flags, and fans blocks out to subscribers.
+    """
+
+    def __init__(self, open_stream=microphone_stream, rate=SAMPLE_RATE, chunk=CHUNK, ring_seconds=RING_SECONDS):
+        """
+        Args:
+            open_stream: rate -> context manager yielding an object whose
+                read(n) returns n 16-bit mono samples as bytes.
+        """
+        super().__init__(name="audio-capture", daemon=True)
+        self.open_stream = open_stream
+        self.rate = rate
+        self.chunk = chunk
+        self.ring = AudioRingBuffer(ring_seconds, rate)
+        self.vad = VoiceActivityDetector(rate)
+        self.frame_len = self.vad.frame_len
+        self.speech = AudioRingBuffer(ring_seconds, rate / self.frame_len, dtype=bool)   # flag per frame
+        self.running = True
+        self._stream = contextlib.ExitStack()
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._muted = 0
+        self.chunks = 0
+
+    def open(self):
+        """Open the stream (raising if that fails) and start reading it. Returns self."""
+        self.stream = self._stream.enter_context(self.open_stream(self.rate))
+        self.start()
+        return self
+
+    def run(self):
+        try:
+            while self.running:
+                self.process(np.frombuffer(self.stream.read(self.chunk), dtype=np.int16))
+        except Exception as e:
+            if self.running:
+                print("Audio capture error:", e)
+        finally:
+            self._stream.close()
+            with self._lock:
+                subscribers, self._subscribers = self._subscribers, []
+            for subscription in subscribers:
+                subscription._close()
+
+    def process(self, chunk):
+        """Buffer one chunk and pass the frames it completes to the subscribers."""
+        with self._lock:
+            first = self.vad.frames
+            self.ring.write(chunk)
+            flags = self.vad.feed(chunk, adapt=not self._muted)
+            if self._muted:
+                flags[:] = False
+            self.speech.write(flags)
+            self.chunks += 1
+            if not len(flags):
+                return
+            position = first * self.frame_len
+            block = AudioBlock(position, self.ring.read(position, position + len(flags) * self.frame_len), flags)
+            for subscription in self._subscribers:
+                subscription._put(block)
+
+    def subscribe(self, pre_roll_ms=0, since=None, buffer_seconds=SUBSCRIPTION_SECONDS):
+        """
+        Subscription starting `pre_roll_ms` back from now, or at stream
+        position `since` (a sample count, e.g. WakeWordListener.wake_end).
+        Either is limited to what the ring buffer still holds.
+        """
+        maxlen = max(1, int(buffer_seconds * self.rate / self.chunk))
+        subscription = AudioSubscription(self, maxlen)
+        with self._lock:
+            end = self.vad.frames
+            if since is None:
+                start = end - int(pre_roll_ms * self.rate / 1000) // self.frame_len
+            else:
+                start = since // self.frame_len
+            oldest = -(-(self.ring.written - len(self.ring.data)) // self.frame_len)   # first whole frame held
+            start = max(start, oldest, 0)
+            if start < end:
+                subscription._put(AudioBlock(start * self.frame_len,
+                                             self.ring.read(start * self.frame_len, end * self.frame_len),
+                                             self.speech.read(start, end)))
+            if self.running:
+                self._subscribers.append(subscription)
+            else:
+                subscription._close()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription._close()
+
+    @property
+    def position(self):
+        """Stream position (samples) of the next frame."""
+        return self.vad.frames * self.frame_len
+
+    @contextlib.contextmanager
+    def muted(self):
+        """
+        While the assistant itself talks: frames are flagged as non-speech and
+        the noise floor does not adapt to the loudspeaker.
+        """
+        with self._lock:
+            self._muted += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._muted -= 1
+
+    def stats(self):
+        return {
+            "audio_s": round(self.ring.written / self.rate, 1),
+            "noise_floor_db": round(self.vad.noise_floor_db, 1) if self.vad.noise_floor_db is not None else None,
+            "subscribers": len(self._subscribers),
+        }
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=1.0)
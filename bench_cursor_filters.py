@@ -0,0 +1,109 @@
+"""
+Compare cursor filters on recorded or synthetic fingertip trajectories.
+
+    python bench_cursor_filters.py                    # synthetic trajectories
+    python bench_cursor_filters.py session.lmk ...    # recorded landmark files
+
+Each filter is run over every trajectory and compared with a reference path:
+the noise-free path for synthetic data, or the raw path smoothed with a centred
+(zero-lag, non-causal) window for recordings.
+    lag_ms     time shift that best aligns the filter output with the reference
+    jitter_px  RMS distance to the reference once that lag is removed
+    us/sample  filter cost per point
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from cursor_filters import CURSOR_FILTERS, make_cursor_filter
+
+FPS = 30
+MAX_LAG_S = 0.3
+SEGMENT_GAP_S = 0.25      # a longer gap between hand frames starts a new trajectory
+REFERENCE_WINDOW = 7      # frames in the centred smoothing window for recordings
+
+
+def synthetic_trajectories(seed=0, seconds=20, noise_px=6.0):
+    """(name, t, raw_xy, reference_xy) for a still hand and a sweeping hand."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * FPS)) / FPS
+    still = np.tile([960.0, 540.0], (len(t), 1))
+    sweep = np.stack([960 + 600 * np.sin(2 * np.pi * 0.4 * t) + 150 * np.sin(2 * np.pi * 1.3 * t),
+                      540 + 300 * np.sin(2 * np.pi * 0.25 * t + 1.0)], axis=1)
+    return [(name, t, clean + rng.normal(0, noise_px, clean.shape), clean)
+            for name, clean in (("synthetic_still", still), ("synthetic_sweep", sweep))]
+
+
+def recorded_trajectories(path):
+    """Fingertip screen paths from a landmark recording, split at gaps."""
+    from gesture_controller import INDEX_TIP, fingertip_to_screen
+    from landmark_recording import LandmarkRecording, decode_points
+
+    recording = LandmarkRecording(path)
+    records = recording.records
+    first = records[(records["num_hands"] > 0) & (records["slot"] == 0)]
+    t = first["t"].astype(np.float64)
+    tips = decode_points(first)[:, INDEX_TIP, :2].astype(np.float64)
+    xy = np.array([fingertip_to_screen(x, y) for x, y in tips]).reshape(-1, 2)
+
+    kernel = np.ones(REFERENCE_WINDOW) / REFERENCE_WINDOW
+    breaks = np.nonzero(np.diff(t) > SEGMENT_GAP_S)[0] + 1
+    trajectories = []
+    for i, (seg_t, seg_xy) in enumerate(zip(np.split(t, breaks), np.split(xy, breaks))):
+        if len(seg_t) < 3 * REFERENCE_WINDOW:
+            continue
+        reference = np.stack([np.convolve(seg_xy[:, k], kernel, mode="same") for k in range(2)], axis=1)
+        edge = REFERENCE_WINDOW // 2  # the centred window is biased at the ends
+        trajectories.append((f"{path}#{i}", seg_t[edge:-edge], seg_xy[edge:-edge], reference[edge:-edge]))
+    return trajectories
+
+
+def evaluate(filter_name, t, raw, reference):
+    """Run one filter over a trajectory; returns lag_ms, jitter_px and us/sample."""
+    f = make_cursor_filter(filter_name)
+    out = np.empty_like(raw)
+    start = time.perf_counter()
+    for i in range(len(t)):
+        out[i] = f(raw[i, 0], raw[i, 1], t[i])
+    cost = (time.perf_counter() - start) / len(t)
+
+    # Compare against the reference delayed by each candidate lag, keep the best
+    lags = np.arange(0.0, MAX_LAG_S, 0.002)
+    valid = t >= t[0] + MAX_LAG_S
+    errors = []
+    for lag in lags:
+        shifted = np.stack([np.interp(t[valid] - lag, t, reference[:, k]) for k in range(2)], axis=1)
+        errors.append(np.sqrt(np.mean(np.sum((out[valid] - shifted) ** 2, axis=1))))
+    best = int(np.argmin(errors))
+    return {"lag_ms": 1000 * lags[best], "jitter_px": float(errors[best]), "us_per_sample": 1e6 * cost}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recordings", nargs="*", help="landmark recordings (.lmk); synthetic data if none")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    if args.recordings:
+        trajectories = [traj for path in args.recordings for traj in recorded_trajectories(path)]
+    else:
+        trajectories = synthetic_trajectories()
+
+    results = []
+    print(f"{'trajectory':<28} {'filter':<16} {'lag_ms':>7} {'jitter_px':>10} {'us/sample':>10}")
+    for name, t, raw, reference in trajectories:
+        for filter_name in CURSOR_FILTERS:
+            r = evaluate(filter_name, t, raw, reference)
+            results.append({"trajectory": name, "filter": filter_name, **r})
+            print(f"{name[-28:]:<28} {filter_name:<16} {r['lag_ms']:7.0f} {r['jitter_px']:10.2f} "
+                  f"{r['us_per_sample']:10.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
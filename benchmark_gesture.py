@@ -0,0 +1,260 @@
+"""
+Throughput benchmark for GestureController.
+
+Runs headless (no webcam, display or GPU): MediaPipe is replaced by a stub
+detector that returns canned landmarks, actions go to a null sink, and the
+screen size is fixed.
+
+    python benchmark_gesture.py                             # run and print
+    python benchmark_gesture.py --save-baseline             # record this machine's baseline
+    python benchmark_gesture.py --baseline benchmark_baseline.json   # fail on regressions
+    python benchmark_gesture.py --recording session.lmk     # add recorded streams
+
+Scenarios:
+    detect_gesture     one pose per call through the public classifier
+    classify_batch     64 poses per call (reported per call)
+    process_frame@WxH  mirror, convert, stub detection, gestures and overlay
+    swipe              open-palm strokes through the dynamic gesture engine
+    cursor             index pointing: filter and cursor moves
+    replay:<file>      a recorded landmark stream through process_hands
+
+Each scenario is timed `--repeat` times and the fastest run is kept, which
+filters out one-off scheduler noise. A scenario regresses when its median
+per-call latency is more than `--tolerance` slower than the baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+from gesture_controller import GestureController, Hand, classify_batch
+
+FRAME_SIZES = ((320, 240), (640, 480), (1280, 720), (1920, 1080))
+BENCH_SCREEN_SIZE = (1920, 1080)
+DEFAULT_FRAMES = 300
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25       # allowed slowdown of the median before failing
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+# --- Synthetic input ---
+def make_pose(raised=(), wrist=(0.5, 0.8), tip=None, pinch=False):
+    """
+    (21, 3) pose with the given fingers (1=index .. 4=pinky) raised; `tip`
+    moves the index fingertip, `pinch` brings the thumb tip next to it.
+    Shared by the verify_* tests.
+    """
+    x, y = wrist
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = x
+    points[0, :2] = (x, y)
+    points[[5, 9, 13, 17], 1] = y - 0.15    # MCPs
+    points[[6, 10, 14, 18], 1] = y - 0.2    # PIPs
+    points[[8, 12, 16, 20], 1] = y - 0.1    # curled tips
+    points[4, :2] = (x + 0.1, y - 0.1)      # thumb tip
+    for finger in raised:
+        points[4 * finger + 4, 1] = y - 0.35
+    if tip is not None:
+        points[8, :2] = tip
+    if pinch:
+        points[4, :2] = points[8, :2] + 0.01
+    return points
+
+
+def synthetic_stream(kind, n, seed=0):
+    """List of per-frame hand lists for "pointing", "swipe" or "mixed" streams."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 30.0
+    frames = []
+    for i in range(n):
+        if kind == "pointing":
+            tip = (0.5 + 0.25 * math.sin(2 * math.pi * 0.3 * t[i]), 0.4 + 0.15 * math.sin(2 * math.pi * 0.2 * t[i]))
+            pose = make_pose((1,), tip=np.add(tip, rng.normal(0, 0.003, 2)))
+        elif kind == "swipe":
+            # 0.3 s swipe right, 0.3 s rest, 0.3 s swipe left, 0.3 s rest
+            phase = (i % 36) / 9
+            offset = min(phase, 1.0) if phase < 2 else max(0.0, 1 - (phase - 2))
+            pose = make_pose((1, 2, 3, 4), wrist=(0.35 + 0.3 * offset, 0.8))
+        else:
+            pose = make_pose(((), (1,), (1, 2), (1, 2, 3, 4))[(i // 15) % 4])
+        pose = pose + rng.normal(0, 0.002, pose.shape).astype(np.float32)
+        frames.append([Hand(pose, "Right", 0.95)])
+    return frames
+
+
+class StubHands:
+    """Stand-in for mp.solutions.hands.Hands returning canned results in a cycle."""
+
+    class _Results:
+        def __init__(self, landmarks, handedness):
+            self.multi_hand_landmarks = landmarks
+            self.multi_handedness = handedness
+
+    def __init__(self, stream):
+        self.results = []
+        for hands in stream:
+            landmarks, handedness = [], []
+            for hand in hands:
+                nll = landmark_pb2.NormalizedLandmarkList()
+                for x, y, z in hand.points:
+                    nll.landmark.add(x=x, y=y, z=z)
+                landmarks.append(nll)
+                classification = classification_pb2.ClassificationList()
+                classification.classification.add(label=hand.handedness, score=hand.score)
+                handedness.append(classification)
+            self.results.append(self._Results(landmarks or None, handedness or None))
+        self.i = 0
+
+    def process(self, rgb):
+        result = self.results[self.i % len(self.results)]
+        self.i += 1
+        return result
+
+    def close(self):
+        pass
+
+
+class NullOutput:
+    """Action sink with pyautogui's method names that does nothing."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+# --- Timing ---
+def time_calls(fn, items):
+    """Per-call durations (seconds) of fn(item) over items."""
+    durations = np.empty(len(items))
+    clock = time.perf_counter
+    for i, item in enumerate(items):
+        start = clock()
+        fn(item)
+        durations[i] = clock() - start
+    return durations
+
+
+def summarize(durations):
+    return {
+        "calls": int(len(durations)),
+        "calls_per_s": float(len(durations) / durations.sum()) if durations.sum() else 0.0,
+        "mean_us": float(1e6 * durations.mean()),
+        "p50_us": float(1e6 * np.percentile(durations, 50)),
+        "p95_us": float(1e6 * np.percentile(durations, 95)),
+    }
+
+
+def best_of(repeat, run):
+    """Run `run()` (returning per-call durations) `repeat` times; keep the fastest median."""
+    with contextlib.redirect_stdout(io.StringIO()):   # swipe messages
+        runs = [summarize(run()) for _ in range(repeat)]
+    return min(runs, key=lambda r: r["p50_us"])
+
+
+def new_controller(stream=None):
+    """Headless controller: stub detector, null output, no overlay window."""
+    return GestureController(hands=StubHands(stream) if stream else None, output=NullOutput(),
+                             screen_size=BENCH_SCREEN_SIZE)
+
+
+def run_benchmarks(frames=DEFAULT_FRAMES, repeat=DEFAULT_REPEAT, frame_sizes=FRAME_SIZES, recordings=()):
+    """Run every scenario; returns {scenario: summary}."""
+    results = {}
+    mixed = synthetic_stream("mixed", frames)
+    poses = [hands[0].points for hands in mixed]
+
+    detector = new_controller()
+    results["detect_gesture"] = best_of(repeat, lambda: time_calls(detector.detect_gesture, poses))
+    batches = [np.stack(poses[i:i + 64]) for i in range(0, len(poses) - 63, 64)] or [np.stack(poses)]
+    results["classify_batch"] = best_of(repeat, lambda: time_calls(classify_batch, batches))
+
+    rng = np.random.default_rng(1)
+    for w, h in frame_sizes:
+        images = [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for _ in range(4)]
+        items = [images[i % len(images)] for i in range(frames)]
+
+        def run_frames():
+            gc = new_controller(mixed)
+            return time_calls(gc.process_frame, items)
+        results[f"process_frame@{w}x{h}"] = best_of(repeat, run_frames)
+
+    for name, kind in (("swipe", "swipe"), ("cursor", "pointing")):
+        stream = synthetic_stream(kind, frames)
+
+        def run_stream(stream=stream):
+            gc = new_controller()
+            clock = iter(range(len(stream)))
+            return time_calls(lambda hands: gc.process_hands(hands, 640, 480, now=next(clock) / 30.0), stream)
+        results[name] = best_of(repeat, run_stream)
+
+    for path in recordings:
+        from landmark_recording import LandmarkRecording
+        recording = LandmarkRecording(path)
+        w, h = recording.frame_size
+        stream = [(t, hands) for t, hands in recording]
+
+        def run_recording(stream=stream, w=w, h=h):
+            gc = new_controller()
+            return time_calls(lambda item: gc.process_hands(item[1], w or 640, h or 480, now=item[0]), stream)
+        results[f"replay:{path}"] = best_of(repeat, run_recording)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Scenarios whose median latency regressed beyond tolerance: [(name, baseline_us, now_us)]."""
+    regressions = []
+    for name, base in baseline.get("results", baseline).items():
+        now = results.get(name)
+        if now is not None and now["p50_us"] > base["p50_us"] * (1 + tolerance):
+            regressions.append((name, base["p50_us"], now["p50_us"]))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="frames per scenario")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per scenario (best kept)")
+    parser.add_argument("--recording", action="append", default=[], help="landmark recording (.lmk) to replay")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (exit 1 on regression)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed median slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.frames, args.repeat, recordings=args.recording)
+    print(f"{'scenario':<28} {'calls/s':>10} {'mean_us':>9} {'p50_us':>9} {'p95_us':>9}")
+    for name, r in results.items():
+        print(f"{name[-28:]:<28} {r['calls_per_s']:10.0f} {r['mean_us']:9.1f} {r['p50_us']:9.1f} {r['p95_us']:9.1f}")
+
+    document = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor()},
+        "frames": args.frames,
+        "results": results,
+    }
+    for path in [args.output] + ([DEFAULT_BASELINE] if args.save_baseline else []):
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, now in regressions:
+            print(f"REGRESSION {name}: p50 {before:.1f} us -> {now:.1f} us ({now / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
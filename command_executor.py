@@ -0,0 +1,214 @@
+"""
+Assistant commands off the Tk thread.
+
+Commands (AI requests, listening, app launches, typing) can block for
+seconds; run on the Tk thread they freeze the window. CommandExecutor runs
+them on a small worker pool instead, and UIChannel carries their widget
+updates back to the Tk thread, which is the only thread allowed to touch
+Tk:
+
+    ui = UIChannel(root)
+    commands = CommandExecutor(ui=ui)
+    commands.submit(handle_command, "ai what is a thinkpad", timeout=20)
+    # ...and inside handle_command, on a worker thread:
+    ui.post(status_var.set, "Status: Asking AI...")
+
+Threads cannot be killed, so cancellation is cooperative: cancel() (or the
+command's timeout running out) sets its token, and the command checks
+cancelled() after each blocking step and drops its result if set.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 4                    # commands that may run at once
+COMMAND_TIMEOUT = 30.0         # seconds before a command is cancelled, unless submit() says otherwise
+UI_POLL_MS = 30                # how often the Tk thread applies posted updates
+
+_local = threading.local()
+
+
+def cancelled():
+    """Whether the command running on this thread was cancelled or timed out (False outside commands)."""
+    token = getattr(_local, "token", None)
+    return token is not None and token.is_set()
+
+
+class UIChannel:
+    """
+    Calls made from any thread, run in order on the Tk thread. post() from
+    the Tk thread itself runs the call straight away.
+    """
+
+    def __init__(self, root, poll_ms=UI_POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.thread = threading.current_thread()   # the Tk thread: the one that creates the channel
+        self._queue = queue.SimpleQueue()
+        self.applied = 0
+        self.max_stall = 0.0       # longest the Tk loop came back late (s): how long the window froze
+        self._due = None
+        self.root.after(self.poll_ms, self._drain)
+
+    def post(self, fn, *args):
+        if threading.current_thread() is self.thread:
+            self._apply(fn, args)
+        else:
+            self._queue.put((fn, args))
+
+    def _apply(self, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print("UI update error:", e)
+        self.applied += 1
+
+    def _drain(self):
+        now = time.monotonic()
+        if self._due is not None:
+            self.max_stall = max(self.max_stall, now - self._due)
+        while True:
+            try:
+                fn, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._apply(fn, args)
+        self._due = time.monotonic() + self.poll_ms / 1000
+        self.root.after(self.poll_ms, self._drain)
+
+    def stats(self):
+        return {"applied": self.applied, "max_stall_ms": round(1000 * self.max_stall, 1)}
+
+
+class Command:
+    """Handle of one submitted command."""
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.token = threading.Event()
+        self.timed_out = False
+        self.future = None
+
+    def cancel(self):
+        """Ask the command to stop; if it has not started yet it never will."""
+        self.token.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self.token.is_set()
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout=None):
+        """The command's return value (raises what it raised, or CancelledError if it never ran)."""
+        return self.future.result(timeout)
+
+
+class CommandExecutor:
+    def __init__(self, workers=WORKERS, ui=None, on_timeout=None, default_timeout=COMMAND_TIMEOUT):
+        """
+        Args:
+            ui: UIChannel that on_timeout is posted through.
+            on_timeout: called with the Command whose timeout ran out.
+            default_timeout: seconds per command; None for no limit.
+        """
+        self.ui = ui
+        self.on_timeout = on_timeout
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command")
+        self._lock = threading.Lock()
+        self._live = []            # commands queued or running
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.busy = 0.0            # seconds spent running commands
+
+    def submit(self, fn, *args, name=None, timeout=None):
+        """
+        Run fn(*args) on a worker thread; returns its Command. `timeout`
+        (default: default_timeout) counts from when the command starts.
+        """
+        command = Command(name or getattr(fn, "__name__", "command"),
+                          timeout if timeout is not None else self.default_timeout)
+        with self._lock:
+            self._live.append(command)
+        command.future = self._pool.submit(self._run, command, fn, args)
+        command.future.add_done_callback(lambda _: self._forget(command))   # also when it never ran
+        return command
+
+    def _run(self, command, fn, args):
+        if command.cancelled:
+            return None
+        _local.token = command.token
+        timer = None
+        if command.timeout is not None:
+            timer = threading.Timer(command.timeout, self._expire, (command,))
+            timer.daemon = True
+            timer.start()
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        except Exception as e:
+            print(f"Command {command.name!r} failed:", e)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            _local.token = None
+            self._forget(command)    # before its result is set, so whoever waits on it sees it gone
+            with self._lock:
+                self.busy += time.perf_counter() - start
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def _expire(self, command):
+        if command.done or command.cancelled:
+            return
+        command.timed_out = True
+        command.token.set()
+        self.timeouts += 1
+        if self.on_timeout is not None:
+            if self.ui is not None:
+                self.ui.post(self.on_timeout, command)
+            else:
+                self.on_timeout(command)
+
+    def _forget(self, command):
+        with self._lock:
+            if command in self._live:
+                self._live.remove(command)
+
+    @property
+    def pending(self):
+        """Commands queued or running."""
+        with self._lock:
+            return list(self._live)
+
+    def cancel_all(self):
+        for command in self.pending:
+            command.cancel()
+
+    def stats(self):
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "pending": len(self._live),
+            "busy_s": round(self.busy, 2),
+        }
+
+    def shutdown(self, wait=False):
+        """Cancel everything and stop the workers (running commands finish in the background)."""
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
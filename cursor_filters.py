@@ -0,0 +1,149 @@
+"""
+Cursor smoothing filters for the gesture mouse.
+
+Every filter takes one screen point per frame with its timestamp and returns
+the smoothed point in O(1):
+
+    f = make_cursor_filter("one_euro")
+    x, y = f(raw_x, raw_y, t)
+    f.reset()   # when the hand is lost
+
+MovingAverageFilter reproduces the original 5-frame average (and its lag).
+OneEuroFilter adapts its cutoff to speed: heavy smoothing when the hand is
+still, almost none while it moves. ConstantVelocityKalman predicts through
+noise with a position/velocity model. See bench_cursor_filters.py to compare
+them on recorded trajectories.
+"""
+import math
+from collections import deque
+
+
+class MovingAverageFilter:
+    """Mean of the last `window` points (running sums, O(1) per sample)."""
+
+    def __init__(self, window=5):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._points = deque(maxlen=self.window)
+        self._sum_x = self._sum_y = 0.0
+
+    def __call__(self, x, y, t):
+        if len(self._points) == self.window:
+            old_x, old_y = self._points[0]
+            self._sum_x -= old_x
+            self._sum_y -= old_y
+        self._points.append((x, y))
+        self._sum_x += x
+        self._sum_y += y
+        n = len(self._points)
+        return self._sum_x / n, self._sum_y / n
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., CHI 2012) on both axes.
+    min_cutoff (Hz) sets smoothing at rest, beta how fast the cutoff rises
+    with speed (speed is in units per second, here screen pixels).
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.007, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._t = None
+        self._x = self._y = 0.0
+        self._dx = self._dy = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, y, t):
+        if self._t is None or t <= self._t:
+            if self._t is None:
+                self._x, self._y = x, y
+            self._t = t
+            return self._x, self._y
+        dt = t - self._t
+        self._t = t
+
+        # Smoothed speed drives the cutoff
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx += a_d * ((x - self._x) / dt - self._dx)
+        self._dy += a_d * ((y - self._y) / dt - self._dy)
+        speed = math.hypot(self._dx, self._dy)
+
+        a = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        self._x += a * (x - self._x)
+        self._y += a * (y - self._y)
+        return self._x, self._y
+
+
+class ConstantVelocityKalman:
+    """
+    Constant-velocity Kalman filter on both axes.
+    Both axes share the same model and noise, so they share one covariance
+    matrix and each update is a handful of scalar operations.
+    accel_noise: std of unmodelled acceleration (units/s^2);
+    measurement_noise: std of the raw position (units).
+    """
+
+    def __init__(self, accel_noise=3000.0, measurement_noise=8.0):
+        self.q = accel_noise ** 2
+        self.r = measurement_noise ** 2
+        self.reset()
+
+    def reset(self):
+        self._t = None
+        self._pos = [0.0, 0.0]
+        self._vel = [0.0, 0.0]
+        self._p = None  # covariance (p_pp, p_pv, p_vv)
+
+    def __call__(self, x, y, t):
+        if self._t is None:
+            self._t = t
+            self._pos = [x, y]
+            self._vel = [0.0, 0.0]
+            self._p = (self.r, 0.0, self.q)
+            return x, y
+        dt = max(t - self._t, 1e-3)
+        self._t = t
+
+        # Predict
+        p_pp, p_pv, p_vv = self._p
+        q = self.q
+        p_pp = p_pp + 2 * dt * p_pv + dt * dt * p_vv + q * dt ** 4 / 4
+        p_pv = p_pv + dt * p_vv + q * dt ** 3 / 2
+        p_vv = p_vv + q * dt * dt
+
+        # Update (same gain for both axes)
+        s = p_pp + self.r
+        k_p, k_v = p_pp / s, p_pv / s
+        for axis, z in enumerate((x, y)):
+            predicted = self._pos[axis] + dt * self._vel[axis]
+            innovation = z - predicted
+            self._pos[axis] = predicted + k_p * innovation
+            self._vel[axis] += k_v * innovation
+        self._p = ((1 - k_p) * p_pp, (1 - k_p) * p_pv, p_vv - k_v * p_pv)
+        return self._pos[0], self._pos[1]
+
+
+CURSOR_FILTERS = {
+    "moving_average": MovingAverageFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": ConstantVelocityKalman,
+}
+
+
+def make_cursor_filter(name, **params):
+    """Create a cursor filter by name ("moving_average", "one_euro", "kalman")."""
+    try:
+        return CURSOR_FILTERS[name](**params)
+    except KeyError:
+        raise ValueError(f"Unknown cursor filter {name!r}; choose from {sorted(CURSOR_FILTERS)}")
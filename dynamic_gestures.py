@@ -0,0 +1,157 @@
+"""
+Dynamic (motion) gestures from hand trajectories.
+
+DynamicGestureEngine keeps the recent hand trajectory in a NumPy ring buffer
+and splits it into strokes: a stroke starts when the hand starts moving and
+ends when it comes to rest. Each finished stroke is matched against a
+template library: swipes in four directions and circles in both directions.
+Matching is resampled-point matching: the stroke is resampled to
+RESAMPLE_POINTS points evenly spaced along its path, centred and scaled to
+unit RMS radius, and compared with all templates in one vectorized step.
+Templates are normalized once at load time, so a stroke costs a single
+resample plus one distance computation over the stacked library.
+
+Coordinates are whatever the caller feeds in, as long as both axes use the
+same unit (GestureController uses frame heights, with y pointing down).
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+RESAMPLE_POINTS = 32
+TRAJECTORY_CAPACITY = 64      # Ring buffer size (~2 s at 30 fps)
+MATCH_THRESHOLD = 0.3         # Max mean point distance between unit-RMS shapes
+MIN_POINTS = 5                # Fewer samples than this never match
+REST_SPEED = 0.3              # Below this speed (units/s) the hand is at rest
+CIRCLE_PHASES = 16            # Start angles per circle direction
+
+# name, raw path (any scale), longest stroke (s), minimum extent (units)
+Template = namedtuple("Template", ["name", "points", "window", "min_extent"])
+
+
+def resample(points, n=RESAMPLE_POINTS):
+    """Resample a (k, 2) path to n points evenly spaced along its length (None if it has no length)."""
+    steps = np.hypot(*np.diff(points, axis=0).T)
+    distance = np.concatenate(([0.0], np.cumsum(steps)))
+    if distance[-1] <= 0:
+        return None
+    s = np.linspace(0.0, distance[-1], n)
+    return np.stack([np.interp(s, distance, points[:, 0]), np.interp(s, distance, points[:, 1])], axis=1)
+
+
+def normalize(points, n=RESAMPLE_POINTS):
+    """Resampled, centred path with unit RMS radius (None for a stationary path)."""
+    p = resample(np.asarray(points, dtype=np.float64), n)
+    if p is None:
+        return None
+    p -= p.mean(axis=0)
+    return p / math.sqrt(np.mean(np.sum(p * p, axis=1)))
+
+
+def _line(dx, dy):
+    return np.array([[0.0, 0.0], [dx, dy]])
+
+
+def _circle(direction, phase):
+    theta = phase + direction * np.linspace(0.0, 2 * math.pi, 64)
+    return np.stack([np.cos(theta), np.sin(theta)], axis=1)
+
+
+def default_templates():
+    """Swipes (right/left/up/down) and circles (CW/CCW as seen with y pointing down)."""
+    templates = [
+        Template("Swipe Right", _line(1, 0), 0.8, 0.15),
+        Template("Swipe Left", _line(-1, 0), 0.8, 0.15),
+        Template("Swipe Up", _line(0, -1), 0.8, 0.15),
+        Template("Swipe Down", _line(0, 1), 0.8, 0.15),
+    ]
+    # A circle can start anywhere on the loop: one template per start angle
+    for k in range(CIRCLE_PHASES):
+        phase = 2 * math.pi * k / CIRCLE_PHASES
+        templates.append(Template("Circle CW", _circle(1, phase), 1.5, 0.1))
+        templates.append(Template("Circle CCW", _circle(-1, phase), 1.5, 0.1))
+    return templates
+
+
+class DynamicGestureEngine:
+    """Ring buffer of (t, x, y) samples plus a precomputed template library."""
+
+    def __init__(self, templates=None, capacity=TRAJECTORY_CAPACITY, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._samples = np.zeros((capacity, 3))
+        self._pos = 0
+        self._count = 0
+        # Templates sharing a window and extent are matched together as one (T, N, 2) array
+        groups = {}
+        for template in default_templates() if templates is None else templates:
+            key = (template.window, template.min_extent)
+            names, shapes = groups.setdefault(key, ([], []))
+            names.append(template.name)
+            shapes.append(normalize(template.points))
+        self.groups = [(window, min_extent, names, np.stack(shapes))
+                       for (window, min_extent), (names, shapes) in sorted(groups.items())]
+        self.reset()
+
+    def reset(self):
+        self._count = 0
+        self._stroke_start = None   # time the current stroke began, None at rest
+
+    def append(self, t, x, y):
+        self._samples[self._pos] = (t, x, y)
+        self._pos = (self._pos + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+
+    def trajectory(self, seconds=None):
+        """Buffered samples, oldest first, as a (k, 3) array of t, x, y."""
+        capacity = len(self._samples)
+        samples = self._samples[(self._pos - self._count + np.arange(self._count)) % capacity]
+        if seconds is not None and len(samples):
+            samples = samples[samples[:, 0] >= samples[-1, 0] - seconds]
+        return samples
+
+    def match(self, points, names, shapes):
+        """Best (name, distance) of a (k, 2) path against one template group."""
+        shape = normalize(points)
+        if shape is None:
+            return None, math.inf
+        distances = np.mean(np.sqrt(np.sum((shapes - shape) ** 2, axis=2)), axis=1)
+        best = int(np.argmin(distances))
+        return names[best], float(distances[best])
+
+    def update(self, t, x, y):
+        """
+        Add one sample; when it ends a stroke, match the stroke.
+        Returns:
+            (name, distance) of the best match under the threshold, or None.
+        """
+        self.append(t, x, y)
+        if self._count < 3:
+            return None
+        # Speed over the last two steps, so single-frame jitter doesn't end a stroke
+        t0, x0, y0 = self._samples[(self._pos - 3) % len(self._samples)]
+        t1, x1, y1 = self._samples[self._pos - 1]
+        moving = math.hypot(x1 - x0, y1 - y0) > REST_SPEED * max(t1 - t0, 1e-6)
+        if moving:
+            if self._stroke_start is None:
+                self._stroke_start = t0
+            return None
+        return self.end_stroke()
+
+    def end_stroke(self):
+        """Match the stroke in progress, if any (e.g. when the hand leaves the frame)."""
+        if self._stroke_start is None:
+            return None
+        stroke = self.trajectory()
+        stroke = stroke[stroke[:, 0] >= self._stroke_start]
+        duration = stroke[-1, 0] - stroke[0, 0]
+        extent = np.max(np.ptp(stroke[:, 1:], axis=0))
+        self._stroke_start = None
+        best = None
+        for window, min_extent, names, shapes in self.groups:
+            if len(stroke) < MIN_POINTS or duration > window or extent < min_extent:
+                continue
+            name, distance = self.match(stroke[:, 1:], names, shapes)
+            if distance < self.threshold and (best is None or distance < best[1]):
+                best = (name, distance)
+        return best
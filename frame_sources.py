@@ -0,0 +1,356 @@
+"""
+Frame sources for the gesture pipeline.
+
+Every source decodes on its own thread, ahead of the consumer:
+
+    CameraSource          live camera; a LatestFrameBuffer keeps only the newest
+                          frame, so inference never works on a stale one
+    VideoFileSource       recorded footage; a bounded FrameQueue prefetches a few
+                          frames and delivers every one of them, in order
+    ImageSequenceSource   a directory (or glob pattern) of images, likewise
+
+read() returns (frame, timestamp) with the wall time the frame was decoded;
+recorded sources also have `fps` so the consumer can derive media time.
+Decoding time is measured per frame on the source thread and reported by
+stats(), separately from the controller's detect (inference) stage.
+
+process_source() runs recorded footage through a GestureController as fast
+as it decodes, for regression runs:
+
+    python frame_sources.py clip.mp4
+    python frame_sources.py frames_dir/ --limit 300
+"""
+import glob
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from pipeline_timing import LatencyHistogram
+
+PREFETCH_FRAMES = 8            # decoded frames a recorded source may run ahead
+DEFAULT_FPS = 30.0             # media rate of image sequences (and videos without one)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class LatestFrameBuffer:
+    """Single-slot buffer: every put overwrites, get returns the newest unseen frame."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = None
+        self._seq = 0        # frames written
+        self._read_seq = 0   # seq of the last frame handed out
+        self._closed = False
+        self.dropped = 0     # frames overwritten before anyone read them
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            if self._seq != self._read_seq:
+                self.dropped += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Wait for a frame newer than the last one returned.
+        Returns (frame, timestamp), or (None, None) on timeout or close.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != self._read_seq or self._closed, timeout)
+            if self._seq == self._read_seq:
+                return None, None
+            self._read_seq = self._seq
+            return self._frame, self._timestamp
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def exhausted(self):
+        """Closed with nothing left to read."""
+        with self._cond:
+            return self._closed and self._seq == self._read_seq
+
+
+class FrameQueue:
+    """Bounded FIFO: put waits while it is full, so no frame is ever dropped."""
+
+    def __init__(self, maxsize=PREFETCH_FRAMES):
+        self._cond = threading.Condition()
+        self._items = deque()
+        self.maxsize = maxsize
+        self._closed = False
+        self.dropped = 0     # always 0; same interface as LatestFrameBuffer
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+            if not self._closed:
+                self._items.append((frame, timestamp))
+                self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Oldest frame and its timestamp, or (None, None) on timeout or once closed and empty."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None, None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def exhausted(self):
+        with self._cond:
+            return self._closed and not self._items
+
+
+class FrameSource(threading.Thread):
+    """
+    Base class: a producer thread calling _grab() and buffering the frames.
+    Subclasses implement _grab() (a frame, or None when there is none right
+    now / at the end) and _release().
+    """
+
+    live = False               # live sources keep the newest frame; recorded ones keep all
+
+    def __init__(self, prefetch=PREFETCH_FRAMES, fps=None):
+        super().__init__(daemon=True)
+        self.buffer = LatestFrameBuffer() if self.live else FrameQueue(prefetch)
+        self.fps = fps
+        self.running = True
+        self.frames_captured = 0
+        self.decode_time = LatencyHistogram()
+
+    def _grab(self):
+        raise NotImplementedError
+
+    def _release(self):
+        pass
+
+    def run(self):
+        clock = time.perf_counter
+        try:
+            while self.running:
+                start = clock()
+                frame = self._grab()
+                if frame is None:
+                    if not self.live:
+                        break  # end of the footage
+                    time.sleep(0.01)
+                    continue
+                self.decode_time.record(clock() - start)
+                self.frames_captured += 1
+                self.buffer.put(frame, time.time())
+        finally:
+            self.buffer.close()
+
+    def read(self, timeout=1.0):
+        """Next frame and the wall time it was decoded, or (None, None) if none arrived in time (or at the end)."""
+        return self.buffer.get(timeout)
+
+    @property
+    def finished(self):
+        """A recorded source has delivered its last frame."""
+        return self.buffer.exhausted
+
+    def __iter__(self):
+        """Yield (frame, timestamp) until the source ends or is stopped."""
+        while True:
+            frame, timestamp = self.read()
+            if frame is not None:
+                yield frame, timestamp
+            elif self.finished or not self.running:
+                return
+
+    @property
+    def dropped(self):
+        return self.buffer.dropped
+
+    def stats(self):
+        decode = self.decode_time.summary()
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.dropped,
+            "decode_avg_ms": decode["mean_ms"],
+            "decode_p95_ms": decode["p95_ms"],
+        }
+
+    def stop(self):
+        self.running = False
+        self.buffer.close()  # wakes a producer waiting for queue space
+        if self.is_alive():
+            self.join(timeout=1.0)
+        self._release()
+
+
+class CameraSource(FrameSource):
+    """Live camera (or any opened cv2.VideoCapture); stale frames are dropped."""
+
+    live = True
+
+    def __init__(self, device=0):
+        """`device`: camera index or URL for cv2.VideoCapture, or an already opened capture."""
+        if isinstance(device, (int, str)):
+            import cv2
+            device = cv2.VideoCapture(device)
+        super().__init__()
+        self.cap = device
+
+    @property
+    def opened(self):
+        return self.cap.isOpened()
+
+    def _grab(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Every frame of a video file, decoded ahead of the consumer."""
+
+    def __init__(self, path, prefetch=PREFETCH_FRAMES):
+        import cv2
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(prefetch, fps=self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS)
+
+    @property
+    def opened(self):
+        return self.cap.isOpened()
+
+    def _grab(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Images from a directory (sorted by name) or a glob pattern, at a nominal fps."""
+
+    def __init__(self, path, fps=DEFAULT_FPS, prefetch=PREFETCH_FRAMES):
+        super().__init__(prefetch, fps=fps)
+        if os.path.isdir(path):
+            self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            self.paths = sorted(glob.glob(path))
+        self._next = 0
+
+    @property
+    def opened(self):
+        return bool(self.paths)
+
+    def _grab(self):
+        import cv2
+        while self._next < len(self.paths):
+            path = self.paths[self._next]
+            self._next += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return frame
+            print(f"Skipping unreadable image {path}")
+        return None
+
+
+def open_source(spec, fps=DEFAULT_FPS, prefetch=PREFETCH_FRAMES):
+    """
+    FrameSource for a camera index ("0"), a directory or glob of images, or a
+    video file. `fps` only applies to image sequences.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec) or any(c in spec for c in "*?["):
+        return ImageSequenceSource(spec, fps=fps, prefetch=prefetch)
+    return VideoFileSource(spec, prefetch=prefetch)
+
+
+def process_source(controller, source, mirror=True, limit=None):
+    """
+    Run every frame of a recorded source through controller.process_frame as
+    fast as possible, with media time (frame index / fps) as the timestamp so
+    cooldowns and gestures behave as at real speed.
+    Returns:
+        dict with frame count, wall time, throughput and the decode vs
+        inference (detect stage) latency.
+    """
+    if source.ident is None:
+        source.start()
+    fps = source.fps or DEFAULT_FPS
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for frame, _ in source:
+            controller.process_frame(frame, mirror=mirror, now=frames / fps)
+            frames += 1
+            if limit is not None and frames >= limit:
+                break
+    finally:
+        source.stop()
+    wall = time.perf_counter() - start
+    stages = controller.timing.report()
+    detect = stages.get("detect", {})
+    return {
+        "frames": frames,
+        "wall_s": wall,
+        "fps": frames / wall if wall > 0 else 0.0,
+        "realtime_factor": frames / fps / wall if wall > 0 else 0.0,
+        **source.stats(),
+        "inference_avg_ms": detect.get("mean_ms", 0.0),
+        "inference_p95_ms": detect.get("p95_ms", 0.0),
+        "pipeline_avg_ms": stages.get("total", {}).get("mean_ms", 0.0),
+    }
+
+
+def main(argv):
+    import argparse
+    from collections import Counter
+    from gesture_controller import GestureController
+    from landmark_recording import ActionLog
+
+    parser = argparse.ArgumentParser(description="Run recorded footage through the gesture pipeline at full speed.")
+    parser.add_argument("source", help="video file, image directory or glob pattern")
+    parser.add_argument("--limit", type=int, help="stop after this many frames")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="media rate of image sequences")
+    parser.add_argument("--no-mirror", action="store_true", help="footage is already mirrored")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.source, fps=args.fps)
+    if source.live or not source.opened:
+        print(f"Cannot read recorded footage from {args.source}")
+        return 1
+    log = ActionLog()
+    controller = GestureController(output=log, overlay=False)
+    try:
+        report = process_source(controller, source, mirror=not args.no_mirror, limit=args.limit)
+    finally:
+        controller.release()
+    print(f"{args.source}: {report['frames']} frames in {report['wall_s']:.2f} s "
+          f"({report['fps']:.1f} fps, {report['realtime_factor']:.1f}x real time)")
+    print(f"  decode    avg {report['decode_avg_ms']:.2f} ms  p95 {report['decode_p95_ms']:.2f} ms")
+    print(f"  inference avg {report['inference_avg_ms']:.2f} ms  p95 {report['inference_p95_ms']:.2f} ms")
+    print(f"  pipeline  avg {report['pipeline_avg_ms']:.2f} ms")
+    for name, count in Counter(name for name, _ in log.calls).most_common():
+        print(f"  {name}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
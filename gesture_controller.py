@@ -1,224 +1,678 @@
 import cv2
 import mediapipe as mp
+import math
 import numpy as np
-import pyautogui
 import time
-import math
-from collections import deque
+from collections import namedtuple
 import platform
 
+from cursor_filters import make_cursor_filter
+from dynamic_gestures import DynamicGestureEngine
+from gesture_debounce import GestureDebouncer
+from gesture_definitions import load_gestures
+from gesture_overlay import draw_overlay, draw_timing
+from input_dispatcher import InputDispatcher
+from pipeline_timing import PipelineTimer
+
 # --- Configuration & Constants ---
-SCREEN_WIDTH, SCREEN_HEIGHT = pyautogui.size()
-SMOOTHING_BUFFER_SIZE = 5      # Number of frames to average for mouse movement
+SCREEN_SIZE = None             # (width, height) in pixels; asked from pyautogui on first use
+FALLBACK_SCREEN_SIZE = (1920, 1080)  # used when there is no display to ask (replay, tests, CI)
+SMOOTHING_BUFFER_SIZE = 5      # Window of the "moving_average" cursor filter
+CURSOR_FILTER = "one_euro"     # Cursor smoothing, see cursor_filters.py
+CURSOR_MARGIN = 0.2            # Camera-frame border ignored when mapping to the screen
 GESTURE_COOLDOWN_SECONDS = 0.5 # Cooldown between discrete actions (e.g. volume change)
 CLICK_COOLDOWN_SECONDS = 1.0   # Cooldown for clicks to prevent double-clicks
-SCROLL_SPEED = 30
+SCROLL_SPEED = 30              # Scroll clicks per up/down swipe
 MOUSE_SENSITIVITY = 1.5        # Multiplier for mouse movement speed
 
+# Idle mode: after this many frames without a hand, run inference slowly on a smaller frame
+IDLE_AFTER_FRAMES = 30
+IDLE_FPS = 5                   # Inference rate while idle
+IDLE_DOWNSCALE = 0.5           # Frame scale fed to MediaPipe while idle
+
+# Warm-up: inferences on a blank frame before the first real one (see warm_up)
+WARM_UP_FRAMES = 3
+WARM_UP_FRAME_SIZE = (640, 480)  # (width, height) of the blank frame
+
+# ROI tracking: run MediaPipe on a crop around the last seen hand
+ROI_MARGIN = 0.5               # Crop side = hand bbox side * (1 + 2 * margin)
+ROI_MIN_SIZE = 0.25            # Smallest crop side as a fraction of the frame's short side
+ROI_EDGE = 0.1                 # Re-center once the hand comes this close to the crop edge
+ROI_MIN_FILL = 0.1             # Shrink the crop once the hand covers less than this of it
+ROI_REDETECT_FRAMES = 15       # While a hand slot is free, look at the full frame this often
+
+
+# Multi-hand tracking. Both hands come from one hands.process() call; 1 saves
+# the palm detection MediaPipe keeps running while a hand slot is free.
+MAX_NUM_HANDS = 2
+CURSOR_GESTURES = ("Index Pointing", "Pinch")  # gestures that need the (single) OS cursor
+ZOOM_STEP = 0.15               # Two-hand pinch: relative spread change per zoom step
+
 # MediaPipe constants
 MP_HANDS = mp.solutions.hands
-MP_DRAWING = mp.solutions.drawing_utils
+MP_HANDS_OPTIONS = dict(
+    static_image_mode=False,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.5,
+)
+
+# --- Landmark layout ---
+# 0: Wrist
+# 4: Thumb Tip, 8: Index Tip, 12: Middle Tip, 16: Ring Tip, 20: Pinky Tip
+# Index: 8 (Tip), 6 (PIP), Middle: 12 (Tip), 10 (PIP)
+# Ring: 16 (Tip), 14 (PIP), Pinky: 20 (Tip), 18 (PIP)
+NUM_LANDMARKS = 21
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+
+# Static gestures are defined in gestures.json (patterns, priorities and the
+# pinch threshold) and compiled into a lookup table, see gesture_definitions.py.
+# Gesture codes returned by classify_batch; GESTURE_LABELS[code] is the name.
+GESTURE_TABLE = load_gestures()
+GESTURE_LABELS = GESTURE_TABLE.labels
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURE_LABELS)}
+
+# Motion gestures made with an open palm (see dynamic_gestures.py):
+# name -> (output method, arguments, action label)
+DYNAMIC_GESTURE_ACTIONS = {
+    "Swipe Right": ("hotkey", ("ctrl", "tab"), "Next Tab"),
+    "Swipe Left": ("hotkey", ("ctrl", "shift", "tab"), "Prev Tab"),
+    "Swipe Up": ("scroll", (SCROLL_SPEED,), "Scroll Up"),
+    "Swipe Down": ("scroll", (-SCROLL_SPEED,), "Scroll Down"),
+    "Circle CW": ("hotkey", ("ctrl", "+"), "Zoom In"),
+    "Circle CCW": ("hotkey", ("ctrl", "-"), "Zoom Out"),
+}
+
+# One detected hand: (21, 3) float32 landmarks, "Left"/"Right" and detection score.
+Hand = namedtuple("Hand", ["points", "handedness", "score"])
+
+
+def landmarks_to_array(landmarks):
+    """
+    Convert one hand into a contiguous (21, 3) float32 array of x, y, z.
+    Accepts a MediaPipe NormalizedLandmarkList, its `.landmark` sequence,
+    any sequence of objects with x/y(/z) attributes, or an existing array.
+    Missing entries (None) and missing z values are left at 0.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return np.ascontiguousarray(landmarks, dtype=np.float32)
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    return np.array(
+        [(0.0, 0.0, 0.0) if lm is None else (lm.x, lm.y, getattr(lm, "z", 0.0))
+         for lm in landmarks],
+        dtype=np.float32,
+    )
+
+
+def classify_batch(poses, pinch_threshold=None):
+    """
+    Classify many hand poses in one vectorized pass: a finger-state table
+    lookup plus the predicates (pinch distance, thumb direction) of gestures.json.
+    Args:
+        poses: array-like of shape (N, 21, 3) (or a single (21, 3) pose).
+        pinch_threshold: overrides the configured thumb-index pinch distance.
+    Returns:
+        int8 array of shape (N,) with codes into GESTURE_LABELS.
+    """
+    poses = np.asarray(poses, dtype=np.float32)
+    if poses.ndim == 2:
+        poses = poses[np.newaxis]
+    if pinch_threshold is None:
+        return GESTURE_TABLE.classify(poses)
+    return GESTURE_TABLE.classify(poses, pinch_threshold=pinch_threshold)
+
+
+def hands_from_results(results):
+    """Convert a MediaPipe Hands result into a list of Hand tuples."""
+    if not results.multi_hand_landmarks:
+        return []
+    handedness = results.multi_handedness or [None] * len(results.multi_hand_landmarks)
+    hands = []
+    for hand_landmarks, classification in zip(results.multi_hand_landmarks, handedness):
+        if classification is not None:
+            label, score = classification.classification[0].label, classification.classification[0].score
+        else:
+            label, score = "Unknown", 1.0
+        hands.append(Hand(landmarks_to_array(hand_landmarks), label, score))
+    return hands
+
+
+def fingertip_to_screen(x, y, screen=None):
+    """
+    Map a normalized fingertip position to (unsmoothed) screen pixels, on
+    `screen` (width, height), by default the primary screen.
+    """
+    # Use a smaller active area for better reachability
+    # e.g. Box in center of frame 20% to 80%
+    margin = CURSOR_MARGIN
+    x = min(max(float(x), margin), 1 - margin)
+    y = min(max(float(y), margin), 1 - margin)
+    
+    # Normalize to 0-1
+    x = (x - margin) / (1 - 2 * margin)
+    y = (y - margin) / (1 - 2 * margin)
+    screen_w, screen_h = screen or screen_size()
+    return x * screen_w, y * screen_h
+
+
+def screen_size():
+    """
+    Primary screen size. Queried lazily so that importing this module (for
+    replay, tests or benchmarks) needs no display; without one (pyautogui
+    cannot load) it is FALLBACK_SCREEN_SIZE. Set SCREEN_SIZE to override.
+    """
+    global SCREEN_SIZE
+    if SCREEN_SIZE is None:
+        try:
+            import pyautogui
+            SCREEN_SIZE = tuple(pyautogui.size())
+        except Exception as e:
+            print(f"No screen size available ({e!r}), using {FALLBACK_SCREEN_SIZE}")
+            SCREEN_SIZE = FALLBACK_SCREEN_SIZE
+    return SCREEN_SIZE
+
+
+def mirror_hand(hand):
+    """Mirror a hand horizontally (x -> 1 - x), swapping its handedness label."""
+    points = hand.points.copy()
+    points[:, 0] = 1.0 - points[:, 0]
+    handedness = {"Left": "Right", "Right": "Left"}.get(hand.handedness, hand.handedness)
+    return Hand(points, handedness, hand.score)
+
+
+class FramePreprocessor:
+    """
+    Mirror, crop, downscale and colour-convert frames into reusable buffers.
+    Buffers are only (re)allocated when a frame or crop size changes, so the
+    steady state allocates nothing. Returned images are overwritten by the
+    next frame; copy them if they must outlive it.
+    """
+    def __init__(self, flip_pixels=True):
+        # With flip_pixels=False, mirror() leaves the pixels alone and the
+        # caller mirrors landmark x-coordinates instead (see mirror_hand).
+        self.flip_pixels = flip_pixels
+        self._buffers = {}
+        self.bytes_allocated = 0        # during the current frame
+        self.total_bytes_allocated = 0
+        self.frames = 0
+
+    def begin_frame(self):
+        self.bytes_allocated = 0
+        self.frames += 1
+
+    def _buffer(self, name, shape):
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+            self.bytes_allocated += buf.nbytes
+            self.total_bytes_allocated += buf.nbytes
+        return buf
+
+    def mirror(self, frame):
+        """Horizontally flipped copy of a BGR frame (or the frame itself when not flipping pixels)."""
+        if not self.flip_pixels:
+            return frame
+        return cv2.flip(frame, 1, dst=self._buffer("mirror", frame.shape))
+
+    def to_rgb(self, bgr, name="rgb", scale=1.0):
+        """RGB version of a BGR image (or view), optionally downscaled first."""
+        if scale != 1.0:
+            h, w = bgr.shape[:2]
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            bgr = cv2.resize(bgr, size, dst=self._buffer(name + "_small", (size[1], size[0], 3)),
+                             interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self._buffer(name, bgr.shape))
+
+    def report(self):
+        return {
+            "bytes_last_frame": self.bytes_allocated,
+            "bytes_per_frame_avg": self.total_bytes_allocated / self.frames if self.frames else 0.0,
+        }
+
+
+class HandState:
+    """Tracking state of one hand; GestureController keeps one per handedness."""
+
+    def __init__(self, debounce=True):
+        if debounce:
+            self.debouncer = GestureDebouncer()
+        else:
+            # Pass-through: every frame commits its own label
+            self.debouncer = GestureDebouncer(window=1, enter_frames=1, exit_frames=1, min_confidence=0.0)
+        if CURSOR_FILTER == "moving_average":
+            self.cursor_filter = make_cursor_filter(CURSOR_FILTER, window=SMOOTHING_BUFFER_SIZE)
+        else:
+            self.cursor_filter = make_cursor_filter(CURSOR_FILTER)
+        # Swipes and circles from the wrist trajectory while the palm is open
+        self.dynamic_gestures = DynamicGestureEngine()
+        self.raw_gesture = "None"   # this frame's classification
+        self.gesture = "None"       # committed (debounced) gesture
+        self.points = None          # latest (21, 3) landmarks, None while out of view
+
 
 class GestureController:
-    def __init__(self):
-        self.hands = MP_HANDS.Hands(
-            static_image_mode=False,
-            max_num_hands=1,  # Focus on one hand for control
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, hands=None, output=None, roi_tracking=False, flip_pixels=True, overlay=True,
+                 debounce=True, max_num_hands=MAX_NUM_HANDS, classifier=None, screen_size=None):
+        """
+        Args:
+            hands: hand detector with a MediaPipe-style `process(rgb)`. Built
+                on first use when None, so replay never loads the graph.
+            output: object with pyautogui's moveTo/click/press/hotkey/...
+                methods that receives all input actions. Defaults to an
+                InputDispatcher, which injects them on its own thread.
+            roi_tracking: run the detector on a crop around the previous hand
+                instead of the full frame while a hand is being tracked.
+            flip_pixels: mirror by flipping the image (default) rather than by
+                mirroring landmark x-coordinates after detection.
+            overlay: draw landmarks and labels onto the returned frame. Turn
+                off for headless use or when a PreviewWindow does the drawing.
+            debounce: act only on gestures held for a few frames (see
+                gesture_debounce.py) instead of on every raw per-frame label.
+            max_num_hands: hands to track. Each gets its own smoothing,
+                debouncing and swipe state; two pinching hands zoom.
+            classifier: optional LandmarkClassifier (see landmark_classifier.py)
+                used instead of the gestures.json rules. Gestures it knows
+                that have no action here are shown but do nothing.
+            screen_size: (width, height) the cursor is mapped to; default
+                the primary screen (see screen_size()).
+        """
+        self.hands = hands
+        self.screen_size = screen_size
+        if output is None:
+            output = InputDispatcher()
+            output.start()
+        self.output = output
+        self.preprocessor = FramePreprocessor(flip_pixels)
+        self.overlay = overlay
+        # Optional PreviewWindow (see gesture_overlay.py) fed after every frame
+        self.preview = None
+        
+        # Per-stage latency histograms (see pipeline_timing.py)
+        self.timing = PipelineTimer()
+        self.show_timing = False       # draw stage latencies on the overlay
+        
+        # ROI tracking state: crop (x0, y0, x1, y1) in pixels, None = full frame
+        self.roi_tracking = roi_tracking
+        self.roi = None
+        self.roi_hands = 0             # hands in view when the crop was last set from the full frame
+        self.frames_since_full = 0
+        self.pixels_processed = 0
+        self.pixels_full = 0
+        
+        # Optional LandmarkRecorder (see landmark_recording.py)
+        self.recorder = None
+        
+        # Optional learned classifier replacing classify_batch
+        self.classifier = classifier
         
         # State variables
-        self.prev_time = 0
-        self.last_action_time = 0
-        self.last_click_time = 0
-        self.current_gesture = "None"
+        # -inf, not 0: media timestamps (replay, process_source) start at 0,
+        # and a cooldown "since 0" would swallow the first click and actions
+        self.last_action_time = float("-inf")
+        self.last_click_time = float("-inf")
+        self.current_gesture = "None"   # committed gesture of the primary hand
+        self.raw_gesture = "None"       # its classification this frame
         
-        # Smoothing buffers
-        self.cursor_queue = deque(maxlen=SMOOTHING_BUFFER_SIZE)
+        # Per-hand state (see HandState), keyed by handedness
+        self.max_num_hands = max_num_hands
+        self.debounce = debounce
+        self.hand_states = {}
         
-        # Mouse state
+        # Mouse state: there is one OS cursor and button, owned by one hand at a time
         self.is_dragging = False
+        self.cursor_hand = None
         
-        # For swipe detection (simple history of X positions)
-        self.palm_x_history = deque(maxlen=10)
+        # Two-hand pinch zoom: hand spread when the last zoom step fired
+        self.zoom_spread = None
+        
+        # Idle/active state (see _update_idle_state)
+        self.idle = False
+        self.idle_after_frames = IDLE_AFTER_FRAMES
+        self.idle_fps = IDLE_FPS
+        self.idle_downscale = IDLE_DOWNSCALE
+        self.frames_without_hand = 0
+        self.last_empty_time = None
+        self.wake_count = 0
+        self.wake_latency_total = 0.0
+        self.wake_latency_max = 0.0
+        self.warm_up_time = None        # seconds, once warm_up() has run
         
-    def _get_distance(self, p1, p2):
-        """Euclidean distance between two landmarks."""
-        return math.hypot(p1.x - p2.x, p1.y - p2.y)
-
-    def _is_finger_up(self, landmarks, finger_tip_idx, finger_dip_idx):
-        """Check if a finger is extended (Tip above DIP joint - Y is inverted in screen coords)."""
-        return landmarks[finger_tip_idx].y < landmarks[finger_dip_idx].y
-
     def detect_gesture(self, landmarks):
         """
         Classify the hand gesture based on landmarks.
+        Accepts MediaPipe landmarks or a (21, 3) array (see landmarks_to_array).
         Returns: gesture_name (str)
         """
-        # Landmarks map:
-        # 0: Wrist
-        # 4: Thumb Tip, 8: Index Tip, 12: Middle Tip, 16: Ring Tip, 20: Pinky Tip
-        # Joints needed for logic: 
-        # Thumb: 4 (Tip), 3 (IP), 2 (MCP) -- Thumb logic is tricky, usually check x/y relative to palm
-        # Index: 8 (Tip), 6 (PIP)
-        # Middle: 12 (Tip), 10 (PIP)
-        # Ring: 16 (Tip), 14 (PIP)
-        # Pinky: 20 (Tip), 18 (PIP)
-
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        ring_tip = landmarks[16]
-        pinky_tip = landmarks[20]
-        
-        wrist = landmarks[0]
-        
-        # Fingers extended status
-        # Note: simplistic check "y < y_lower_joint" works for upright hand. 
-        # For more robustness in all angles, we'd need vector math, but this suffices for a "Webcam Control" usually held upright.
-        index_up = index_tip.y < landmarks[6].y
-        middle_up = middle_tip.y < landmarks[10].y
-        ring_up = ring_tip.y < landmarks[14].y
-        pinky_up = pinky_tip.y < landmarks[18].y
-        
-        # Thumb is defined differently (usually by x offset or distance from index base)
-        # Simple check: Thumb tip is far from pinky base
-        # thumb_up = thumb_tip.y < landmarks[3].y # Can be unreliable if hand is tilted
-        
-        # Count raised fingers (excluding thumb for now to keep it simple)
-        raised_fingers = sum([index_up, middle_up, ring_up, pinky_up])
-        
-        # --- Gesture Logic ---
-        
-        # 1. FIST (Stop / Idle)
-        # All fingers curled down
-        if raised_fingers == 0:
-            # Check thumb position to confirm strict fist or just closed hand
-            return "Fist"
-
-        # 2. OPEN PALM (Pause / Reset)
-        # All fingers up
-        if raised_fingers == 4:
-            # Check if thumb is also "out" (approx)
-            return "Open Palm"
-
-        # 3. PINCH (Drag)
-        # Index and Thumb tips are very close
-        dist_thumb_index = self._get_distance(thumb_tip, index_tip)
-        if dist_thumb_index < 0.05: # Threshold is percentage of screen, tune if needed
-            return "Pinch"
-
-        # 4. TWO FINGERS (Left Click / Peace Sign)
-        if index_up and middle_up and not ring_up and not pinky_up:
-            return "Two Fingers"
-            
-        # 5. INDEX POINTING (Mouse Move)
-        if index_up and not middle_up and not ring_up and not pinky_up:
-            return "Index Pointing"
-
-        # 6. THUMBS UP / DOWN
-        # Fingers are curled (like fist) but thumb is extended
-        if raised_fingers == 0: # Checks strictly curled fingers
-             # Thumb y comparison vs Wrist y
-             # Y increases downwards. 
-             # Thumb Up: Thumb Tip Y < Wrist Y (significantly)
-             # Thumb Down: Thumb Tip Y > Wrist Y
-             if thumb_tip.y < wrist.y - 0.1: # Threshold
-                 return "Thumb Up"
-             if thumb_tip.y > wrist.y + 0.1:
-                 return "Thumb Down"
-        
-        # 7. SWIPE (Movement based, returns special state or handled in history)
-        # (This is better handled by tracking wrist movement over frames, not static)
+        points = landmarks_to_array(landmarks)
+        return self.classify(points[np.newaxis])[0]
+
+    def classify(self, poses):
+        """Gesture names of an (N, 21, 3) batch, from the learned classifier if set, else the rules."""
+        if self.classifier is not None:
+            return self.classifier.predict(poses)
+        return [GESTURE_LABELS[code] for code in classify_batch(poses)]
 
-        return "Unknown"
+    def _create_hands(self):
+        return MP_HANDS.Hands(max_num_hands=self.max_num_hands, **MP_HANDS_OPTIONS)
 
-    def process_frame(self, frame, mirror=True):
+    def warm_up(self, frames=WARM_UP_FRAMES, frame_size=WARM_UP_FRAME_SIZE):
+        """
+        Build the hand detector and run a few inferences on a blank frame, so
+        the first camera frame does not pay for graph construction and
+        first-run initialization. Safe to call from a background thread
+        before the camera is open. Waits for an inference worker (RemoteHands)
+        to load its model first.
+        Returns: seconds spent (also kept in self.warm_up_time)
+        """
+        start = time.perf_counter()
+        if self.hands is None:
+            self.hands = self._create_hands()
+        if hasattr(self.hands, "wait_ready"):
+            self.hands.wait_ready()
+        width, height = frame_size
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        for _ in range(frames):
+            self.hands.process(blank)
+        # The learned classifier loads its model file on first use, too
+        self.classify(np.zeros((1, NUM_LANDMARKS, 3), dtype=np.float32))
+        self.warm_up_time = time.perf_counter() - start
+        return self.warm_up_time
+
+    def process_frame(self, frame, mirror=True, now=None):
         """
         Main processing function.
         Args:
             frame: OpenCV BGR frame.
             mirror: Whether to flip the frame horizontally (default True for webcam).
+            now: frame timestamp for cooldowns and gestures (default:
+                time.time()); recorded footage passes its media time.
         Returns:
-            processed_frame: Frame with overlays.
-            gesture_info: Dict with 'name', 'action'.
+            processed_frame: Frame with overlays. This is a reused buffer when
+                the frame was mirrored, or the input frame when it was not
+                (including mirror=True with flip_pixels=False).
+            gesture_name: Name of the detected gesture.
         """
+        self.timing.begin_frame()
+        self.preprocessor.begin_frame()
         if mirror:
-            frame = cv2.flip(frame, 1)
+            with self.timing.stage("preprocess"):
+                frame = self.preprocessor.mirror(frame)
             
         frame_h, frame_w, _ = frame.shape
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        if self.hands is None:
+            self.hands = self._create_hands()
+        image_hands = self._detect(frame)  # in the coordinates of `frame`
+        landmarks_mirrored = mirror and not self.preprocessor.flip_pixels
+        hands = [mirror_hand(hand) for hand in image_hands] if landmarks_mirrored else image_hands
         
-        action_taken = None
-        gesture_name = "None"
+        if now is None:
+            now = time.time()
+        if self.recorder is not None:
+            self.recorder.append(now, hands)
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw landmarks
-                MP_DRAWING.draw_landmarks(frame, hand_landmarks, MP_HANDS.HAND_CONNECTIONS)
-                
-                # Detect Gesture
-                gesture_name = self.detect_gesture(hand_landmarks.landmark)
-                self.current_gesture = gesture_name
-                
-                # Execute Logic based on Gesture
-                action_taken = self._handle_gesture_action(gesture_name, hand_landmarks, frame_w, frame_h)
-                
-                # Handle Swipe Logic (independent of static pose usually, but here tied to Open Palm)
-                if gesture_name == "Open Palm":
-                    self._handle_swipe(hand_landmarks.landmark[0].x) # Track wrist X
-                else:
-                    self.palm_x_history.clear()
-
-        else:
-            self.current_gesture = "None"
-            self.palm_x_history.clear()
+        gesture_name, action_taken = self.process_hands(hands, frame_w, frame_h, now)
             
         # Overlay Info
-        cv2.putText(frame, f"Gesture: {gesture_name}", (10, 30), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        if action_taken:
-            cv2.putText(frame, f"Action: {action_taken}", (10, 70), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+        with self.timing.stage("overlay"):
+            if self.overlay:
+                draw_overlay(frame, image_hands, gesture_name, action_taken)
+                if self.show_timing:
+                    draw_timing(frame, self.timing)
+            if self.preview is not None:
+                self.preview.submit(frame, image_hands, gesture_name, action_taken,
+                                    flip=landmarks_mirrored, show_timing=self.show_timing)
+        self.timing.end_frame()
             
         return frame, gesture_name
 
-    def _handle_gesture_action(self, gesture, landmarks, frame_w, frame_h):
-        """Execute system commands logic with cooldowns."""
-        current_time = time.time()
+    def _detect(self, frame):
+        """
+        Run the hand detector on a BGR frame, inside the tracked ROI when possible.
+        Returns: Hand tuples in full-frame normalized coordinates.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        self.pixels_full += frame_w * frame_h
+        
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            crop = frame[y0:y1, x0:x1]
+            self.pixels_processed += crop.shape[0] * crop.shape[1]
+            with self.timing.stage("preprocess"):
+                rgb_crop = self.preprocessor.to_rgb(crop, "crop")
+            with self.timing.stage("detect"):
+                results = self.hands.process(rgb_crop)
+            if results.multi_hand_landmarks:
+                hands = hands_from_results(results)
+                for hand in hands:
+                    # Crop-normalized -> frame-normalized (z shares the x scale)
+                    hand.points[:, 0] = (x0 + hand.points[:, 0] * (x1 - x0)) / frame_w
+                    hand.points[:, 1] = (y0 + hand.points[:, 1] * (y1 - y0)) / frame_h
+                    hand.points[:, 2] *= (x1 - x0) / frame_w
+                # A hand that left the crop, or a new one elsewhere, needs the full frame
+                lost_one = len(hands) < self.roi_hands
+                look_for_more = len(hands) < self.max_num_hands and self.frames_since_full >= ROI_REDETECT_FRAMES
+                if not (lost_one or look_for_more):
+                    self._update_roi(hands, frame_w, frame_h)
+                    self.frames_since_full += 1
+                    return hands
+            # Hand lost: fall back to full-frame detection on this same frame
+            self.roi = None
+        
+        # Landmarks are normalized, so the smaller idle frame needs no remapping
+        with self.timing.stage("preprocess"):
+            rgb_frame = self.preprocessor.to_rgb(frame, scale=self.idle_downscale if self.idle else 1.0)
+        self.pixels_processed += rgb_frame.shape[0] * rgb_frame.shape[1]
+        with self.timing.stage("detect"):
+            results = self.hands.process(rgb_frame)
+        hands = hands_from_results(results)
+        self.frames_since_full = 0
+        if self.roi_tracking and hands:
+            self._update_roi(hands, frame_w, frame_h)
+            self.roi_hands = len(hands)
+        return hands
+
+    def _update_roi(self, hands, frame_w, frame_h):
+        """Keep the crop steady while the hand is well inside it, else re-center it."""
+        pts = np.concatenate([hand.points[:, :2] for hand in hands]) * (frame_w, frame_h)
+        (bx0, by0), (bx1, by1) = pts.min(axis=0), pts.max(axis=0)
+        
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            edge = ROI_EDGE * min(x1 - x0, y1 - y0)
+            inside = bx0 - x0 > edge and x1 - bx1 > edge and by0 - y0 > edge and y1 - by1 > edge
+            filled = (bx1 - bx0) * (by1 - by0) > ROI_MIN_FILL * (x1 - x0) * (y1 - y0)
+            if inside and filled:
+                return
+        
+        side = max(bx1 - bx0, by1 - by0) * (1 + 2 * ROI_MARGIN)
+        side = max(side, ROI_MIN_SIZE * min(frame_w, frame_h))
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        x1, y1 = int(min(frame_w, cx + side / 2)), int(min(frame_h, cy + side / 2))
+        self.roi = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
+
+    def roi_report(self):
+        """Share of full-frame pixels actually handed to the detector."""
+        return {
+            "roi": self.roi,
+            "pixel_fraction": self.pixels_processed / self.pixels_full if self.pixels_full else 1.0,
+        }
+
+    def process_hands(self, hands, frame_w, frame_h, now=None):
+        """
+        Gesture logic for already detected hands, shared by the live path and replay.
+        Args:
+            hands: list of Hand tuples (empty when no hand is visible).
+            frame_w, frame_h: size of the frame the hands were detected in.
+            now: timestamp used for cooldowns (default: time.time()).
+        Returns:
+            (gesture_name, action_taken) of the primary hand (the one holding
+            the cursor, else the first one), or "Pinch Zoom" for two pinching hands.
+        """
+        if now is None:
+            now = time.time()
+        self._update_idle_state(bool(hands), now)
+        action_taken = None
+        
+        keys = self._hand_keys(hands)
+        visible = []
+        if hands:
+            # Classify every hand together in one pass
+            with self.timing.stage("classify"):
+                poses = np.stack([hand.points for hand in hands])
+                labels = self.classify(poses)
+            
+            for key, hand, points, label in zip(keys, hands, poses, labels):
+                state = self._hand_state(key)
+                state.points = points
+                state.raw_gesture = label
+                # Act on the committed gesture, not on a single frame's label
+                state.gesture = state.debouncer.update(state.raw_gesture, hand.score)
+                visible.append((key, state))
+        
+        with self.timing.stage("dispatch"):
+            for key, state in self.hand_states.items():
+                if key not in keys:
+                    action_taken = self._hand_lost(key, state, frame_w, frame_h, now) or action_taken
+            
+            if len(visible) == 2 and all(state.gesture == "Pinch" for _, state in visible):
+                action_taken = self._handle_two_hand_zoom(visible[0][1], visible[1][1], frame_w, frame_h)
+            else:
+                self.zoom_spread = None
+                for key, state in visible:
+                    # Execute Logic based on Gesture
+                    action = self._handle_gesture_action(state.gesture, state.points, frame_w, frame_h, now, key)
+                    
+                    # Motion gestures are tracked while the palm is open; closing it ends the stroke
+                    dynamic_action = self._handle_dynamic_gesture(
+                        state, state.points if state.gesture == "Open Palm" else None, frame_w, frame_h, now)
+                    action_taken = dynamic_action or action or action_taken
+        
+        if not visible:
+            self.current_gesture = self.raw_gesture = gesture_name = "None"
+        else:
+            primary = self.hand_states[self.cursor_hand] if self.cursor_hand in keys else visible[0][1]
+            self.current_gesture, self.raw_gesture = primary.gesture, primary.raw_gesture
+            gesture_name = "Pinch Zoom" if self.zoom_spread is not None else primary.gesture
+        return gesture_name, action_taken
+
+    def _hand_keys(self, hands):
+        """State key of each hand: its handedness, made unique if two hands claim the same side."""
+        keys = []
+        for hand in hands:
+            key = hand.handedness
+            if key in keys:
+                key = {"Left": "Right", "Right": "Left"}.get(key, key)
+            if key in keys:
+                key = f"{hand.handedness}#{len(keys)}"
+            keys.append(key)
+        return keys
+
+    def _hand_state(self, key):
+        state = self.hand_states.get(key)
+        if state is None:
+            state = self.hand_states[key] = HandState(self.debounce)
+        return state
+
+    def _hand_lost(self, key, state, frame_w, frame_h, now):
+        """Update a hand that is out of view this frame; returns an action label or None."""
+        state.points = None
+        state.raw_gesture = "None"
+        state.gesture = state.debouncer.update("None")
+        state.cursor_filter.reset()
+        if self.cursor_hand == key:
+            if self.is_dragging and state.gesture != "Pinch":
+                # Hand gone for good: don't leave the mouse button held
+                self.output.mouseUp()
+                self.is_dragging = False
+            if state.gesture not in CURSOR_GESTURES:
+                self.cursor_hand = None
+        # A swipe that ends out of view still counts
+        return self._handle_dynamic_gesture(state, None, frame_w, frame_h, now)
+
+    def _handle_two_hand_zoom(self, first, second, frame_w, frame_h):
+        """Both hands pinching: spreading them zooms in, bringing them together zooms out."""
+        if self.is_dragging:
+            # The first hand's pinch started a drag before the second one joined
+            self.output.mouseUp()
+            self.is_dragging = False
+        self.cursor_hand = None
+        
+        aspect = frame_w / frame_h if frame_h else 1.0
+        dx, dy = first.points[INDEX_TIP, :2] - second.points[INDEX_TIP, :2]
+        spread = math.hypot(dx * aspect, dy)
+        if self.zoom_spread is None:
+            self.zoom_spread = spread
+            return None
+        if spread > self.zoom_spread * (1 + ZOOM_STEP):
+            self.output.hotkey('ctrl', '+')
+            self.zoom_spread = spread
+            return "Zoom In"
+        if spread < self.zoom_spread * (1 - ZOOM_STEP):
+            self.output.hotkey('ctrl', '-')
+            self.zoom_spread = spread
+            return "Zoom Out"
+        return None
+
+    def _update_idle_state(self, hand_present, now):
+        """Switch to idle after idle_after_frames empty frames; wake on the first hand."""
+        if hand_present:
+            if self.idle:
+                self.idle = False
+                # The hand arrived some time after the last empty check: upper bound
+                latency = now - self.last_empty_time
+                self.wake_count += 1
+                self.wake_latency_total += latency
+                self.wake_latency_max = max(self.wake_latency_max, latency)
+            self.frames_without_hand = 0
+        else:
+            self.frames_without_hand += 1
+            self.last_empty_time = now
+            if not self.idle and self.frames_without_hand >= self.idle_after_frames:
+                self.idle = True
+
+    def idle_report(self):
+        """Wake-up statistics for tuning IDLE_* settings."""
+        return {
+            "idle": self.idle,
+            "wakeups": self.wake_count,
+            "wake_latency_avg_ms": 1000 * self.wake_latency_total / self.wake_count if self.wake_count else 0.0,
+            "wake_latency_max_ms": 1000 * self.wake_latency_max,
+            "warm_up_ms": 1000 * self.warm_up_time if self.warm_up_time is not None else None,
+        }
+
+    def _handle_gesture_action(self, gesture, landmarks, frame_w, frame_h, now=None, hand="Right"):
+        """
+        Execute system commands logic with cooldowns.
+        `landmarks` is the hand's (21, 3) array from landmarks_to_array and
+        `hand` its key in hand_states.
+        """
+        current_time = time.time() if now is None else now
+        
+        # --- 0. CURSOR OWNERSHIP (one hand at a time moves and drags) ---
+        if gesture != "Pinch" and self.is_dragging and self.cursor_hand == hand:
+            self.output.mouseUp()
+            self.is_dragging = False
+        if gesture in CURSOR_GESTURES:
+            if self.cursor_hand not in (None, hand):
+                return None  # the other hand has the cursor
+            self.cursor_hand = hand
+        elif self.cursor_hand == hand:
+            self.cursor_hand = None
         
         # --- 1. MOUSE MOVE (Index Pointing) ---
         if gesture == "Index Pointing":
             # Map index finger tip to screen
-            tip = landmarks.landmark[8]
-            
-            # Use a smaller active area for better reachability
-            # e.g. Box in center of frame 20% to 80%
-            margin = 0.2
-            x = np.clip(tip.x, margin, 1 - margin)
-            y = np.clip(tip.y, margin, 1 - margin)
-            
-            # Normalize to 0-1
-            x = (x - margin) / (1 - 2 * margin)
-            y = (y - margin) / (1 - 2 * margin)
-            
-            screen_x = int(x * SCREEN_WIDTH)
-            screen_y = int(y * SCREEN_HEIGHT)
-            
-            # Smooth
-            self.cursor_queue.append((screen_x, screen_y))
-            avg_x = int(sum(c[0] for c in self.cursor_queue) / len(self.cursor_queue))
-            avg_y = int(sum(c[1] for c in self.cursor_queue) / len(self.cursor_queue))
-            
-            pyautogui.moveTo(avg_x, avg_y)
+            screen_x, screen_y = self._cursor_target(landmarks[INDEX_TIP], current_time, hand)
+            self.output.moveTo(screen_x, screen_y)
             return "Moving Mouse"
 
         # --- 2. LEFT CLICK (Two Fingers) ---
         if gesture == "Two Fingers":
             if current_time - self.last_click_time > CLICK_COOLDOWN_SECONDS:
-                pyautogui.click()
+                self.output.click()
                 self.last_click_time = current_time
                 return "Left Click"
             return "Click Cooldown"
@@ -226,31 +680,25 @@ class GestureController:
         # --- 3. DRAG (Pinch) ---
         if gesture == "Pinch":
             if not self.is_dragging:
-                pyautogui.mouseDown()
+                self.output.mouseDown()
                 self.is_dragging = True
             
-            # Move while dragging (same logic as Index Pointing but using midpoint of pinch)
-            # Or just use Index tip for simplicity
-            tip = landmarks.landmark[8]
-            screen_x = int(tip.x * SCREEN_WIDTH)
-            screen_y = int(tip.y * SCREEN_HEIGHT)
-            pyautogui.moveTo(screen_x, screen_y)
+            # Move while dragging (same mapping and smoothing as Index Pointing,
+            # so the cursor does not jump when the pinch starts)
+            screen_x, screen_y = self._cursor_target(landmarks[INDEX_TIP], current_time, hand)
+            self.output.moveTo(screen_x, screen_y)
             return "Dragging"
-        else:
-            if self.is_dragging:
-                pyautogui.mouseUp()
-                self.is_dragging = False
 
         # --- 4. VOLUME CONTROL (Thumbs) ---
         if gesture == "Thumb Up":
             if current_time - self.last_action_time > 0.2: # Fast repeat
-                pyautogui.press("volumeup")
+                self.output.press("volumeup")
                 self.last_action_time = current_time
                 return "Volume Up"
         
         if gesture == "Thumb Down":
             if current_time - self.last_action_time > 0.2:
-                pyautogui.press("volumedown")
+                self.output.press("volumedown")
                 self.last_action_time = current_time
                 return "Volume Down"
 
@@ -261,54 +709,72 @@ class GestureController:
 
         return None
 
-    def _handle_swipe(self, current_x):
-        """Simple history-based swipe detection for Open Palm."""
-        self.palm_x_history.append(current_x)
-        if len(self.palm_x_history) < 3:
-            return
+    def _cursor_target(self, tip, now, hand="Right"):
+        """Map a fingertip to a screen position, smoothed by that hand's filter."""
+        cursor_filter = self._hand_state(hand).cursor_filter
+        smooth_x, smooth_y = cursor_filter(*fingertip_to_screen(tip[0], tip[1], self.screen_size), now)
+        return int(smooth_x), int(smooth_y)
 
-        # Check net movement over last few frames
-        start_x = self.palm_x_history[0]
-        end_x = self.palm_x_history[-1]
-        delta = end_x - start_x
-        
-        current_time = time.time()
-        
-        if abs(delta) > 0.15 and (current_time - self.last_action_time > GESTURE_COOLDOWN_SECONDS):
-            if delta > 0: # Moving Right (flipped frame means actual hand went Left relative to camera user?)
-                # Note: Frame is mirrored. 
-                # If User moves hand Left -> Camera sees Right -> x increases.
-                # So "delta > 0" is technically "Swipe Right" in the *image*, which is User's "Swipe Left" (Next Tab?).
-                # Let's map delta > 0 to "Next" (Swipe Right in air)
-                pyautogui.hotkey('ctrl', 'tab')
-                print("Swipe Right detected -> Next Tab")
-            else:
-                pyautogui.hotkey('ctrl', 'shift', 'tab')
-                print("Swipe Left detected -> Prev Tab")
-            
-            self.last_action_time = current_time
-            self.palm_x_history.clear() # Reset to prevent double swipe
+    def _handle_dynamic_gesture(self, state, points, frame_w, frame_h, now):
+        """
+        Feed the wrist trajectory to the hand's dynamic gesture engine and run
+        the action of a recognized swipe or circle.
+        Args:
+            state: the hand's HandState.
+            points: the hand's (21, 3) landmarks, or None to end the current
+                stroke (palm closed or hand lost) and start afresh.
+        Returns:
+            The action label, or None.
+        """
+        engine = state.dynamic_gestures
+        if points is None:
+            match = engine.end_stroke()
+            engine.reset()
+        else:
+            # Both axes in frame heights, so circles stay round
+            aspect = frame_w / frame_h if frame_h else 1.0
+            match = engine.update(now, float(points[WRIST, 0]) * aspect, float(points[WRIST, 1]))
+        if match is None or now - self.last_action_time <= GESTURE_COOLDOWN_SECONDS:
+            return None
+
+        # Note: the frame is mirrored, so "Swipe Right" is a swipe to the user's right
+        name = match[0]
+        method, args, action = DYNAMIC_GESTURE_ACTIONS[name]
+        getattr(self.output, method)(*args)
+        print(f"{name} detected -> {action}")
+        self.last_action_time = now
+        return action
 
     def release(self):
-        self.hands.close()
+        if self.hands is not None:
+            self.hands.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if isinstance(self.output, InputDispatcher):
+            self.output.stop()
 
 if __name__ == "__main__":
-    # Test harness
+    # Test harness: python gesture_controller.py [camera index | video file | image directory]
+    import sys
+    from frame_sources import open_source
     print("Starting Gesture Controller Test...")
     gc = GestureController()
-    cap = cv2.VideoCapture(0)
+    gc.show_timing = True
+    source = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
+    source.start()
     
     try:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            
+        for frame, _ in source:
             processed, name = gc.process_frame(frame)
             cv2.imshow("Gesture Control Test", processed)
             
             if cv2.waitKey(5) & 0xFF == 27: # ESC
                 break
     finally:
-        cap.release()
+        source.stop()
         cv2.destroyAllWindows()
         gc.release()
+        stats = source.stats()
+        print(f"decode     avg {stats['decode_avg_ms']:.1f} ms  p95 {stats['decode_p95_ms']:.1f} ms")
+        for stage, summary in gc.timing.report().items():
+            print(f"{stage:<10} p50 {summary['p50_ms']:.1f} ms  p95 {summary['p95_ms']:.1f} ms  p99 {summary['p99_ms']:.1f} ms")
@@ -0,0 +1,159 @@
+"""
+Streaming debounce and hysteresis for per-frame gesture labels.
+
+GestureDebouncer keeps the last `window` raw labels with their confidences.
+A gesture is committed once it holds at least `enter_frames` votes in the
+window with enough mean confidence (the dwell), and it stays committed until
+its votes drop below `exit_frames` (the hysteresis) or another gesture
+qualifies. A single misclassified frame can therefore never trigger a click.
+Each update is O(1): one ring-buffer slot and two running per-label sums.
+
+Run it over recordings to pick settings:
+    python gesture_debounce.py session.lmk [more.lmk ...]
+"""
+import sys
+
+import numpy as np
+
+DEBOUNCE_WINDOW = 6
+DEBOUNCE_ENTER_FRAMES = 3      # dwell: votes needed to commit
+DEBOUNCE_EXIT_FRAMES = 2       # hysteresis: votes needed to stay committed
+DEBOUNCE_MIN_CONFIDENCE = 0.5  # mean confidence needed to commit
+SHORT_COMMIT_FRAMES = 5        # commits released sooner than this count as flicker
+
+
+class GestureDebouncer:
+    """Fixed-window vote counter with separate enter and exit thresholds."""
+
+    def __init__(self, window=DEBOUNCE_WINDOW, enter_frames=DEBOUNCE_ENTER_FRAMES,
+                 exit_frames=DEBOUNCE_EXIT_FRAMES, min_confidence=DEBOUNCE_MIN_CONFIDENCE,
+                 released="None"):
+        """`released` is reported while no gesture is committed."""
+        if not 0 < exit_frames <= enter_frames <= window:
+            raise ValueError("need 0 < exit_frames <= enter_frames <= window")
+        self.window = window
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+        self.min_confidence = min_confidence
+        self.released = released
+        self.reset()
+
+    def reset(self):
+        self._labels = [None] * self.window
+        self._confidences = [0.0] * self.window
+        self._pos = 0
+        self._counts = {}
+        self._confidence_sums = {}
+        self.committed = self.released
+
+    def update(self, label, confidence=1.0):
+        """Add one frame's raw label; returns the committed gesture."""
+        old = self._labels[self._pos]
+        if old is not None:
+            self._counts[old] -= 1
+            self._confidence_sums[old] -= self._confidences[self._pos]
+        self._labels[self._pos] = label
+        self._confidences[self._pos] = confidence
+        self._pos = (self._pos + 1) % self.window
+        count = self._counts[label] = self._counts.get(label, 0) + 1
+        self._confidence_sums[label] = self._confidence_sums.get(label, 0.0) + confidence
+
+        if label != self.committed:
+            if (count >= self.enter_frames
+                    and self._confidence_sums[label] >= self.min_confidence * count):
+                self.committed = label
+            elif self.committed != self.released and self._counts.get(self.committed, 0) < self.exit_frames:
+                # Lost the votes to stay committed, and nothing else qualifies yet
+                self.committed = self.released
+        return self.committed
+
+
+def debounce_report(raw_labels, timestamps, truth=None, confidences=None, **settings):
+    """
+    Replay a label stream through a GestureDebouncer.
+    Args:
+        raw_labels: per-frame raw gesture names.
+        timestamps: per-frame times in seconds.
+        truth: optional per-frame ground-truth names (None = unlabeled frame).
+            Without it, commits released within SHORT_COMMIT_FRAMES count as false.
+        confidences: optional per-frame confidences (default 1.0).
+        settings: GestureDebouncer keyword arguments.
+    Returns:
+        dict with commits, false_triggers, false_trigger_rate, false_triggers_per_min
+        and commit latency (from the onset of the raw run to the commit) in ms.
+    """
+    debouncer = GestureDebouncer(**settings)
+    if confidences is None:
+        confidences = [1.0] * len(raw_labels)
+    commits = []        # (frame, label)
+    latencies = []
+    run_start = 0
+    previous = debouncer.committed
+    for i, (label, confidence) in enumerate(zip(raw_labels, confidences)):
+        if i and label != raw_labels[i - 1]:
+            run_start = i
+        committed = debouncer.update(label, confidence)
+        if committed != previous:
+            if committed not in ("None", "Unknown"):
+                commits.append((i, committed))
+                if committed == label:
+                    latencies.append(timestamps[i] - timestamps[run_start])
+            previous = committed
+
+    false_triggers = 0
+    for n, (frame, label) in enumerate(commits):
+        if truth is not None:
+            false_triggers += truth[frame] is not None and truth[frame] != label
+        else:
+            end = commits[n + 1][0] if n + 1 < len(commits) else len(raw_labels)
+            false_triggers += end - frame < SHORT_COMMIT_FRAMES
+    minutes = (timestamps[-1] - timestamps[0]) / 60 if len(timestamps) > 1 else 0.0
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "commits": len(commits),
+        "false_triggers": int(false_triggers),
+        "false_trigger_rate": false_triggers / len(commits) if commits else 0.0,
+        "false_triggers_per_min": false_triggers / minutes if minutes else 0.0,
+        "commit_latency_avg_ms": float(latencies.mean()) if len(latencies) else 0.0,
+        "commit_latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+    }
+
+
+def recording_labels(path):
+    """
+    (raw_labels, timestamps, truth, confidences) of the first hand in a
+    recording, one entry per camera frame: a run without hands gives one
+    "None" per frame, as the live debouncer sees it.
+    """
+    from gesture_controller import GESTURE_LABELS, classify_batch
+    from landmark_recording import LandmarkRecording, decode_points
+
+    recording = LandmarkRecording(path)
+    t, index = recording.timeline()
+    first = recording.records[index]          # the record starting each frame holds its first hand
+    has_hand = first["num_hands"] > 0
+    codes = classify_batch(decode_points(first))
+    raw = [GESTURE_LABELS[c] if h else "None" for c, h in zip(codes, has_hand)]
+    truth = [recording.labels[l] if h and l >= 0 else None for l, h in zip(first["label"], has_hand)]
+    confidences = np.where(has_hand, first["score"] / 255, 1.0).tolist()
+    return raw, t.tolist(), truth if any(truth) else None, confidences
+
+
+def main(argv):
+    grid = [dict(window=w, enter_frames=e, exit_frames=x)
+            for w, e, x in ((1, 1, 1), (4, 2, 1), (6, 3, 2), (8, 4, 2), (10, 6, 3))]
+    for path in argv:
+        raw, t, truth, confidences = recording_labels(path)
+        print(f"{path}: {len(raw)} frames, {'labelled' if truth else 'unlabelled (flicker proxy)'}")
+        print(f"  {'window/enter/exit':<18} {'commits':>8} {'false':>6} {'rate':>6} {'/min':>6} "
+              f"{'lat avg':>8} {'lat p95':>8}")
+        for settings in grid:
+            r = debounce_report(raw, t, truth, confidences, **settings)
+            name = "{window}/{enter_frames}/{exit_frames}".format(**settings)
+            print(f"  {name:<18} {r['commits']:8d} {r['false_triggers']:6d} {r['false_trigger_rate']:6.2f} "
+                  f"{r['false_triggers_per_min']:6.1f} {r['commit_latency_avg_ms']:8.0f} "
+                  f"{r['commit_latency_p95_ms']:8.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,350 @@
+"""
+Data-driven static gesture definitions.
+
+Static gestures are described in a JSON file (gestures.json) instead of an
+if-chain. Each definition has a name, a finger pattern and optional
+predicates:
+
+    {"name": "Two Fingers", "fingers": "?1100"}
+    {"name": "Pinch", "fingers": "?????",
+     "when": [{"distance": ["THUMB_TIP", "INDEX_FINGER_TIP"], "max": "pinch_threshold"}]}
+
+`fingers` gives thumb, index, middle, ring and pinky: 1 extended, 0 folded,
+? either. Predicates are
+    {"distance": [a, b], "min": lo, "max": hi}   2D distance between landmarks
+    {"direction": [a, b], "is": "up"}            a->b points mostly up/down/left/right
+where a bound is a number or the name of an entry of "parameters". A pose
+gets the first definition (file order is priority) whose pattern and
+predicates all match, else "Unknown".
+
+compile_gestures() turns the list into a 32-entry table indexed by the 5-bit
+finger state, holding the first unconditional gesture of every state, plus
+the few predicate gestures that outrank that entry somewhere. Every test
+(finger states and predicates alike) is a sign test on a linear combination
+of landmark differences and their squares, so classifying poses, one or
+many, is a float32 matrix product giving a bit per test and one lookup in a
+table indexed by all the bits. The table is those bits run once through the
+rules for every combination; configs with too many tests for a table apply
+the same rules to the bits of each call instead.
+The compiler also reports definitions that can never win (unreachable) and
+pairs with the same conditions matching the same states (overlapping).
+
+    python gesture_definitions.py [gestures.json]    # print the table and issues
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+# MediaPipe HandLandmark names, in landmark order
+LANDMARK_NAMES = (
+    "WRIST",
+    "THUMB_CMC", "THUMB_MCP", "THUMB_IP", "THUMB_TIP",
+    "INDEX_FINGER_MCP", "INDEX_FINGER_PIP", "INDEX_FINGER_DIP", "INDEX_FINGER_TIP",
+    "MIDDLE_FINGER_MCP", "MIDDLE_FINGER_PIP", "MIDDLE_FINGER_DIP", "MIDDLE_FINGER_TIP",
+    "RING_FINGER_MCP", "RING_FINGER_PIP", "RING_FINGER_DIP", "RING_FINGER_TIP",
+    "PINKY_MCP", "PINKY_PIP", "PINKY_DIP", "PINKY_TIP",
+)
+LANDMARKS = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+MAX_TEST_BITS = 16             # lookup table size limit (2**bits entries); beyond it the rules run on every call
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+RESERVED_LABELS = ("None", "Unknown")   # codes 0 (no hand) and 1 (no definition matched)
+UNKNOWN = 1
+
+# --- Finger state ---
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+NUM_STATES = 1 << len(FINGERS)
+# STATE_BITS[state, i]: whether FINGERS[i] is extended; the thumb is the high bit,
+# so the pattern "01100" is state 0b01100
+STATE_BITS = (np.arange(NUM_STATES)[:, np.newaxis] >> np.arange(len(FINGERS) - 1, -1, -1)) & 1
+FINGER_TIPS = np.array([8, 12, 16, 20])   # index, middle, ring, pinky
+FINGER_PIPS = np.array([6, 10, 14, 18])
+# Weight of each finger's bit in the state, in FINGERS order
+STATE_WEIGHTS = 1 << np.arange(len(FINGERS) - 1, -1, -1)
+
+# direction -> (axis, sign) of the component that must dominate (image y grows downwards)
+DIRECTIONS = {"up": (1, -1), "down": (1, 1), "left": (0, -1), "right": (0, 1)}
+
+
+class _LinearTests:
+    """
+    Finger states and predicates as sign tests. Each test is
+    `features[:, j] < limit[j]`, where features are a fixed linear map of the
+    landmark differences (b - a) of a few landmark pairs and of their squares;
+    a predicate holds when its tests give the wanted bits.
+    """
+
+    def __init__(self):
+        self.pairs = []        # (a, b) landmark pairs
+        self.tests = []        # (sorted (column, coefficient) items, limit, squared)
+        self._differences = self._matrix = None
+
+    def _pair(self, a, b):
+        if (a, b) not in self.pairs:
+            self.pairs.append((a, b))
+        return self.pairs.index((a, b))
+
+    def _columns(self, a, b):
+        """Columns of dx, dy, dx**2 and dy**2 of b - a; the squares come after all the differences."""
+        k = self._pair(a, b)
+        return 2 * k, 2 * k + 1, ("sq", 2 * k), ("sq", 2 * k + 1)
+
+    def _test(self, coefficients, limit=0.0, squared=False):
+        key = (tuple(sorted(coefficients.items(), key=repr)), limit, squared)
+        if key not in self.tests:
+            self.tests.append(key)
+        return self.tests.index(key)
+
+    def states(self):
+        """
+        Test indices of the finger state bits, in FINGERS order. A finger is
+        extended when its tip is above its PIP joint (upright hand); the thumb
+        when its tip is farther from the wrist than its IP joint.
+        """
+        wrist, ip, tip = LANDMARKS["WRIST"], LANDMARKS["THUMB_IP"], LANDMARKS["THUMB_TIP"]
+        _, _, ipx2, ipy2 = self._columns(wrist, ip)
+        _, _, tipx2, tipy2 = self._columns(wrist, tip)
+        tests = [self._test({ipx2: 1, ipy2: 1, tipx2: -1, tipy2: -1})]
+        for tip, pip in zip(FINGER_TIPS.tolist(), FINGER_PIPS.tolist()):
+            _, dy, _, _ = self._columns(pip, tip)
+            tests.append(self._test({dy: 1}))
+        return tests
+
+    def predicate(self, predicate):
+        """[(test index, bit that must come out)] of one compiled predicate."""
+        kind, a, b, *args = predicate
+        dx, dy, dx2, dy2 = self._columns(a, b)
+        if kind == "distance":
+            low, high = args
+            bits = []
+            if low is not None:
+                bits.append((self._test({dx2: 1, dy2: 1}, low, squared=True), 0))
+            if high is not None:
+                bits.append((self._test({dx2: 1, dy2: 1}, high, squared=True), 1))
+            return bits
+        axis, sign = DIRECTIONS[args[0]]
+        along, across = (dx, dy) if axis == 0 else (dy, dx)
+        # sign * along > |across|: both across - sign * along < 0 and -across - sign * along < 0
+        return [(self._test({across: 1, along: -sign}), 1), (self._test({across: -1, along: -sign}), 1)]
+
+    def differences(self):
+        """(21 * 3, 2 * pairs) float32 map from a flattened pose to the dx, dy of every pair."""
+        matrix = np.zeros((len(LANDMARK_NAMES) * 3, 2 * len(self.pairs)), dtype=np.float32)
+        for k, (a, b) in enumerate(self.pairs):
+            for axis in (0, 1):
+                matrix[3 * b + axis, 2 * k + axis] += 1
+                matrix[3 * a + axis, 2 * k + axis] -= 1
+        return matrix
+
+    def matrix(self):
+        """(4 * pairs, tests) float32 map from [differences, squares] to test features."""
+        width = 2 * len(self.pairs)
+        matrix = np.zeros((2 * width, len(self.tests)), dtype=np.float32)
+        for j, (coefficients, _, _) in enumerate(self.tests):
+            for column, coefficient in coefficients:
+                matrix[width + column[1] if isinstance(column, tuple) else column, j] = coefficient
+        return matrix
+
+    def limit_vector(self, parameters):
+        limits = []
+        for _, limit, squared in self.tests:
+            value = parameters[limit] if isinstance(limit, str) else limit
+            limits.append(value * value if squared else value)
+        return np.array(limits, dtype=np.float32)
+
+    def bits(self, poses, limits):
+        """(N, tests) bool outcomes of every test for an (N, 21, 3) array, computed in float32."""
+        if self._differences is None:
+            self._differences, self._matrix = self.differences(), self.matrix()
+        flat = np.asarray(poses, dtype=np.float32).reshape(-1, len(LANDMARK_NAMES) * 3)
+        deltas = flat @ self._differences
+        return np.concatenate([deltas, deltas * deltas], axis=1) @ self._matrix < limits
+
+
+_STATE_TESTS = _LinearTests()
+_STATE_TEST_INDICES = _STATE_TESTS.states()
+_STATE_LIMITS = _STATE_TESTS.limit_vector({})
+
+
+def finger_states(poses):
+    """5-bit finger state (thumb high) of every pose in an (N, 21, 3) array."""
+    return _STATE_TESTS.bits(poses, _STATE_LIMITS)[:, _STATE_TEST_INDICES] @ STATE_WEIGHTS
+
+
+def _predicate_text(predicate):
+    kind, a, b, *args = predicate
+    points = f"{LANDMARK_NAMES[a]}-{LANDMARK_NAMES[b]}"
+    if kind == "distance":
+        low, high = args
+        return " and ".join(text for text in (
+            low is not None and f"|{points}| >= {low}",
+            high is not None and f"|{points}| < {high}") if text)
+    return f"{points} points {args[0]}"
+
+
+def _patterns(mask):
+    return ", ".join(format(state, "05b") for state in np.flatnonzero(mask))
+
+
+class GestureTable:
+    """Compiled gesture definitions (see compile_gestures)."""
+
+    def __init__(self, labels, table, conditional, parameters, issues=()):
+        self.labels = tuple(labels)         # code -> name
+        self.table = table                  # (32,) int8: state -> first unconditional gesture
+        self.conditional = conditional      # [(code, eligible (32,) bool, predicates)], lowest priority first
+        self.parameters = dict(parameters)
+        self.issues = list(issues)
+        self._tests = _LinearTests()
+        self._state_tests = self._tests.states()
+        self._predicate_bits = {predicate: self._tests.predicate(predicate)
+                                for _, _, predicates in conditional for predicate in predicates}
+        self._limits = self._tests.limit_vector(self.parameters)
+        # The rules over every combination of test bits, when there are few enough tests
+        self._lookup = None
+        count = len(self._tests.tests)
+        if count <= MAX_TEST_BITS:
+            self._lookup = self._apply_rules((np.arange(1 << count)[:, np.newaxis] >> np.arange(count)) & 1 == 1)
+        self._bit_weights = (1 << np.arange(count)).astype(np.int32)
+
+    def _apply_rules(self, bits):
+        """int8 codes for an (M, tests) bool array of test outcomes: the only place the rules are applied."""
+        states = bits[:, self._state_tests] @ STATE_WEIGHTS
+        codes = self.table[states]
+        # Later entries have higher priority and overwrite earlier ones
+        for code, eligible, predicates in self.conditional:
+            mask = eligible[states]
+            for predicate in predicates:
+                for test, wanted in self._predicate_bits[predicate]:
+                    mask &= bits[:, test] == wanted
+            codes[mask] = code
+        return codes
+
+    def classify(self, poses, **parameters):
+        """
+        int8 codes into `labels` for an (N, 21, 3) float32 array. Keyword
+        arguments override the config's parameters for this call.
+        """
+        limits = self._tests.limit_vector(dict(self.parameters, **parameters)) if parameters else self._limits
+        bits = self._tests.bits(poses, limits)
+        if self._lookup is not None:
+            return self._lookup[bits @ self._bit_weights]
+        return self._apply_rules(bits)
+
+    def describe(self):
+        """One line per finger state: the candidates in the order they are tried."""
+        lines = []
+        for state in range(NUM_STATES):
+            tried = [f"{self.labels[code]} if {' and '.join(map(_predicate_text, predicates))}"
+                     for code, eligible, predicates in reversed(self.conditional) if eligible[state]]
+            tried.append(self.labels[self.table[state]])
+            lines.append(f"{state:05b}  " + ", else ".join(tried))
+        return lines
+
+
+def _parse_pattern(name, pattern):
+    if not isinstance(pattern, str) or len(pattern) != len(FINGERS) or set(pattern) - set("01?"):
+        raise ValueError(f"gesture {name!r}: 'fingers' must be 5 of 0/1/? (thumb..pinky), got {pattern!r}")
+    mask = np.ones(NUM_STATES, dtype=bool)
+    for i, c in enumerate(pattern):
+        if c != "?":
+            mask &= STATE_BITS[:, i] == int(c)
+    return mask
+
+
+def _parse_predicate(name, predicate, parameters):
+    kind = next((k for k in ("distance", "direction") if k in predicate), None)
+    if kind is None:
+        raise ValueError(f"gesture {name!r}: unknown predicate {predicate!r}")
+    points = predicate[kind]
+    if len(points) != 2 or any(p not in LANDMARKS for p in points):
+        raise ValueError(f"gesture {name!r}: {kind} needs two landmark names, got {points!r}")
+    a, b = (LANDMARKS[p] for p in points)
+    if kind == "distance":
+        bounds = (predicate.get("min"), predicate.get("max"))
+        if bounds == (None, None):
+            raise ValueError(f"gesture {name!r}: distance needs 'min' and/or 'max'")
+        for bound in bounds:
+            if isinstance(bound, str) and bound not in parameters:
+                raise ValueError(f"gesture {name!r}: unknown parameter {bound!r}")
+        return ("distance", a, b) + bounds
+    if predicate.get("is") not in DIRECTIONS:
+        raise ValueError(f"gesture {name!r}: direction 'is' must be one of {', '.join(DIRECTIONS)}")
+    return ("direction", a, b, predicate["is"])
+
+
+def _check(names, accepts, predicates):
+    """
+    Unreachable and overlapping definitions. An earlier gesture shadows a
+    later one on a state when it accepts the state and its predicates are a
+    subset of the later one's (whenever the later matches, so does it).
+    """
+    issues = []
+    for rank, name in enumerate(names):
+        live = accepts[rank].copy()
+        overlaps = []
+        conditions = set(predicates[rank])
+        for earlier in range(rank):
+            shared = accepts[rank] & accepts[earlier]
+            if shared.any() and set(predicates[earlier]) <= conditions:
+                live &= ~shared
+                if set(predicates[earlier]) == conditions:
+                    overlaps.append(f"overlap: {name!r} and {names[earlier]!r} both match "
+                                    f"{_patterns(shared)}; {names[earlier]!r} wins")
+        if live.any():
+            issues.extend(overlaps)
+        else:
+            issues.append(f"unreachable: {name!r} is always matched by an earlier gesture first")
+    return issues
+
+
+def compile_gestures(config):
+    """
+    Compile a parsed gestures config into a GestureTable.
+    Raises ValueError for malformed definitions; reachability problems are
+    collected in the table's `issues`.
+    """
+    parameters = dict(config.get("parameters", {}))
+    labels = list(RESERVED_LABELS)
+    accepts, predicates = [], []
+    for definition in config.get("gestures", []):
+        name = definition.get("name")
+        if not name or name in labels:
+            raise ValueError(f"gesture name missing or duplicated: {name!r}")
+        labels.append(name)
+        accepts.append(_parse_pattern(name, definition.get("fingers", "?????")))
+        predicates.append(tuple(_parse_predicate(name, p, parameters) for p in definition.get("when", ())))
+
+    # First unconditional gesture of each state (walk backwards so earlier ones overwrite)
+    codes = range(len(RESERVED_LABELS), len(labels))
+    table = np.full(NUM_STATES, UNKNOWN, dtype=np.int8)
+    owner = np.full(NUM_STATES, len(labels))
+    for code, accept, conditions in reversed(list(zip(codes, accepts, predicates))):
+        if not conditions:
+            table[accept] = code
+            owner[accept] = code
+    # Predicate gestures only need checking where they outrank the table entry
+    conditional = []
+    for code, accept, conditions in reversed(list(zip(codes, accepts, predicates))):
+        eligible = accept & (code < owner)
+        if conditions and eligible.any():
+            conditional.append((code, eligible, conditions))
+    return GestureTable(labels, table, conditional, parameters, _check(labels[2:], accepts, predicates))
+
+
+def load_gestures(path=DEFAULT_CONFIG):
+    """Load and compile a gestures JSON file, printing any compile-time issues."""
+    with open(path) as f:
+        table = compile_gestures(json.load(f))
+    for issue in table.issues:
+        print(f"Gesture config {os.path.basename(path)}: {issue}")
+    return table
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG
+    table = load_gestures(path)
+    print("\n".join(table.describe()))
+    sys.exit(1 if table.issues else 0)
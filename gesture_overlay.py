@@ -0,0 +1,113 @@
+"""
+Debug overlay for the gesture pipeline.
+
+draw_overlay renders hand landmarks (from (21, 3) arrays) and the gesture /
+action labels onto a frame, and draw_timing adds per-stage latency from a
+PipelineTimer. PreviewWindow does the same on its own thread at a capped
+rate, so drawing and cv2.imshow stay off the inference path.
+"""
+import threading
+import time
+
+import cv2
+
+from frame_sources import LatestFrameBuffer
+
+# MediaPipe's 21-landmark hand topology (same as mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),           # thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),           # index
+    (5, 9), (9, 10), (10, 11), (11, 12),      # middle
+    (9, 13), (13, 14), (14, 15), (15, 16),    # ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # pinky and palm
+)
+PREVIEW_FPS = 10
+PREVIEW_WINDOW = "Gesture Control - Debug View"
+
+
+def draw_overlay(image, hands, gesture_name, action_taken=None):
+    """Draw landmarks of every hand plus gesture/action text onto `image` in place."""
+    h, w = image.shape[:2]
+    for hand in hands:
+        pts = [(int(x * w), int(y * h)) for x, y, _ in hand.points]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(image, pts[a], pts[b], (224, 224, 224), 2)
+        for p in pts:
+            cv2.circle(image, p, 3, (0, 0, 255), -1)
+    cv2.putText(image, f"Gesture: {gesture_name}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    if action_taken:
+        cv2.putText(image, f"Action: {action_taken}", (10, 70),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+    return image
+
+
+def draw_timing(image, timer):
+    """Draw p50/p95 latency of every timed stage in the bottom-left corner of `image`."""
+    lines = [f"{name:<10} p50 {s['p50_ms']:6.1f}  p95 {s['p95_ms']:6.1f} ms"
+             for name, s in timer.report().items()]
+    y = image.shape[0] - 10 - 18 * (len(lines) - 1)
+    for line in lines:
+        cv2.putText(image, line, (10, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 0), 1)
+        y += 18
+    return image
+
+
+class PreviewWindow(threading.Thread):
+    """Render the latest frame and landmarks in a window at most `fps` times a second."""
+
+    def __init__(self, fps=PREVIEW_FPS, window=PREVIEW_WINDOW, timer=None):
+        """`timer`: optional PipelineTimer; gets the "display" stage and is drawn on request."""
+        super().__init__(daemon=True)
+        self.period = 1.0 / fps
+        self.window = window
+        self.running = True
+        self.closed = False        # set when the user presses Esc in the window
+        self.frames_shown = 0
+        self.render_time = 0.0     # seconds spent drawing and showing
+        self.timer = timer
+        self._slot = LatestFrameBuffer()
+        self._next_submit = 0.0
+
+    def submit(self, frame, hands, gesture_name, action_taken=None, flip=False, show_timing=False):
+        """
+        Offer a frame from the inference loop. Frames arriving faster than the
+        preview rate are ignored before any copy is made, so this is nearly free.
+        `flip` mirrors the image for display (used when landmarks, not pixels, were mirrored).
+        `show_timing` also draws the timer's stage latencies.
+        """
+        now = time.perf_counter()
+        if now < self._next_submit:
+            return
+        self._next_submit = now + self.period
+        # The controller reuses its frame buffers, so keep a private copy
+        self._slot.put((frame.copy(), hands, gesture_name, action_taken, flip, show_timing), now)
+
+    def run(self):
+        while self.running:
+            item, _ = self._slot.get(timeout=0.1)
+            if item is not None:
+                start = time.perf_counter()
+                frame, hands, gesture_name, action_taken, flip, show_timing = item
+                if flip:
+                    frame = cv2.flip(frame, 1)
+                    # x -> 1 - x to match the flipped image
+                    hands = [hand._replace(points=hand.points * (-1, 1, 1) + (1, 0, 0)) for hand in hands]
+                draw_overlay(frame, hands, gesture_name, action_taken)
+                if show_timing and self.timer is not None:
+                    draw_timing(frame, self.timer)
+                cv2.imshow(self.window, frame)
+                self.frames_shown += 1
+                elapsed = time.perf_counter() - start
+                self.render_time += elapsed
+                if self.timer is not None:
+                    self.timer.record("display", elapsed)
+            if cv2.waitKey(1) & 0xFF == 27:
+                self.closed = True
+        cv2.destroyWindow(self.window)
+
+    def stop(self):
+        self.running = False
+        self._slot.close()
+        if self.is_alive():
+            self.join(timeout=1.0)
@@ -1,8 +1,13 @@
 
 
+import time
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import contextlib
+import functools
 import os
 import threading
-import time
 import subprocess
 import webbrowser
 import datetime
@@ -10,29 +15,71 @@ import json
 import platform
 import sys
 
-import speech_recognition as sr
-import pyttsx3
-
 # GUI imports
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-# automation
-import pyautogui
-
-# networking for AI
-import requests
+from command_executor import CommandExecutor, UIChannel, cancelled
+from tts_worker import LOW, NORMAL, URGENT, TTSWorker
 
-# hand gesture detection
-import cv2
-import mediapipe as mp
-import numpy as np
+# Heavy modules are imported where they are first needed, on background
+# threads: speech_recognition and pyttsx3 (voice), pyautogui (automation) and
+# requests (AI) once the window is up, and cv2/mediapipe through
+# gesture_controller (gestures) as soon as main() runs, so the hand detector
+# warms up while the window is built. This also keeps the inference worker
+# cheap to spawn, since a spawned process re-imports this module.
 
 # --- Configuration ----------------------------------------------------------
 WAKE_WORD = "hey assistant"
+# Local wake-phrase templates (python wake_word.py enroll); until they exist
+# every utterance goes to the online recognizer. WAKE_CONFIRM=1 also sends
+# local hits there and requires WAKE_WORD in the text.
+WAKE_TEMPLATES = os.environ.get("WAKE_TEMPLATES", "wake_word.npz")
+WAKE_CONFIRM = os.environ.get("WAKE_CONFIRM") == "1"
+# Commands are cut from the shared microphone stream (see audio_capture.py):
+# listen_once starts this far back, and after the wake phrase no "Yes?" is
+# spoken if the user is already talking within WAKE_ACK_GRACE_MS
+COMMAND_PRE_ROLL_MS = 300
+WAKE_ACK_GRACE_MS = 400
+# Speech recognizer (see speech_backends.py): "google" (online, whole phrase)
+# or "vosk" (offline, streaming; VOSK_MODEL is the model directory)
+SPEECH_BACKEND = os.environ.get("SPEECH_BACKEND", "google")
+VOSK_MODEL = os.environ.get("VOSK_MODEL", "vosk-model")
+# Argument-free commands a streaming backend may dispatch as soon as its
+# partial result names one, before the user has finished speaking
+EARLY_COMMANDS = ("volume up", "volume down", "mute", "wifi on", "wifi off", "turn on wifi", "turn off wifi",
+                  "bluetooth on", "bluetooth off", "click")
 GEMINI_API_KEY_ENV = "GEMINI_API_KEY"
+# Gesture debug view: "window" (draw + show every frame), "preview" (separate
+# thread at a capped rate) or "headless" (no drawing at all)
+GESTURE_DISPLAY = os.environ.get("GESTURE_DISPLAY", "preview")
+# Per-stage gesture latency: draw it on the debug view, and/or append a JSON
+# line with the histograms' percentiles to this file every TIMING_LOG_INTERVAL s
+GESTURE_SHOW_TIMING = os.environ.get("GESTURE_SHOW_TIMING") == "1"
+GESTURE_TIMING_LOG = os.environ.get("GESTURE_TIMING_LOG")
+TIMING_LOG_INTERVAL = 30
+# Where MediaPipe runs: "process" (a worker process, see inference_worker.py,
+# so it doesn't compete with the GUI for the GIL) or "inline" (this process)
+GESTURE_INFERENCE = os.environ.get("GESTURE_INFERENCE", "process")
+# Gesture input: a camera index, or a video file / image directory to run
+# recorded footage through the gesture pipeline (see frame_sources.py)
+GESTURE_SOURCE = os.environ.get("GESTURE_SOURCE", "0")
+# Optional learned gesture model (see landmark_classifier.py) used instead of
+# the gestures.json rules
+GESTURE_MODEL = os.environ.get("GESTURE_MODEL")
+
+# Subsystems loaded in the background; the status bar says "Ready" once each
+# of them has reported ready (or failed)
+SUBSYSTEMS = ("tts", "automation", "speech", "gestures")
+STARTUP_POLL_MS = 200
+
+# Commands run on a worker pool (see command_executor.py), not the Tk thread;
+# one that outlives its timeout is cancelled. AI requests get longer.
+COMMAND_TIMEOUT = 20
+AI_COMMAND_TIMEOUT = 30
 
 # Default apps (common paths). Update these to match your machine if needed.
+# {user} is filled in on first use, see app_path().
 APPS = {
     "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
     "brave": r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
@@ -47,20 +94,106 @@ APPS = {
     "zoom": r"C:\Users\\{user}\AppData\Roaming\Zoom\bin\Zoom.exe",
 }
 
-# fill {user} with current username
-APPS = {k: v.format(user=os.getlogin()) for k, v in APPS.items()}
+@functools.lru_cache(maxsize=1)
+def _username():
+    return os.getlogin()
 
-# --- Voice engine -----------------------------------------------------------
-engine = pyttsx3.init()
-engine.setProperty("rate", 160)
+def app_path(name):
+    """Path of a known app with {user} filled in, or None."""
+    path = APPS.get(name)
+    return path.format(user=_username()) if path else None
+
+# --- Start-up timeline ------------------------------------------------------
+class StartupTimeline:
+    """
+    Start-up milestones (time since this module was imported) and the
+    readiness of each background subsystem. Subsystems report from their
+    own threads; the GUI polls `pending()` from the Tk thread.
+    """
+
+    def __init__(self, subsystems=SUBSYSTEMS, start=_IMPORT_START):
+        self.subsystems = tuple(subsystems)
+        self.start = start
+        self.events = []        # (seconds, event, thread name)
+        self.status = {}        # subsystem -> "ready" or "failed: <reason>"
+        self._lock = threading.Lock()
+
+    def mark(self, event):
+        with self._lock:
+            self.events.append((time.perf_counter() - self.start, event, threading.current_thread().name))
+
+    def ready(self, name):
+        if self.status.get(name) != "ready":
+            self.mark(f"{name} ready")
+            with self._lock:
+                self.status[name] = "ready"
+
+    def failed(self, name, reason):
+        self.mark(f"{name} failed: {reason}")
+        with self._lock:
+            self.status.setdefault(name, f"failed: {reason}")
+
+    def pending(self):
+        with self._lock:
+            return [name for name in self.subsystems if name not in self.status]
+
+    def unavailable(self):
+        with self._lock:
+            return [name for name, status in self.status.items() if status != "ready"]
+
+    def report(self):
+        with self._lock:
+            events = sorted(self.events)
+        lines = ["Start-up timeline (ms since import):"]
+        lines += [f"  {1000 * t:8.1f}  {event:<40} [{thread}]" for t, event, thread in events]
+        return "\n".join(lines)
+
+STARTUP = StartupTimeline()
+STARTUP.mark("imports done")
 
-def speak(text):
+# --- Voice engine -----------------------------------------------------------
+# Speech is queued to a worker thread (see tts_worker.py); speak() returns at once
+_tts = None
+_tts_lock = threading.Lock()
+
+def _capture_muted():
+    # The microphone hears the assistant too: not a wake phrase or command
+    return _audio.muted() if _audio is not None else contextlib.nullcontext()
+
+def tts():
+    """The TTS worker, started on first use."""
+    global _tts
+    with _tts_lock:
+        if _tts is None:
+            _tts = TTSWorker(while_speaking=_capture_muted)
+            _tts.start()
+        return _tts
+
+def speak(text, priority=NORMAL, wait=False):
+    """
+    Say `text` without blocking the caller (unless `wait`). Newer speech
+    replaces older speech of the same or lower priority; see TTSWorker.say.
+    """
     try:
-        engine.say(text)
-        engine.runAndWait()
+        speech = tts().say(text, priority)
+        if wait:
+            speech.wait()
     except Exception as e:
         print("TTS error:", e)
 
+def _load_tts():
+    if not tts().wait_ready(timeout=30):
+        raise RuntimeError(tts().error or "TTS engine did not start")
+
+def preload_subsystems():
+    """Load the TTS engine and input automation; run on a background thread at start-up."""
+    for name, load in (("tts", _load_tts), ("automation", lambda: __import__("pyautogui"))):
+        try:
+            load()
+            STARTUP.ready(name)
+        except Exception as e:
+            STARTUP.failed(name, e)
+
 # --- AI (Gemini) integration - placeholder ----------------------------------
 def call_gemini(prompt, max_tokens=400):
     """
@@ -73,6 +206,7 @@ def call_gemini(prompt, max_tokens=400):
     if not key:
         return "Gemini API key not configured. Set the GEMINI_API_KEY environment variable."
 
+    import requests
     url = "https://api.gemini.example/v1/generate"  # <- replace with real Gemini endpoint
     headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
     payload = {"prompt": prompt, "max_tokens": max_tokens}
@@ -155,7 +289,7 @@ def chrome_search(query):
     This uses Chrome's omnibox which provides full search functionality
     including Google search, suggestions, history, and bookmarks.
     """
-    chrome_path = APPS.get("chrome")
+    chrome_path = app_path("chrome")
     if not chrome_path or not os.path.exists(chrome_path):
         # Fallback to default browser
         webbrowser.open(f"https://www.google.com/search?q={query}")
@@ -183,7 +317,7 @@ def open_app(name):
         return
 
     if name in APPS:
-        path = APPS[name]
+        path = app_path(name)
         try:
             if os.path.isdir(path):
                 os.startfile(path)
@@ -203,141 +337,346 @@ def open_app(name):
 
 # --- Mouse & Keyboard automation --------------------------------------------
 def move_mouse(x, y):
+    import pyautogui
     pyautogui.moveTo(x, y)
 
 def click_mouse(button="left"):
+    import pyautogui
     pyautogui.click(button=button)
 
 def type_text(text):
+    import pyautogui
     pyautogui.write(text, interval=0.02)
 
 def press_key(key):
+    import pyautogui
     pyautogui.press(key)
 
 # --- Voice listening --------------------------------------------------------
-recognizer = sr.Recognizer()
-mic = None
+_audio = None
+_audio_lock = threading.Lock()
 
-def init_mic():
-    global mic
-    try:
-        mic = sr.Microphone()
-    except Exception as e:
-        print("Microphone init error:", e)
+def audio_capture():
+    """
+    The shared AudioCaptureService (see audio_capture.py), opened on first
+    use; None if there is no usable microphone.
+    """
+    global _audio
+    with _audio_lock:
+        if _audio is None:
+            try:
+                from audio_capture import AudioCaptureService
+                _audio = AudioCaptureService().open()
+                STARTUP.ready("speech")
+            except Exception as e:
+                print("Microphone init error:", e)
+                STARTUP.failed("speech", e)
+        return _audio
 
-def listen_once(timeout=4, phrase_time_limit=4):
+def listen_once(timeout=4, phrase_time_limit=4, since=None):
     """
-    Listen briefly and return the recognized text (lowercase).
+    Listen for one utterance and return the recognized text (lowercase), ""
+    if nothing was heard. The audio starts COMMAND_PRE_ROLL_MS back, or at
+    stream position `since`, so speech that began a moment ago is kept.
     """
-    if mic is None:
-        try:
-            init_mic()
-        except:
-                ""
-    with mic as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.6)
-        try:
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            text = recognizer.recognize_google(audio, language="en-in")
-            return text.lower()
-        except sr.WaitTimeoutError:
-            return ""
-        except Exception as e:
-            # print("Listen error:", e)
-            return ""
+    service = audio_capture()
+    if service is None:
+        return ""
+    with service.subscribe(pre_roll_ms=COMMAND_PRE_ROLL_MS, since=since) as audio:
+        return recognize_command(audio, service.rate, timeout, phrase_time_limit)
+
+def speech_session(rate):
+    """A new recognizer session of the configured SPEECH_BACKEND."""
+    from speech_backends import make_backend
+    options = {"model_path": VOSK_MODEL} if SPEECH_BACKEND == "vosk" else {}
+    return make_backend(SPEECH_BACKEND, rate, **options)
+
+def recognize_command(audio, rate, timeout, phrase_time_limit):
+    """
+    Text of the next utterance in an AudioSubscription. A streaming backend
+    returns as soon as a stable partial names one of EARLY_COMMANDS.
+    """
+    from speech_backends import CommandPrefixes, recognize_stream
+    try:
+        result = recognize_stream(audio, speech_session(rate), timeout=timeout, max_seconds=phrase_time_limit,
+                                  early=CommandPrefixes(EARLY_COMMANDS))
+    except Exception as e:
+        print("Speech recognition error:", e)
+        return ""
+    if result.early:
+        print(f"Early command: {result.text}")
+    return result.text
+
+def recognize_samples(samples, rate):
+    """Recognition of one whole utterance of int16 mono samples (lowercase text, "" if nothing was understood)."""
+    try:
+        session = speech_session(rate)
+        session.accept(samples)
+        return session.finish()
+    except Exception as e:
+        print("Speech recognition error:", e)
+        return ""
 
 # --- Wake word thread -------------------------------------------------------
 class WakeWordThread(threading.Thread):
     def __init__(self, callback, *args, **kwargs):
+        """`callback(wake_end)` runs on this thread with the stream position where the wake phrase ended."""
         super().__init__(*args, **kwargs)
         self.callback = callback
         self.running = True
         self.daemon = True
+        self.listener = None
 
     def run(self):
-        while self.running:
-            try:
-                phrase = listen_once(timeout=3, phrase_time_limit=3)
-                if WAKE_WORD in phrase:
-                    print("Wake word detected.")
-                    self.callback()
-            except Exception as e:
-                print("Wake thread error:", e)
-            time.sleep(0.2)
+        service = audio_capture()
+        if service is None:
+            return  # reported as "speech failed" on the start-up timeline
+        from wake_word import WakeWordDetector, WakeWordListener
+        detector = WakeWordDetector(WAKE_TEMPLATES)
+        if not detector.enrolled:
+            print("Wake phrase not enrolled (python wake_word.py enroll): every utterance goes online")
+        rate = service.rate
+        self.listener = WakeWordListener(detector, recognize=lambda samples: recognize_samples(samples, rate),
+                                         wake_word=WAKE_WORD, rate=rate, confirm=WAKE_CONFIRM, ring=service.ring)
+        with service.subscribe() as audio:
+            while self.running:
+                block = audio.get(timeout=0.5)
+                if block is None:
+                    if not service.is_alive():
+                        break
+                    continue
+                try:
+                    if self.listener.feed_block(block):
+                        print("Wake word detected.")
+                        self.callback(self.listener.wake_end)
+                        # What was said meanwhile belonged to the command
+                        audio.clear()
+                        self.listener.reset()
+                except Exception as e:
+                    print("Wake thread error:", e)
+        print(f"Wake word stats: {self.listener.stats()}, audio: {service.stats()}")
 
     def stop(self):
         self.running = False
 
 # --- Hand Gesture Thread ---------------------------------------------------
 # --- Hand Gesture Thread ---------------------------------------------------
-from gesture_controller import GestureController
-
 class HandGestureThread(threading.Thread):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, display=GESTURE_DISPLAY, **kwargs):
         super().__init__(*args, **kwargs)
         self.running = True
         self.daemon = True
         self.controller = None
+        self.display = display
+        self.preview = None
+        # Wall and process CPU seconds spent in each controller state
+        self.state_time = {"active": [0.0, 0.0], "idle": [0.0, 0.0]}
+        # Seconds from process start to the first committed gesture
+        self.first_gesture_s = None
+        self._warm_up_error = None
+
+    def power_report(self):
+        """Per-state CPU usage plus the controller's wake-up latency."""
+        report = {}
+        for state, (wall, cpu) in self.state_time.items():
+            report[f"{state}_s"] = round(wall, 1)
+            report[f"{state}_cpu_percent"] = round(100 * cpu / wall, 1) if wall else 0.0
+        if self.controller:
+            report.update(self.controller.idle_report())
+            report["pixel_fraction"] = round(self.controller.roi_report()["pixel_fraction"], 3)
+            report["preprocess_bytes_last_frame"] = self.controller.preprocessor.bytes_allocated
+            if hasattr(self.controller.output, "stats"):
+                report.update(self.controller.output.stats())
+            if hasattr(self.controller.hands, "stats"):
+                report.update(self.controller.hands.stats())
+        report["time_to_first_gesture_s"] = self.first_gesture_s
+        report["display"] = self.display
+        if self.preview:
+            report["preview_frames"] = self.preview.frames_shown
+            report["preview_render_s"] = round(self.preview.render_time, 2)
+        return report
 
     def run(self):
         try:
-            self.controller = GestureController()
+            # cv2 and mediapipe load here, off the Tk thread
+            import cv2
+            from gesture_controller import GestureController
+            from gesture_overlay import PreviewWindow
+            from frame_sources import open_source
+            from inference_worker import RemoteHands
+            from landmark_classifier import LandmarkClassifier
+            STARTUP.mark("gesture modules imported")
+            hands = RemoteHands() if GESTURE_INFERENCE == "process" else None
+            classifier = LandmarkClassifier(GESTURE_MODEL) if GESTURE_MODEL else None
+            self.controller = GestureController(hands=hands, roi_tracking=True, overlay=self.display == "window",
+                                                classifier=classifier)
         except Exception as e:
             print(f"Failed to init gesture controller: {e}")
+            STARTUP.failed("gestures", e)
             return
 
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            print("⚠ Could not open camera for gesture detection")
+        # Build the detector and run its first inferences while the camera opens
+        warm_up = threading.Thread(target=self._warm_up, name="gesture-warm-up", daemon=True)
+        warm_up.start()
+        capture = open_source(GESTURE_SOURCE)
+        warm_up.join()
+        if self._warm_up_error is not None:
+            print(f"Failed to load the hand detector: {self._warm_up_error}")
+            STARTUP.failed("gestures", self._warm_up_error)
+            capture.stop()
+            self.controller.release()
+            return
+        if not capture.opened:
+            print(f"⚠ Could not open {GESTURE_SOURCE!r} for gesture detection")
+            STARTUP.failed("gestures", f"cannot open {GESTURE_SOURCE!r}")
+            self.controller.release()  # stops the inference worker and input thread
             return
+        STARTUP.mark("gesture source opened")
+        if getattr(self.controller.hands, "ready", True):
+            STARTUP.ready("gestures")
         
+        # Frames are decoded on the source's own thread; from a camera we
+        # always process the newest frame, from footage every frame in order
+        capture.start()
+        timing = self.controller.timing
+        self.controller.show_timing = GESTURE_SHOW_TIMING
+        timing_log = open(GESTURE_TIMING_LOG, "a") if GESTURE_TIMING_LOG else None
+        next_timing_log = time.time() + TIMING_LOG_INTERVAL
+        if self.display == "preview":
+            self.preview = PreviewWindow(timer=timing)
+            self.controller.preview = self.preview
+            self.preview.start()
+        processed_count = 0
+        latency_total = 0.0
         print("Gesture Camera Started. Press 'Esc' to stop debug view if visible.")
         
+        mark_wall, mark_cpu = time.perf_counter(), time.process_time()
+        last_start = mark_wall
         while self.running:
             try:
-                ret, frame = cap.read()
-                if not ret:
+                state = "idle" if self.controller.idle else "active"
+                if state == "idle":
+                    # No hand for a while: only look a few times per second
+                    time.sleep(max(0.0, 1.0 / self.controller.idle_fps - (time.perf_counter() - last_start)))
+                last_start = time.perf_counter()
+                
+                frame, captured_at = capture.read(timeout=1.0)
+                if frame is None:
+                    if capture.finished:
+                        break  # end of recorded footage
                     continue
+                timing.record("capture", time.time() - captured_at)
                 
                 # Process frame using our robust controller
                 # This returns the annotated frame and the gesture name
                 processed_frame, gesture_name = self.controller.process_frame(frame)
+                processed_count += 1
+                # Ready once a frame went through a loaded detector (the
+                # inference worker answers with no hands while it loads)
+                if getattr(self.controller.hands, "ready", True):
+                    STARTUP.ready("gestures")
+                if self.first_gesture_s is None and gesture_name not in ("None", "Unknown"):
+                    self.first_gesture_s = round(time.perf_counter() - STARTUP.start, 3)
+                    STARTUP.mark(f"first gesture: {gesture_name}")
+                latency_total += time.time() - captured_at
                 
-                # Optional: Show debug window
-                # We can make this optional later, but for now it's requested "Visual landmarks overlay"
-                cv2.imshow("Gesture Control - Debug View", processed_frame)
-                
-                # Check for window close or ESC
-                if cv2.waitKey(1) & 0xFF == 27:
+                # Debug view: inline window, preview thread, or nothing (headless)
+                if self.display == "window":
+                    shown_at = time.perf_counter()
+                    cv2.imshow("Gesture Control - Debug View", processed_frame)
+                    # Check for window close or ESC
+                    key = cv2.waitKey(1) & 0xFF
+                    timing.record("display", time.perf_counter() - shown_at)
+                    if key == 27:
+                        break
+                elif self.preview and self.preview.closed:
                     break
-                    
-                # Small delay to reduce CPU usage (limit to ~30fps)
-                time.sleep(0.01)
+                
+                if timing_log and time.time() >= next_timing_log:
+                    timing.write_jsonl(timing_log, display=self.display, **self.startup_metrics())
+                    next_timing_log = time.time() + TIMING_LOG_INTERVAL
                 
             except Exception as e:
                 print(f"Gesture loop error: {e}")
                 time.sleep(1)
+            finally:
+                now_wall, now_cpu = time.perf_counter(), time.process_time()
+                self.state_time[state][0] += now_wall - mark_wall
+                self.state_time[state][1] += now_cpu - mark_cpu
+                mark_wall, mark_cpu = now_wall, now_cpu
         
         # Cleanup
-        cap.release()
+        capture.stop()
+        if self.preview:
+            self.preview.stop()
+        if processed_count:
+            print(f"Gesture camera stopped ({capture.frames_captured} frames captured, "
+                  f"{capture.dropped} stale frames dropped, "
+                  f"{capture.stats()['decode_avg_ms']:.1f} ms avg decode, "
+                  f"{1000 * latency_total / processed_count:.1f} ms avg capture-to-action)")
+            print(f"Gesture power report: {self.power_report()}")
+            stages = ", ".join(f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f}"
+                               for name, s in timing.report().items())
+            print(f"Gesture stage latency p50/p95/p99 ms: {stages}")
+        if timing_log:
+            timing.write_jsonl(timing_log, display=self.display, **self.startup_metrics())
+            timing_log.close()
         cv2.destroyAllWindows()
         if self.controller:
             self.controller.release()
     
+    def _warm_up(self):
+        try:
+            seconds = self.controller.warm_up()
+            STARTUP.mark(f"gesture detector warmed up ({1000 * seconds:.0f} ms)")
+        except Exception as e:
+            self._warm_up_error = e
+
+    def startup_metrics(self):
+        """Start-up figures tracked across releases (also in the timing log)."""
+        warm_up = self.controller.warm_up_time if self.controller else None
+        return {
+            "warm_up_ms": round(1000 * warm_up, 1) if warm_up is not None else None,
+            "time_to_first_gesture_s": self.first_gesture_s,
+        }
+
     def stop(self):
         self.running = False
 
+def start_gesture_control():
+    """Start the gesture thread (import, detector warm-up, camera); None if it fails to start."""
+    try:
+        thread = HandGestureThread(name="gestures")
+        thread.start()
+        print("✓ Gesture control started (open palm: swipe to switch tabs or scroll, circle to zoom)")
+        return thread
+    except Exception as e:
+        print(f"⚠ Gesture control failed to start: {e}")
+        STARTUP.failed("gestures", e)
+        return None
+
 # --- GUI --------------------------------------------------------------------
 class AssistantGUI:
-    def __init__(self, root):
+    def __init__(self, root, profile_startup=False, gesture_thread=None):
+        """
+        Args:
+            gesture_thread: a HandGestureThread main() already started; when
+                None, gesture control starts with the other subsystems.
+        """
         self.root = root
+        self.profile_startup = profile_startup
         root.title("ThinkPad Voice Assistant")
         root.geometry("520x380")
         root.resizable(False, False)
 
         self.mic_active = False
         self.wake_thread = None
-        self.gesture_thread = None
+        self.gesture_thread = gesture_thread
+        # Widgets are only touched on this thread: commands and the wake
+        # thread post their updates through self.ui
+        self.ui = UIChannel(root)
+        self.commands = CommandExecutor(ui=self.ui, on_timeout=self._command_timed_out,
+                                        default_timeout=COMMAND_TIMEOUT)
 
         # top frame - status only
         top = ttk.Frame(root, padding=12)
@@ -369,10 +708,11 @@ class AssistantGUI:
         ttk.Label(qa, text="Quick Actions:").pack(anchor="w")
         quick = ttk.Frame(qa)
         quick.pack(fill="x")
-        ttk.Button(quick, text="Open Chrome", command=lambda: open_app("chrome")).pack(side="left", padx=4, pady=4)
-        ttk.Button(quick, text="Open VSCode", command=lambda: open_app("vscode")).pack(side="left", padx=4)
-        ttk.Button(quick, text="Open Downloads", command=lambda: open_app("downloads")).pack(side="left", padx=4)
-        ttk.Button(quick, text="YouTube", command=lambda: open_app("youtube")).pack(side="left", padx=4)
+        for label, app in (("Open Chrome", "chrome"), ("Open VSCode", "vscode"),
+                           ("Open Downloads", "downloads"), ("YouTube", "youtube")):
+            ttk.Button(quick, text=label,
+                       command=lambda app=app: self.commands.submit(open_app, app, name=f"open {app}")
+                       ).pack(side="left", padx=4, pady=4)
 
         # AI chat area
         ai_frame = ttk.LabelFrame(root, text="AI / Assistant")
@@ -391,8 +731,54 @@ class AssistantGUI:
         self.pulse = 0
         self._animate()
         
-        # Auto-start wake word and gesture control
-        self.root.after(1000, self.auto_start_features)
+        # Escape cancels running commands and silences the voice
+        root.bind("<Escape>", lambda event: self.cancel_commands())
+
+        # Auto-start wake word and gesture control once the window is on screen
+        self._started = False
+        root.bind("<Map>", self._on_map, add="+")
+        STARTUP.mark("window built")
+
+    def _on_map(self, event):
+        if event.widget is self.root and not self._started:
+            self._started = True
+            STARTUP.mark("window shown")
+            self.root.after(50, self.auto_start_features)
+
+    # --- UI updates (any thread) ---
+    def set_status(self, text):
+        self.ui.post(self.status_var.set, f"Status: {text}")
+
+    def log(self, text):
+        self.ui.post(self._append_log, text)
+
+    def _append_log(self, text):
+        self.ai_text.insert("end", f"{text}\n")
+        self.ai_text.see("end")
+
+    # --- Commands ---
+    def run_command(self, cmd):
+        """Handle `cmd` on the command pool; returns its Command."""
+        timeout = AI_COMMAND_TIMEOUT if cmd.lower().strip().startswith("ai ") else None
+        return self.commands.submit(self._handle_and_idle, cmd, name=cmd, timeout=timeout)
+
+    def _handle_and_idle(self, cmd):
+        self.set_status(f"Handling: {cmd}")
+        try:
+            self.handle_command(cmd)
+        finally:
+            if len(self.commands.pending) <= 1:   # no other command still running
+                self.set_status("Idle")
+
+    def _command_timed_out(self, command):
+        self.log(f"(timed out: {command.name})")
+        self.set_status("Idle")
+
+    def cancel_commands(self):
+        self.commands.cancel_all()
+        if _tts is not None:
+            _tts.cancel_all()
+        self.set_status("Idle")
 
     def _animate(self):
         # simple pulsing animation
@@ -405,6 +791,9 @@ class AssistantGUI:
         """Auto-start wake word and gesture control on app launch"""
         print("Auto-starting features...")
         
+        # TTS engine and input automation load in the background
+        threading.Thread(target=preload_subsystems, name="preload", daemon=True).start()
+        
         # Start wake word detection
         try:
             self.wake_thread = WakeWordThread(self.on_wake)
@@ -412,17 +801,29 @@ class AssistantGUI:
             print("✓ Wake word detection started (say 'hey assistant')")
         except Exception as e:
             print(f"⚠ Wake word failed to start: {e}")
+            STARTUP.failed("speech", e)
         
-        # Start gesture control
-        try:
-            self.gesture_thread = HandGestureThread()
-            self.gesture_thread.start()
-            print("✓ Gesture control started (swipe left/right to switch tabs)")
-        except Exception as e:
-            print(f"⚠ Gesture control failed to start: {e}")
+        # Start gesture control, unless main() already did
+        if self.gesture_thread is None:
+            self.gesture_thread = start_gesture_control()
         
-        # Update status
-        self.status_var.set("Status: Ready (Voice + Gestures active)")
+        # Status follows the subsystems as they come up
+        self._poll_startup()
+    
+    def _poll_startup(self):
+        pending = STARTUP.pending()
+        if pending:
+            self.status_var.set(f"Status: Starting ({', '.join(pending)} loading...)")
+            self.root.after(STARTUP_POLL_MS, self._poll_startup)
+            return
+        unavailable = STARTUP.unavailable()
+        if unavailable:
+            self.status_var.set(f"Status: Ready ({', '.join(unavailable)} unavailable)")
+        else:
+            self.status_var.set("Status: Ready (Voice + Gestures active)")
+        STARTUP.mark("all subsystems settled")
+        if self.profile_startup:
+            print(STARTUP.report())
     
     def start_wake(self):
         """Manual start for wake word (if needed)"""
@@ -439,40 +840,53 @@ class AssistantGUI:
             self.wake_thread.stop()
         self.status_var.set("Status: Idle")
 
-    def on_wake(self):
-        # when wake word detected, listen for a command
-        self.status_var.set("Status: Listening for command...")
-        speak("Yes?")
-        cmd = listen_once(timeout=6, phrase_time_limit=6)
+    def on_wake(self, wake_end=None):
+        # when wake word detected, listen for a command: from where the
+        # wake phrase ended, so a command said straight after it is kept.
+        # Runs on the wake thread; the command itself goes to the pool.
+        self.set_status("Listening for command...")
+        service = audio_capture()
+        if service is None:
+            return
+        with service.subscribe(since=wake_end) as audio:
+            if not audio.wait_for_speech(WAKE_ACK_GRACE_MS / 1000):
+                speak("Yes?", URGENT)
+            cmd = recognize_command(audio, service.rate, timeout=6, phrase_time_limit=6)
         if not cmd:
             speak("I didn't hear anything.")
-            self.status_var.set("Status: Idle")
+            self.set_status("Idle")
             return
-        self.status_var.set(f"Status: Handling: {cmd}")
-        self.handle_command(cmd)
-        self.status_var.set("Status: Idle")
+        self.run_command(cmd)
 
     def listen_and_handle(self):
-        self.status_var.set("Status: Listening...")
-        speak("Listening")
+        self.set_status("Listening...")
+        self.commands.submit(self._listen_and_handle, name="listen")
+
+    def _listen_and_handle(self):
+        speak("Listening", URGENT)
         cmd = listen_once(timeout=8, phrase_time_limit=8)
+        if cancelled():
+            return
         if cmd:
-            self.cmd_entry.delete(0, tk.END)
-            self.cmd_entry.insert(0, cmd)
-            self.handle_command(cmd)
+            self.ui.post(self._show_command, cmd)
+            self.run_command(cmd)
         else:
             speak("No input detected.")
-            self.status_var.set("Status: Idle")
+            self.set_status("Idle")
+
+    def _show_command(self, cmd):
+        self.cmd_entry.delete(0, tk.END)
+        self.cmd_entry.insert(0, cmd)
 
     def send_typed(self):
         cmd = self.cmd_entry.get().strip()
         if cmd:
-            self.handle_command(cmd)
+            self.run_command(cmd)
 
     def handle_command(self, cmd):
+        """Carry out `cmd`. Runs on a command worker: widgets only through set_status/log."""
         cmd = cmd.lower().strip()
-        self.ai_text.insert("end", f"> {cmd}\n")
-        self.ai_text.see("end")
+        self.log(f"> {cmd}")
 
         # simple command parsing
         if cmd.startswith("open "):
@@ -548,9 +962,10 @@ class AssistantGUI:
             prompt = cmd.replace("ai ", "", 1)
             speak("Asking AI...")
             answer = call_gemini(prompt)
-            self.ai_text.insert("end", f"AI: {answer}\n")
-            self.ai_text.see("end")
-            speak(answer)
+            if cancelled():     # timed out or cancelled meanwhile: nobody wants the answer now
+                return
+            self.log(f"AI: {answer}")
+            speak(answer, LOW)
             return
 
         # fallback: try to open as app or search web
@@ -583,17 +998,29 @@ class AssistantGUI:
         speak("Gesture control stopped.")
     
     def _exit(self):
+        self.commands.shutdown()
         if self.wake_thread:
             self.wake_thread.stop()
+        if _tts is not None:
+            _tts.stop()
         if self.gesture_thread:
             self.gesture_thread.stop()
+        if self.profile_startup and STARTUP.pending():
+            print(STARTUP.report())
         self.root.quit()
 
 # --- Launcher ---------------------------------------------------------------
-def main():
-    init_mic()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ThinkPad voice and gesture assistant.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a start-up timeline once every subsystem is ready")
+    args = parser.parse_args(argv)
+    STARTUP.mark("main")
+    # The hand detector loads and warms up while the window is built
+    gesture_thread = start_gesture_control()
     root = tk.Tk()
-    app = AssistantGUI(root)
+    STARTUP.mark("Tk root created")
+    app = AssistantGUI(root, profile_startup=args.profile_startup, gesture_thread=gesture_thread)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+"""
+Out-of-process hand inference.
+
+RemoteHands is a drop-in for mp.solutions.hands.Hands (`process(rgb)` and
+`close()`) that runs the detector in a worker process, so MediaPipe's Python
+work no longer competes for the GIL with the GUI, speech and TTS threads:
+
+    controller = GestureController(hands=RemoteHands(max_num_hands=2))
+
+Frames travel through a multiprocessing.shared_memory ring: each image is
+copied once into the next slot and only (seq, slot, shape) is queued, never
+the pixels. Landmarks come back over a small result queue. A worker that
+dies or stops answering is restarted (at most once per RESTART_BACKOFF
+seconds, and not after MAX_RESTARTS failures in a row); frames processed while
+it is down or still loading the model return no hands.
+"""
+import multiprocessing
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from gesture_controller import MAX_NUM_HANDS, MP_HANDS_OPTIONS, hands_from_results
+
+RING_SLOTS = 3                  # a late answer's slot is not overwritten for RING_SLOTS - 1 frames
+MAX_FRAME_SHAPE = (1080, 1920, 3)  # initial slot size; grows (with a restart) for larger frames
+FRAME_TIMEOUT = 1.0             # seconds to wait for one frame's landmarks
+START_TIMEOUT = 30.0            # seconds allowed for the worker to load the model
+RESTART_BACKOFF = 2.0
+MAX_RESTARTS = 5
+POLL_INTERVAL = 0.05            # how often a waiting call checks that the worker is alive
+
+# MediaPipe-shaped results: enough for gesture_controller.hands_from_results
+RemoteResults = namedtuple("RemoteResults", ["multi_hand_landmarks", "multi_handedness"])
+Classification = namedtuple("Classification", ["classification"])
+Category = namedtuple("Category", ["label", "score"])
+NO_HANDS = RemoteResults(None, None)
+
+
+def mediapipe_hands(**options):
+    """Default detector factory; called inside the worker."""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**options)
+
+
+def _worker_main(shm_name, slot_bytes, requests, results, factory, options):
+    """Worker loop: (seq, slot, shape) in, (seq, [(points, handedness, score), ...]) out."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        detector = factory(**options)
+        results.put(("ready", None))
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            seq, slot, shape = request
+            rgb = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            hands = hands_from_results(detector.process(rgb))
+            del rgb  # release the view of shared memory before the next frame (and close())
+            results.put((seq, [(hand.points, hand.handedness, hand.score) for hand in hands]))
+        detector.close()
+    finally:
+        shm.close()
+
+
+class RemoteHands:
+    """Hand detector proxy backed by a supervised worker process."""
+
+    def __init__(self, max_num_hands=MAX_NUM_HANDS, factory=mediapipe_hands, slots=RING_SLOTS,
+                 max_frame_shape=MAX_FRAME_SHAPE, timeout=FRAME_TIMEOUT, **options):
+        """
+        Args:
+            max_num_hands, options: passed to `factory` (default: MediaPipe
+                Hands with gesture_controller's MP_HANDS_OPTIONS).
+            factory: picklable callable building the detector in the worker.
+            slots: shared-memory ring size.
+            max_frame_shape: largest frame expected (the ring grows if needed).
+            timeout: seconds to wait for a frame before restarting the worker.
+        """
+        self.factory = factory
+        self.options = dict(MP_HANDS_OPTIONS, max_num_hands=max_num_hands, **options)
+        self.slots = slots
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.timeout = timeout
+        self.restart_backoff = RESTART_BACKOFF
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._shm = None
+        self._seq = 0
+        self._ready = False
+        self._next_start = 0.0
+        self.failures = 0            # consecutive, reset by a successful frame
+        self.restarts = 0
+        self.frames = 0
+        self.roundtrip_total = 0.0
+        self._start()
+
+    # --- worker lifecycle ---
+    def _start(self):
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main, daemon=True, name="hand-inference",
+            args=(self._shm.name, self.slot_bytes, self._requests, self._results, self.factory, self.options))
+        self._process.start()
+        self._ready = False
+        self._start_deadline = time.monotonic() + START_TIMEOUT
+
+    def _stop(self):
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(1.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1.0)
+        for q in (self._requests, self._results):
+            q.close()
+            q.cancel_join_thread()
+        self._shm.close()
+        self._shm.unlink()
+        self._process = self._shm = None
+
+    def _fail(self, reason):
+        """Stop a broken worker; the next process() call restarts it after the backoff."""
+        self.failures += 1
+        self._stop()
+        if self.failures > MAX_RESTARTS:
+            print(f"Inference worker {reason}; giving up after {MAX_RESTARTS} restarts")
+        else:
+            print(f"Inference worker {reason}; restarting")
+        self._next_start = time.monotonic() + self.restart_backoff
+
+    def _ensure_running(self):
+        """True when the worker can take a frame now."""
+        if self._process is None:
+            if self.failures > MAX_RESTARTS or time.monotonic() < self._next_start:
+                return False
+            self.restarts += 1
+            self._start()
+        if not self._ready:
+            try:
+                message, _ = self._results.get_nowait()
+                self._ready = message == "ready"
+            except queue.Empty:
+                if not self._process.is_alive():
+                    self._fail("exited during start-up")
+                elif time.monotonic() > self._start_deadline:
+                    self._fail("did not start in time")
+                return False
+        return True
+
+    @property
+    def ready(self):
+        """Whether the worker has loaded its model (as of the last process() call)."""
+        return self._ready
+
+    def wait_ready(self, timeout=START_TIMEOUT):
+        """Block until the worker has loaded its model; returns whether it is ready."""
+        deadline = time.monotonic() + timeout
+        while not self._ensure_running():
+            if time.monotonic() > deadline or self.failures > MAX_RESTARTS:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    # --- detector interface ---
+    def process(self, rgb):
+        """Detect hands in an RGB frame; same result shape as MediaPipe Hands.process."""
+        if rgb.nbytes > self.slot_bytes:
+            # Larger frames than planned: restart with bigger slots
+            self.slot_bytes = rgb.nbytes
+            self._stop()
+        if not self._ensure_running():
+            return NO_HANDS
+
+        start = time.perf_counter()
+        seq, slot = self._seq, self._seq % self.slots
+        self._seq += 1
+        np.ndarray(rgb.shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)[...] = rgb
+        self._requests.put((seq, slot, rgb.shape))
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                answer_seq, hands = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    self._fail("crashed")
+                    return NO_HANDS
+                if time.monotonic() > deadline:
+                    self._fail("timed out")
+                    return NO_HANDS
+                continue
+            if answer_seq == seq:
+                break
+        self.failures = 0
+        self.frames += 1
+        self.roundtrip_total += time.perf_counter() - start
+        if not hands:
+            return NO_HANDS
+        return RemoteResults([points for points, _, _ in hands],
+                             [Classification([Category(label, score)]) for _, label, score in hands])
+
+    def stats(self):
+        return {
+            "inference_frames": self.frames,
+            "inference_restarts": self.restarts,
+            "inference_roundtrip_avg_ms": 1000 * self.roundtrip_total / self.frames if self.frames else 0.0,
+        }
+
+    def close(self):
+        self._stop()
@@ -0,0 +1,135 @@
+"""
+Asynchronous OS-input dispatcher for gesture actions.
+
+InputDispatcher has the subset of pyautogui's interface that GestureController
+uses (moveTo, click, press, hotkey, mouseDown, mouseUp, scroll), but only
+queues the calls; a dedicated actuator thread injects them. pyautogui's PAUSE
+sleep and slow input injection therefore never stall the vision loop.
+
+Consecutive cursor moves are coalesced into the latest target. Every other
+action is kept, in order, and a move queued before a click still happens
+before that click.
+
+If pyautogui cannot be loaded (no display, missing package) the actuator
+thread records the failure in `error` and later calls are dropped. While
+the actuator is stalled, new cursor moves stop being queued once
+MAX_QUEUE_DEPTH calls are waiting; clicks, keys and mouse button changes
+are always queued, since dropping a mouseUp would leave the button held.
+"""
+import threading
+import time
+from collections import deque
+
+MAX_QUEUE_DEPTH = 256          # queued calls beyond which new cursor moves are dropped (the actuator is stuck)
+
+
+class InputDispatcher(threading.Thread):
+    """Actuator thread fed by a queue of pyautogui calls."""
+
+    def __init__(self, backend=None):
+        """`backend` defaults to pyautogui, imported on the actuator thread."""
+        super().__init__(daemon=True)
+        self.backend = backend
+        self.running = True
+        self.error = None       # why the actuator could not start, if it could not
+        self._cond = threading.Condition()
+        self._queue = deque()   # [name, args, kwargs, enqueued_at]
+        self.dispatched = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    # --- producer side (vision thread) ---
+    def _enqueue(self, name, args, kwargs):
+        with self._cond:
+            if self.error is not None:
+                self.dropped += 1
+                return
+            self._queue.append([name, args, kwargs, time.perf_counter()])
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify()
+
+    def moveTo(self, x, y):
+        with self._cond:
+            if self._queue and self._queue[-1][0] == "moveTo":
+                # Not dispatched yet: just retarget it. Its enqueue time stays
+                # that of the oldest move it stands for, so latency is not under-reported.
+                self._queue[-1][1] = (x, y)
+                self.coalesced += 1
+            elif len(self._queue) >= MAX_QUEUE_DEPTH:
+                self.dropped += 1    # a later move supersedes it anyway
+            else:
+                self._enqueue("moveTo", (x, y), {"_pause": False})
+
+    def click(self, *args, **kwargs):
+        self._enqueue("click", args, kwargs)
+
+    def press(self, *args, **kwargs):
+        self._enqueue("press", args, kwargs)
+
+    def hotkey(self, *args, **kwargs):
+        self._enqueue("hotkey", args, kwargs)
+
+    def mouseDown(self, *args, **kwargs):
+        self._enqueue("mouseDown", args, kwargs)
+
+    def mouseUp(self, *args, **kwargs):
+        self._enqueue("mouseUp", args, kwargs)
+
+    def scroll(self, *args, **kwargs):
+        self._enqueue("scroll", args, kwargs)
+
+    # --- actuator side ---
+    def run(self):
+        if self.backend is None:
+            try:
+                import pyautogui
+                self.backend = pyautogui
+            except Exception as e:
+                print(f"Input dispatch disabled, pyautogui failed to load: {e!r}")
+                with self._cond:
+                    self.error = e
+                    self.dropped += len(self._queue)
+                    self._queue.clear()
+                return
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or not self.running)
+                if not self._queue:
+                    break
+                name, args, kwargs, enqueued_at = self._queue.popleft()
+            try:
+                getattr(self.backend, name)(*args, **kwargs)
+            except Exception as e:
+                self.errors += 1
+                print(f"Input dispatch error ({name}): {e}")
+            latency = time.perf_counter() - enqueued_at
+            self.dispatched += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def stats(self):
+        """Queue depth and enqueue-to-injection latency."""
+        with self._cond:
+            depth = len(self._queue)
+        return {
+            "queue_depth": depth,
+            "max_queue_depth": self.max_depth,
+            "dispatched": self.dispatched,
+            "moves_coalesced": self.coalesced,
+            "dispatch_dropped": self.dropped,
+            "dispatch_error": repr(self.error) if self.error is not None else None,
+            "dispatch_latency_avg_ms": 1000 * self.latency_total / self.dispatched if self.dispatched else 0.0,
+            "dispatch_latency_max_ms": 1000 * self.latency_max,
+        }
+
+    def stop(self, timeout=1.0):
+        """Stop after dispatching whatever is still queued."""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,237 @@
+"""
+Learned static-gesture classifier over hand landmarks.
+
+An optional alternative to the gestures.json rules (gesture_definitions.py)
+for vocabularies that finger patterns cannot separate: a two-layer
+perceptron in plain NumPy over translation- and scale-normalized landmarks.
+Training uses labeled landmark recordings (landmark_recording.py --label):
+
+    python landmark_classifier.py train gesture_model.npz fist.lmk palm.lmk ...
+    python landmark_classifier.py eval gesture_model.npz test.lmk
+
+`train` holds out part of the frames and prints per-class precision and
+recall on them; `eval` prints the same for the model and for the rules. The
+model file is a small .npz (a few KB) that LandmarkClassifier loads on first
+use, and the controller uses it with GestureController(classifier=...).
+Inference is one pass over the whole batch of hands: two matrix products.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+FEATURES = "xy-wrist-palm-v1"   # feature layout stored in (and checked against) model files
+PALM_LANDMARK = 9               # middle finger MCP: wrist distance to it is the hand's scale
+MIN_PROBABILITY = 0.6           # below this, predict() says "Unknown"
+
+# Training defaults
+HIDDEN_UNITS = 32
+EPOCHS = 150
+BATCH_SIZE = 64
+LEARNING_RATE = 0.01
+WEIGHT_DECAY = 1e-4
+HOLDOUT = 0.2
+
+
+def landmark_features(poses):
+    """
+    (N, 42) float32 features of an (N, 21, 3) array: landmark x, y relative
+    to the wrist, divided by the wrist-to-palm distance. Depth is left out.
+    """
+    poses = np.asarray(poses, dtype=np.float32)
+    if poses.ndim == 2:
+        poses = poses[np.newaxis]
+    xy = poses[:, :, :2] - poses[:, :1, :2]
+    scale = np.hypot(xy[:, PALM_LANDMARK, 0], xy[:, PALM_LANDMARK, 1])
+    xy /= np.maximum(scale, 1e-6)[:, np.newaxis, np.newaxis]
+    return xy.reshape(len(poses), -1)
+
+
+class LandmarkClassifier:
+    """Two-layer perceptron over landmark_features. A model path is loaded on first use."""
+
+    def __init__(self, path=None, weights=None, min_probability=MIN_PROBABILITY):
+        """
+        Args:
+            path: model file written by save() / the train command.
+            weights: dict of w1, b1, w2, b2 and labels (instead of a path).
+            min_probability: top-class probability below which the label is "Unknown".
+        """
+        self.path = path
+        self.min_probability = min_probability
+        self._weights = weights
+
+    def _loaded(self):
+        if self._weights is None:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["features"]) != FEATURES:
+                    raise ValueError(f"{self.path}: model uses features {data['features']}, expected {FEATURES}")
+                self._weights = {name: data[name] for name in ("w1", "b1", "w2", "b2")}
+                self._weights["labels"] = [str(label) for label in data["labels"]]
+        return self._weights
+
+    @property
+    def labels(self):
+        return self._loaded()["labels"]
+
+    def logits(self, poses):
+        """(N, classes) scores of an (N, 21, 3) batch (or one (21, 3) pose)."""
+        w = self._loaded()
+        hidden = landmark_features(poses) @ w["w1"] + w["b1"]
+        np.maximum(hidden, 0, out=hidden)
+        return hidden @ w["w2"] + w["b2"]
+
+    def predict_proba(self, poses):
+        logits = self.logits(poses)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, poses):
+        """Gesture name per pose; "Unknown" when the model is not confident enough."""
+        logits = self.logits(poses)
+        best = logits.argmax(axis=1)
+        # Top-class softmax probability without normalizing every class
+        top = 1.0 / np.exp(logits - logits[np.arange(len(logits)), best, np.newaxis]).sum(axis=1)
+        labels = self.labels
+        return [labels[i] if p >= self.min_probability else "Unknown" for i, p in zip(best, top)]
+
+    def save(self, path):
+        w = self._loaded()
+        np.savez_compressed(path, features=FEATURES, labels=np.array(w["labels"]),
+                            **{name: w[name].astype(np.float32) for name in ("w1", "b1", "w2", "b2")})
+
+
+def train(poses, labels, hidden=HIDDEN_UNITS, epochs=EPOCHS, batch_size=BATCH_SIZE,
+          learning_rate=LEARNING_RATE, weight_decay=WEIGHT_DECAY, seed=0):
+    """
+    Fit a LandmarkClassifier with mini-batch Adam on softmax cross-entropy.
+    Args:
+        poses: (N, 21, 3) landmarks.
+        labels: N gesture names.
+    """
+    classes = sorted(set(labels))
+    index = {label: i for i, label in enumerate(classes)}
+    y = np.array([index[label] for label in labels])
+    x = landmark_features(poses).astype(np.float64)
+    mean = x.mean(axis=0)
+    std = np.maximum(x.std(axis=0), 1e-3)   # the wrist is always at the origin
+    x = (x - mean) / std
+
+    rng = np.random.default_rng(seed)
+    params = [rng.normal(0, np.sqrt(2 / x.shape[1]), (x.shape[1], hidden)), np.zeros(hidden),
+              rng.normal(0, np.sqrt(1 / hidden), (hidden, len(classes))), np.zeros(len(classes))]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, step = 0.9, 0.999, 0
+    for _ in range(epochs):
+        order = rng.permutation(len(x))
+        for start in range(0, len(x), batch_size):
+            batch = order[start:start + batch_size]
+            w1, b1, w2, b2 = params
+            h = np.maximum(x[batch] @ w1 + b1, 0)
+            logits = h @ w2 + b2
+            p = np.exp(logits - logits.max(axis=1, keepdims=True))
+            p /= p.sum(axis=1, keepdims=True)
+            p[np.arange(len(batch)), y[batch]] -= 1
+            p /= len(batch)
+            dh = (p @ w2.T) * (h > 0)
+            grads = [x[batch].T @ dh + weight_decay * w1, dh.sum(axis=0),
+                     h.T @ p + weight_decay * w2, p.sum(axis=0)]
+            step += 1
+            for param, grad, m, v in zip(params, grads, moments, velocities):
+                m += (1 - beta1) * (grad - m)
+                v += (1 - beta2) * (grad * grad - v)
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+
+    # Fold the standardization into the first layer so inference skips it
+    w1, b1, w2, b2 = params
+    weights = {
+        "w1": (w1 / std[:, np.newaxis]).astype(np.float32),
+        "b1": (b1 - (mean / std) @ w1).astype(np.float32),
+        "w2": w2.astype(np.float32),
+        "b2": b2.astype(np.float32),
+        "labels": classes,
+    }
+    return LandmarkClassifier(weights=weights)
+
+
+def class_report(truth, predicted):
+    """
+    Accuracy and per-class precision/recall of predicted vs true labels.
+    Returns: {"accuracy": float, "classes": {label: {precision, recall, support}}}
+    """
+    truth, predicted = np.asarray(truth), np.asarray(predicted)
+    classes = {}
+    for label in sorted(set(truth.tolist())):
+        hits = np.sum((predicted == label) & (truth == label))
+        claimed = np.sum(predicted == label)
+        support = np.sum(truth == label)
+        classes[label] = {
+            "precision": float(hits / claimed) if claimed else 0.0,
+            "recall": float(hits / support),
+            "support": int(support),
+        }
+    return {"accuracy": float(np.mean(truth == predicted)) if len(truth) else 0.0, "classes": classes}
+
+
+def labeled_poses(paths):
+    """(poses (M, 21, 3), labels) of every labeled hand in the given recordings."""
+    from landmark_recording import LandmarkRecording
+
+    all_poses, all_labels = [], []
+    for path in paths:
+        recording = LandmarkRecording(path)
+        poses, _, label_index = recording.poses()
+        keep = label_index >= 0
+        all_poses.append(poses[keep])
+        all_labels.extend(recording.labels[i] for i in label_index[keep])
+    if not all_poses:
+        return np.zeros((0, 21, 3), dtype=np.float32), []
+    return np.concatenate(all_poses), all_labels
+
+
+def print_report(title, report):
+    print(f"{title}: accuracy {report['accuracy']:.3f}")
+    print(f"  {'gesture':<18} {'precision':>9} {'recall':>7} {'support':>8}")
+    for label, r in report["classes"].items():
+        print(f"  {label:<18} {r['precision']:9.3f} {r['recall']:7.3f} {r['support']:8d}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned landmark classifier.")
+    parser.add_argument("command", choices=["train", "eval"])
+    parser.add_argument("model", help="model file (.npz)")
+    parser.add_argument("recordings", nargs="+", help="labeled landmark recordings (.lmk)")
+    parser.add_argument("--holdout", type=float, default=HOLDOUT, help="fraction of frames kept for evaluation")
+    parser.add_argument("--hidden", type=int, default=HIDDEN_UNITS)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    poses, labels = labeled_poses(args.recordings)
+    if not labels:
+        print("No labeled frames in the given recordings (record them with --label)")
+        return 1
+    labels = np.array(labels)
+
+    if args.command == "train":
+        order = np.random.default_rng(args.seed).permutation(len(labels))
+        n_test = int(len(labels) * args.holdout)
+        test, fit = order[:n_test], order[n_test:]
+        model = train(poses[fit], labels[fit].tolist(), hidden=args.hidden, epochs=args.epochs, seed=args.seed)
+        model.save(args.model)
+        print(f"Trained on {len(fit)} frames, {len(model.labels)} gestures -> {args.model}")
+        if n_test:
+            print_report(f"Held-out frames ({n_test})", class_report(labels[test], model.predict(poses[test])))
+        return 0
+
+    from gesture_controller import GESTURE_LABELS, classify_batch
+    model = LandmarkClassifier(args.model)
+    print_report(f"Model {args.model}", class_report(labels, model.predict(poses)))
+    rules = [GESTURE_LABELS[code] for code in classify_batch(poses)]
+    print_report("gestures.json rules", class_report(labels, rules))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
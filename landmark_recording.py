@@ -0,0 +1,349 @@
+"""
+Compact landmark recording and deterministic replay for the gesture pipeline.
+
+A recording is a small binary file:
+    8 bytes   magic b"LMKREC03"
+    4 bytes   little-endian header length
+    N bytes   JSON header (max_hands, frame_size, labels, start_time)
+    records   fixed-size records (see RECORD_DTYPE), appended as they arrive
+
+Each record holds one hand, so a frame takes as many records as it has hands.
+x and y are stored as int16 in units of 1/POINT_SCALE, the wrist in image
+coordinates and the other landmarks relative to it (~0.00006 resolution); z,
+which MediaPipe already gives relative to the wrist, as int8 in units of
+1/DEPTH_SCALE. A record is 130 bytes: at 30 fps that is about 14 MB per hour
+with one hand in view and 28 MB with two. A run of consecutive frames with
+no hand is a single record holding the run's length and last timestamp,
+rewritten in place as the run grows, so idle time costs nothing; a session
+stays at a few MB an hour only when hands are in view for part of it.
+
+Recordings are read back through np.memmap and replayed through
+GestureController.process_hands without a camera or MediaPipe; replay
+expands each run back into one empty frame per camera frame, because drag
+release, debouncing and idle mode count empty frames.
+
+Usage:
+    python landmark_recording.py record session.lmk [--label "Fist"] [--source 0]
+    python landmark_recording.py replay session.lmk [--realtime]
+    python landmark_recording.py info session.lmk
+"""
+import json
+import os
+import struct
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from gesture_controller import GESTURE_LABELS, NUM_LANDMARKS, Hand
+
+MAGIC = b"LMKREC03"
+HANDEDNESS = ("Unknown", "Left", "Right")
+UNLABELED = -1
+POINT_SCALE = 16384        # x, y units per normalized image width/height (int16: +-2)
+DEPTH_SCALE = 256          # z units per normalized width (int8: +-0.5)
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),                              # seconds since start_time
+    ("repeat", "<u4"),                         # frames it starts: >1 for a run without hands, 0 for a later hand
+    ("t_end", "<f8"),                          # timestamp of the last of them
+    ("num_hands", "u1"),                       # hands in the frame
+    ("slot", "u1"),                            # which of them this record holds; 0 starts a frame
+    ("handedness", "u1"),                      # index into HANDEDNESS
+    ("label", "i1"),                           # index into header labels, -1 = unlabeled
+    ("score", "u1"),                           # detection score * 255
+    ("xy", "<i2", (NUM_LANDMARKS, 2)),         # wrist, then the rest relative to it
+    ("z", "i1", (NUM_LANDMARKS,)),
+])
+
+
+def encode_points(points):
+    """(21, 3) float landmarks -> (xy, z) as stored in a record."""
+    xy = np.array(points[:, :2], dtype=np.float64)
+    xy[1:] -= xy[0]
+    xy = np.clip(np.rint(xy * POINT_SCALE), -32768, 32767).astype(np.int16)
+    z = np.clip(np.rint(np.asarray(points[:, 2], dtype=np.float64) * DEPTH_SCALE), -128, 127).astype(np.int8)
+    return xy, z
+
+
+def decode_points(records):
+    """(M, 21, 3) float32 landmarks of an array of records."""
+    points = np.empty(records.shape + (NUM_LANDMARKS, 3), dtype=np.float32)
+    xy = records["xy"].astype(np.float32) / POINT_SCALE
+    xy[..., 1:, :] += xy[..., :1, :]
+    points[..., :2] = xy
+    points[..., 2] = records["z"].astype(np.float32) / DEPTH_SCALE
+    return points
+
+
+class LandmarkRecorder:
+    """Append timestamped hand landmarks to a recording file."""
+
+    def __init__(self, path, max_hands=1, frame_size=(0, 0), labels=GESTURE_LABELS, label=None):
+        """
+        `label` is the default ground-truth label for appended frames. Labels
+        missing from `labels` (gestures from another gestures.json, or ones
+        only a trained classifier knows) are added to the header's list.
+        """
+        self.path = path
+        self.max_hands = max_hands
+        self.labels = list(labels)
+        if label is not None and label not in self.labels:
+            self.labels.append(label)
+        self.label = label
+        self.start_time = None
+        self.frames_written = 0
+        self._frame_size = list(frame_size)
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, "wb")
+        self._had_hands = True  # so the very first frame is always written
+        self._record_size = self._record.dtype.itemsize
+
+    def _write_header(self, start_time):
+        self.start_time = start_time
+        header = json.dumps({
+            "version": 3,
+            "max_hands": self.max_hands,
+            "frame_size": self._frame_size,
+            "labels": self.labels,
+            "start_time": start_time,
+        }).encode("utf-8")
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def append(self, timestamp, hands, label=None):
+        """
+        Record one frame.
+        Args:
+            timestamp: time.time() of the frame.
+            hands: list of Hand tuples (only the first max_hands are kept).
+            label: optional ground-truth gesture name for every hand in the frame.
+        """
+        if label is None:
+            label = self.label
+        if label is not None and label not in self.labels:
+            if self.start_time is not None:
+                raise ValueError(f"label {label!r} is not in this recording's header; "
+                                 f"pass it in labels= when creating the recorder")
+            self.labels.append(label)
+        if self.start_time is None:
+            self._write_header(timestamp)
+        rec = self._record[0]
+        if not hands and not self._had_hands:
+            # Still no hand: the last record is this run; count the frame in it
+            rec["repeat"] += 1
+            rec["t_end"] = timestamp - self.start_time
+            self._file.seek(-self._record_size, os.SEEK_CUR)
+            self._file.write(self._record.tobytes())
+            return
+        self._had_hands = bool(hands)
+
+        hands = hands[:self.max_hands]
+        rec["t"] = rec["t_end"] = timestamp - self.start_time
+        rec["num_hands"] = len(hands)
+        rec["label"] = self.labels.index(label) if label is not None else UNLABELED
+        if not hands:
+            rec["repeat"], rec["slot"], rec["handedness"], rec["score"] = 1, 0, 0, 0
+            rec["xy"], rec["z"] = 0, 0
+            self._file.write(self._record.tobytes())
+        for slot, hand in enumerate(hands):
+            rec["repeat"] = 1 if slot == 0 else 0
+            rec["slot"] = slot
+            rec["handedness"] = HANDEDNESS.index(hand.handedness) if hand.handedness in HANDEDNESS else 0
+            rec["score"] = round(255 * min(max(hand.score, 0.0), 1.0))
+            rec["xy"], rec["z"] = encode_points(hand.points)
+            self._file.write(self._record.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                if magic[:6] == MAGIC[:6]:
+                    raise ValueError(f"{path} is an older landmark recording format; record it again")
+                raise ValueError(f"{path} is not a landmark recording")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+        offset = len(MAGIC) + 4 + header_len
+        count = (os.path.getsize(path) - offset) // RECORD_DTYPE.itemsize  # drop a torn last record
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._starts = np.flatnonzero(self.records["slot"] == 0)   # the record starting each frame
+        self.labels = self.header["labels"]
+        self.frame_size = tuple(self.header["frame_size"])
+        self.start_time = self.header["start_time"]
+
+    def __len__(self):
+        """Records in the file; see frame_count for camera frames."""
+        return len(self.records)
+
+    @property
+    def frame_count(self):
+        """Camera frames recorded, counting each frame of a run without hands."""
+        return int(self.records["repeat"].sum())
+
+    @property
+    def duration(self):
+        return float(self.records["t_end"][-1]) if len(self.records) else 0.0
+
+    def timeline(self):
+        """
+        Every recorded camera frame, with runs without hands expanded.
+        The frames of a run are spread evenly between its first and last timestamp.
+        Returns:
+            (timestamps (F,) float64 seconds since start_time,
+             index (F,) of the record starting each frame: its first hand, if any)
+        """
+        starts = self.records[self._starts]
+        repeat = starts["repeat"].astype(np.int64)
+        index = np.repeat(np.arange(len(starts)), repeat)
+        first = np.cumsum(repeat) - repeat                 # frame number of each record's first frame
+        step = (starts["t_end"] - starts["t"]) / np.maximum(repeat - 1, 1)
+        t = starts["t"][index] + (np.arange(len(index)) - first[index]) * step[index]
+        return t, self._starts[index]
+
+    def hands_at(self, index):
+        """Hand tuples of the frame starting at record `index`, with float32 landmarks."""
+        records = self.records[index:index + self.records[index]["num_hands"]]
+        return [Hand(points, HANDEDNESS[rec["handedness"]], float(rec["score"]) / 255)
+                for rec, points in zip(records, decode_points(records))]
+
+    def __iter__(self):
+        """Yield (timestamp, hands) of every camera frame (see timeline), with absolute timestamps."""
+        t, index = self.timeline()
+        for timestamp, i in zip(t.tolist(), index.tolist()):
+            yield self.start_time + timestamp, self.hands_at(i)
+
+    def poses(self):
+        """
+        All recorded hands as arrays for batch evaluation.
+        Returns:
+            (poses (M, 21, 3) float32, index (M,) of the record starting each
+             hand's frame (as in timeline), labels (M,) int8)
+        """
+        hands = self.records[self.records["num_hands"] > 0]
+        frame_index = np.flatnonzero(self.records["num_hands"] > 0) - hands["slot"]
+        return decode_points(hands), frame_index, hands["label"]
+
+
+class ActionLog:
+    """Stand-in for pyautogui that records calls instead of injecting input."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+        return record
+
+
+def replay(recording, controller, speed=None):
+    """
+    Feed a recording through controller.process_hands.
+    Args:
+        recording: LandmarkRecording (or path to one).
+        controller: GestureController; pass output=ActionLog() to keep input off the OS.
+        speed: None replays as fast as possible, 1.0 at recorded speed, 2.0 twice as fast...
+    Returns:
+        dict with frames, recorded duration, wall time and real-time factor.
+    """
+    if not isinstance(recording, LandmarkRecording):
+        recording = LandmarkRecording(recording)
+    frame_w, frame_h = recording.frame_size
+    wall_start = time.perf_counter()
+    for timestamp, hands in recording:
+        if speed:
+            delay = (timestamp - recording.start_time) / speed - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+        controller.process_hands(hands, frame_w, frame_h, now=timestamp)
+    wall = time.perf_counter() - wall_start
+    return {
+        "frames": recording.frame_count,
+        "duration_s": recording.duration,
+        "wall_s": wall,
+        "realtime_factor": recording.duration / wall if wall > 0 else float("inf"),
+    }
+
+
+def _record(path, label=None, source=0):
+    import cv2
+    from frame_sources import open_source
+    from gesture_controller import GestureController
+
+    # Actions go to a log, not the desktop: a labeled take must not click or drag
+    gc = GestureController(output=ActionLog())
+    source = open_source(source)
+    if not source.opened:
+        print("Could not open the camera")
+        return
+    source.start()
+    try:
+        for frame, _ in source:
+            if gc.recorder is None:
+                gc.recorder = LandmarkRecorder(path, max_hands=gc.max_num_hands,
+                                               frame_size=(frame.shape[1], frame.shape[0]), label=label)
+                print(f"Recording to {path}. Press Esc to stop.")
+            processed, _ = gc.process_frame(frame)
+            cv2.imshow("Recording landmarks", processed)
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+    finally:
+        source.stop()
+        cv2.destroyAllWindows()
+        gc.release()
+    if gc.recorder is None:
+        print("Could not read from the camera")
+        return
+    print(f"Wrote {gc.recorder.frames_written} frames ({os.path.getsize(path)} bytes)")
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Record or replay gesture landmark streams.")
+    parser.add_argument("command", choices=["record", "replay", "info"])
+    parser.add_argument("path")
+    parser.add_argument("--label", help="ground-truth gesture label for every recorded frame")
+    parser.add_argument("--realtime", action="store_true", help="replay at recorded speed")
+    parser.add_argument("--source", default="0", help="record from this camera index, video file or image directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        _record(args.path, args.label, args.source)
+        return
+
+    recording = LandmarkRecording(args.path)
+    print(f"{args.path}: {recording.frame_count} frames ({len(recording)} records), {recording.duration:.1f} s, "
+          f"{os.path.getsize(args.path)} bytes, frame size {recording.frame_size}")
+    if args.command == "replay":
+        from gesture_controller import GestureController
+        log = ActionLog()
+        stats = replay(recording, GestureController(output=log), speed=1.0 if args.realtime else None)
+        print(f"Replayed in {stats['wall_s']:.3f} s ({stats['realtime_factor']:.0f}x real time)")
+        for name, count in Counter(name for name, _ in log.calls).most_common():
+            print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,147 @@
+"""
+Per-stage latency instrumentation for the gesture pipeline.
+
+PipelineTimer accumulates the time spent in each stage during a frame and, at
+the end of the frame, records every stage's total into a fixed-size
+logarithmic histogram, so memory stays constant however long the session:
+
+    timer.begin_frame()
+    with timer.stage("detect"):
+        results = hands.process(rgb)
+    timer.end_frame()
+    timer.report()["detect"]["p95_ms"]
+
+Stage context managers are created once and reused, so timing a stage costs
+two perf_counter() calls. write_jsonl() appends a snapshot of the report as
+one JSON line, for collecting latency from machines without a profiler.
+"""
+import json
+import math
+import time
+
+# Stages in pipeline order. "capture" is the frame's age when processing starts.
+PIPELINE_STAGES = ("capture", "preprocess", "detect", "classify", "dispatch", "overlay", "display", "total")
+
+HISTOGRAM_MIN = 1e-5           # 10 us; faster samples go in the first bucket
+HISTOGRAM_DECADES = 6          # up to 10 s
+HISTOGRAM_BUCKETS_PER_DECADE = 20  # ~12% bucket width
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in seconds."""
+
+    def __init__(self):
+        self.counts = [0] * (HISTOGRAM_DECADES * HISTOGRAM_BUCKETS_PER_DECADE + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds > HISTOGRAM_MIN:
+            i = int(math.log10(seconds / HISTOGRAM_MIN) * HISTOGRAM_BUCKETS_PER_DECADE) + 1
+            self.counts[min(i, len(self.counts) - 1)] += 1
+        else:
+            self.counts[0] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Upper edge (seconds) of the bucket holding the p-th percentile (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        last = len(self.counts) - 1
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                if i == last:  # overflow bucket
+                    return self.max
+                return min(HISTOGRAM_MIN * 10 ** (i / HISTOGRAM_BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * self.percentile(50),
+            "p95_ms": 1000 * self.percentile(95),
+            "p99_ms": 1000 * self.percentile(99),
+            "max_ms": 1000 * self.max,
+        }
+
+
+class _Stage:
+    """Reusable context manager adding its elapsed time to one stage."""
+
+    def __init__(self, timer, index):
+        self.timer = timer
+        self.index = index
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer._add(self.index, time.perf_counter() - self.start)
+
+
+class PipelineTimer:
+    """Per-frame stage accumulators feeding one LatencyHistogram per stage."""
+
+    def __init__(self, stages=PIPELINE_STAGES):
+        self.stages = tuple(stages)
+        self.histograms = [LatencyHistogram() for _ in self.stages]
+        self._index = {name: i for i, name in enumerate(self.stages)}
+        self._contexts = [_Stage(self, i) for i in range(len(self.stages))]
+        self._frame_time = [0.0] * len(self.stages)
+        self._frame_hit = [False] * len(self.stages)
+        self._frame_start = None
+        self.frames = 0
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame."""
+        return self._contexts[self._index[name]]
+
+    def record(self, name, seconds):
+        """
+        Record a duration measured outside begin_frame/end_frame (frame age,
+        display time) straight into the stage's histogram. Each stage should
+        be recorded from one thread only.
+        """
+        self.histograms[self._index[name]].record(seconds)
+
+    def _add(self, index, seconds):
+        self._frame_time[index] += seconds
+        self._frame_hit[index] = True
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Record this frame's stage totals. Stages that did not run are not recorded."""
+        if self._frame_start is not None and "total" in self._index:
+            self._add(self._index["total"], time.perf_counter() - self._frame_start)
+            self._frame_start = None
+        for i, hit in enumerate(self._frame_hit):
+            if hit:
+                self.histograms[i].record(self._frame_time[i])
+                self._frame_time[i] = 0.0
+                self._frame_hit[i] = False
+        self.frames += 1
+
+    def percentiles(self, name, ps=(50, 95, 99)):
+        """Latency percentiles of one stage, in milliseconds."""
+        histogram = self.histograms[self._index[name]]
+        return [1000 * histogram.percentile(p) for p in ps]
+
+    def report(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} for stages with samples."""
+        return {name: h.summary() for name, h in zip(self.stages, self.histograms) if h.count}
+
+    def write_jsonl(self, f, **extra):
+        """Append one JSON line with a timestamp, the frame count and the report to file object `f`."""
+        line = {"time": time.time(), "frames": self.frames, **extra, "stages": self.report()}
+        f.write(json.dumps(line) + "\n")
+        f.flush()
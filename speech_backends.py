@@ -0,0 +1,204 @@
+"""
+Speech recognizer backends with a streaming interface, and early command
+dispatch on stable partial results.
+
+A backend session is fed the utterance in pieces as it is spoken and may
+return a partial hypothesis after each one:
+
+    GoogleBackend     online, one request per utterance: no partials, text at finish()
+    VoskBackend       offline streaming (optional `vosk` package and model): partials as you speak
+    ScriptedBackend   deterministic stand-in for tests: partials from a script, by audio fed
+
+recognize_stream() drives a backend with an AudioSubscription (see
+audio_capture.py). With a streaming backend it returns as soon as the stable
+part of the partial unambiguously names an argument-free command ("volume
+up"), without waiting for the end of the utterance.
+"""
+import functools
+import json
+from collections import deque, namedtuple
+
+STABLE_PARTIALS = 2            # a word prefix is stable once this many partials in a row agree on it
+VOSK_MODEL_PATH = "vosk-model"  # directory of an unpacked Vosk model
+
+# text: what was recognized; early: dispatched on a stable partial before the utterance ended
+StreamResult = namedtuple("StreamResult", "text early")
+
+
+class RecognizerBackend:
+    """
+    One recognition session over one utterance of int16 mono audio.
+    Subclasses implement finish(); streaming ones also accept().
+    """
+
+    streaming = False
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.pieces = []
+
+    def accept(self, samples):
+        """Feed the next piece of the utterance; returns the partial text so far, or None."""
+        self.pieces.append(samples)
+        return None
+
+    def finish(self):
+        """Final (lowercase) text of everything fed; "" if nothing was understood."""
+        raise NotImplementedError
+
+
+@functools.lru_cache(maxsize=1)
+def _google_recognizer():
+    import speech_recognition as sr
+    return sr.Recognizer()
+
+
+class GoogleBackend(RecognizerBackend):
+    """speech_recognition's recognize_google on the whole utterance."""
+
+    def __init__(self, rate, language="en-in"):
+        super().__init__(rate)
+        self.language = language
+
+    def finish(self):
+        import numpy as np
+        import speech_recognition as sr
+        if not self.pieces:
+            return ""
+        audio = sr.AudioData(np.concatenate(self.pieces).tobytes(), self.rate, 2)
+        try:
+            return _google_recognizer().recognize_google(audio, language=self.language).lower()
+        except Exception:
+            return ""
+
+
+@functools.lru_cache(maxsize=2)
+def _vosk_model(path):
+    import vosk
+    return vosk.Model(path)
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline streaming recognition with Vosk (`pip install vosk` plus a model directory)."""
+
+    streaming = True
+
+    def __init__(self, rate, model_path=VOSK_MODEL_PATH):
+        super().__init__(rate)
+        import vosk
+        self._recognizer = vosk.KaldiRecognizer(_vosk_model(model_path), rate)
+        self._segments = []    # text of segments Vosk already finalized
+
+    def _text(self, last):
+        return " ".join(t for t in (*self._segments, last) if t)
+
+    def accept(self, samples):
+        if self._recognizer.AcceptWaveform(samples.tobytes()):
+            self._segments.append(json.loads(self._recognizer.Result())["text"])
+            return self._text("")
+        return self._text(json.loads(self._recognizer.PartialResult())["partial"])
+
+    def finish(self):
+        return self._text(json.loads(self._recognizer.FinalResult())["text"])
+
+
+class ScriptedBackend(RecognizerBackend):
+    """
+    Deterministic stand-in: `script` is a list of (seconds of audio, text);
+    once that much audio has been fed, the partial hypothesis is `text`.
+    finish() returns `final`, by default the last scripted text.
+    """
+
+    streaming = True
+
+    def __init__(self, rate, script, final=None):
+        super().__init__(rate)
+        self.script = sorted(script)
+        self.final = final if final is not None else (self.script[-1][1] if self.script else "")
+        self.fed = 0           # samples accepted
+
+    def accept(self, samples):
+        self.fed += len(samples)
+        heard = [text for seconds, text in self.script if seconds * self.rate <= self.fed]
+        return heard[-1] if heard else None
+
+    def finish(self):
+        return self.final
+
+
+BACKENDS = {"google": GoogleBackend, "vosk": VoskBackend}
+
+
+def make_backend(name, rate, **options):
+    """New session of the backend called `name` (see BACKENDS)."""
+    if name not in BACKENDS:
+        raise ValueError(f"unknown speech backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](rate, **options)
+
+
+# --- Early dispatch ---
+class PartialStabilizer:
+    """The word prefix the last `repeats` partial hypotheses agree on."""
+
+    def __init__(self, repeats=STABLE_PARTIALS):
+        self.history = deque(maxlen=repeats)
+
+    def update(self, text):
+        """Add a partial; returns the stable words (a tuple, empty until `repeats` partials arrived)."""
+        self.history.append(tuple(text.lower().split()))
+        if len(self.history) < self.history.maxlen:
+            return ()
+        stable = self.history[0]
+        for words in self.history:
+            n = 0
+            while n < min(len(stable), len(words)) and stable[n] == words[n]:
+                n += 1
+            stable = stable[:n]
+        return stable
+
+
+class CommandPrefixes:
+    """Argument-free command phrases that may be dispatched before the utterance ends."""
+
+    def __init__(self, phrases):
+        self.phrases = [tuple(phrase.lower().split()) for phrase in phrases]
+
+    def match(self, words):
+        """
+        The phrase the stable `words` start with, provided no other phrase
+        could still match as more words arrive (e.g. "turn on" waits while
+        "turn on wifi" is possible). None otherwise.
+        """
+        words = tuple(words)
+        consistent = [p for p in self.phrases if words[:len(p)] == p[:len(words)]]
+        complete = [p for p in consistent if len(p) <= len(words)]
+        if not complete:
+            return None
+        best = max(complete, key=len)
+        if any(len(p) > len(best) for p in consistent):
+            return None
+        return " ".join(best)
+
+
+def recognize_stream(audio, backend, timeout=4, max_seconds=8, early=None, on_partial=None):
+    """
+    Recognize the first utterance in an AudioSubscription while it is spoken.
+    Args:
+        backend: a fresh RecognizerBackend session.
+        early: CommandPrefixes to dispatch on stable partials (streaming backends only).
+        on_partial: called with each partial text.
+    Returns: StreamResult; text is "" when nobody spoke.
+    """
+    stabilizer = PartialStabilizer()
+    spoke = False
+    for piece in audio.stream_utterance(timeout=timeout, max_seconds=max_seconds):
+        spoke = True
+        partial = backend.accept(piece)
+        if partial is None:
+            continue
+        if on_partial:
+            on_partial(partial)
+        command = early.match(stabilizer.update(partial)) if early else None
+        if command:
+            return StreamResult(command, True)
+    return StreamResult(backend.finish() if spoke else "", False)
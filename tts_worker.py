@@ -0,0 +1,299 @@
+"""
+Text-to-speech on its own thread, so nobody waits for the voice.
+
+TTSWorker owns the pyttsx3 engine (which must stay on one thread) and
+speaks queued text in priority order:
+
+    URGENT   prompts the user answers to ("Yes?", "Listening")
+    NORMAL   confirmations ("Volume up")
+    LOW      long answers (AI replies)
+
+- Coalescing: text that is already queued or being spoken is not queued again.
+- Barge-in: new speech cancels queued and current speech of the same or a
+  lower priority. Cancellation takes effect at the next word.
+- Chunking: long text is spoken sentence by sentence, so barge-in and
+  higher-priority speech never wait for a whole paragraph.
+- Phrase cache: CACHED_PHRASES are synthesized to WAV files while the worker
+  is idle and then played straight from disk (Windows), skipping synthesis.
+"""
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import tempfile
+import threading
+import time
+import wave
+from contextlib import nullcontext
+
+URGENT, NORMAL, LOW = 0, 1, 2
+
+SPEECH_RATE = 160              # words per minute
+CACHED_PHRASES = ("Yes?", "Listening", "Volume up", "Volume down", "Toggled mute", "Clicked",
+                  "I didn't hear anything.", "No input detected.", "Asking AI...")
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "assistant_tts_cache")
+PLAYBACK_POLL = 0.02           # seconds between cancellation checks while a cached phrase plays
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def split_sentences(text):
+    """Sentences of `text` (the whole text if it has no sentence breaks)."""
+    sentences = [s.strip() for s in _SENTENCE_END.split(text.strip())]
+    return [s for s in sentences if s] or [text.strip()]
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+def play_wav(path, cancelled):
+    """
+    Play a WAV file with winsound; returns False if `cancelled()` became
+    true first (playback is stopped then).
+    """
+    import winsound
+    end = time.monotonic() + wav_duration(path)
+    winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+    while time.monotonic() < end:
+        if cancelled():
+            winsound.PlaySound(None, 0)
+            return False
+        time.sleep(PLAYBACK_POLL)
+    return True
+
+
+def default_player():
+    """play_wav where winsound exists (Windows), else None: no cached playback."""
+    try:
+        import winsound  # noqa: F401
+        return play_wav
+    except ImportError:
+        return None
+
+
+class Speech:
+    """Handle of one say() call: its sentences are spoken in order unless cancelled."""
+
+    def __init__(self, text, priority, chunks):
+        self.text = text
+        self.priority = priority
+        self.chunks = chunks
+        self.started = False
+        self.cancelled = False
+        self.requested_at = time.perf_counter()
+        self._done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        """Block until spoken (or cancelled); returns whether that happened in time."""
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class PhraseCache:
+    """Synthesized WAV files of fixed phrases, keyed by text and voice settings."""
+
+    def __init__(self, directory=CACHE_DIR, phrases=CACHED_PHRASES, voice=""):
+        self.directory = directory
+        self.phrases = set(phrases)
+        self.voice = voice
+        self.hits = 0
+
+    def path(self, text):
+        digest = hashlib.sha1(f"{self.voice}\n{text}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.wav")
+
+    def get(self, text):
+        """Path of the cached audio of `text`, or None."""
+        if text in self.phrases and os.path.exists(self.path(text)):
+            self.hits += 1
+            return self.path(text)
+        return None
+
+    def missing(self):
+        return sorted(p for p in self.phrases if not os.path.exists(self.path(p)))
+
+    def synthesize(self, engine, text):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(text)
+        partial = path + ".part.wav"
+        engine.save_to_file(text, partial)
+        engine.runAndWait()
+        if os.path.exists(partial) and os.path.getsize(partial) > 44:   # more than a WAV header
+            os.replace(partial, path)
+
+
+def pyttsx3_engine(rate=SPEECH_RATE):
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty("rate", rate)
+    return engine
+
+
+class TTSWorker(threading.Thread):
+    def __init__(self, engine_factory=pyttsx3_engine, player=None, cache_dir=CACHE_DIR, phrases=CACHED_PHRASES,
+                 while_speaking=nullcontext):
+        """
+        Args:
+            engine_factory: creates the pyttsx3-style engine, on the worker thread.
+            player: plays a cached WAV, (path, cancelled) -> finished; default
+                default_player(). Without one nothing is cached.
+            cache_dir: where CACHED_PHRASES are kept; None disables the cache.
+            while_speaking: context manager factory entered around everything
+                spoken (the assistant mutes its microphone capture with it).
+        """
+        super().__init__(name="tts", daemon=True)
+        self.engine_factory = engine_factory
+        self.player = player if player is not None else default_player()
+        self.cache_dir = cache_dir
+        self.phrases = phrases
+        self.while_speaking = while_speaking
+        self.engine = None
+        self.cache = None
+        self.error = None
+        self.running = True
+        self._ready = threading.Event()
+        self._cond = threading.Condition()
+        self._queue = []                   # heap of (priority, seq, speech, chunk index)
+        self._seq = itertools.count()
+        self._live = []                    # speeches queued or being spoken
+        self._current = None               # speech being spoken
+        self.spoken = 0
+        self.coalesced = 0
+        self.interrupted = 0
+        self.start_latency = 0.0
+
+    # --- API (any thread) ---
+    def say(self, text, priority=NORMAL, interrupt=True):
+        """
+        Queue `text`; returns its Speech handle. Text already queued or being
+        spoken returns that handle instead. With `interrupt`, speech of the
+        same or lower priority that is queued or playing is cancelled.
+        """
+        text = text.strip()
+        with self._cond:
+            for speech in self._live:
+                if speech.text == text and not speech.cancelled:
+                    self.coalesced += 1
+                    return speech
+            if interrupt:
+                for speech in list(self._live):
+                    if speech.priority >= priority and not speech.cancelled:
+                        self._cancel(speech)
+                        self.interrupted += 1
+            speech = Speech(text, priority, split_sentences(text))
+            self._live.append(speech)
+            for i in range(len(speech.chunks)):
+                heapq.heappush(self._queue, (priority, next(self._seq), speech, i))
+            self._cond.notify_all()
+        return speech
+
+    def cancel_all(self):
+        with self._cond:
+            for speech in list(self._live):
+                self._cancel(speech)
+            self._cond.notify_all()
+
+    def _cancel(self, speech):
+        speech.cancel()
+        if not speech.started:
+            self._finish(speech)   # the worker skips its chunks; waiters need not wait for that
+
+    def wait_ready(self, timeout=None):
+        """Whether the engine came up (False also on timeout); see `error`."""
+        return self._ready.wait(timeout) and self.engine is not None
+
+    def stats(self):
+        return {
+            "spoken": self.spoken,
+            "coalesced": self.coalesced,
+            "interrupted": self.interrupted,
+            "cache_hits": self.cache.hits if self.cache else 0,
+            "start_latency_avg_ms": round(1000 * self.start_latency / self.spoken, 1) if self.spoken else 0.0,
+        }
+
+    def stop(self):
+        self.running = False
+        self.cancel_all()
+
+    # --- worker thread ---
+    def run(self):
+        try:
+            self.engine = self.engine_factory()
+            # pyttsx3 calls this before each word: the place to stop cancelled speech
+            self.engine.connect("started-word", self._on_word)
+            if self.cache_dir and self.player:
+                voice = f"{self.engine.getProperty('voice')}|{self.engine.getProperty('rate')}"
+                self.cache = PhraseCache(self.cache_dir, self.phrases, voice)
+        except Exception as e:
+            self.error = e
+            self.engine = None
+            return
+        finally:
+            self._ready.set()
+        missing = self.cache.missing() if self.cache else []
+        while self.running:
+            item = self._next(timeout=None if not missing else 0)
+            if item is None:
+                if missing:
+                    # Idle: synthesize one cached phrase, then look at the queue again
+                    try:
+                        self.cache.synthesize(self.engine, missing.pop())
+                    except Exception as e:
+                        print("TTS cache error:", e)
+                        missing = []
+                continue
+            try:
+                self._speak(*item)
+            except Exception as e:
+                print("TTS error:", e)
+
+    def _next(self, timeout):
+        """Next chunk to speak as (speech, index), skipping cancelled ones; None on timeout or stop."""
+        with self._cond:
+            while True:
+                while self._queue:
+                    _, _, speech, index = heapq.heappop(self._queue)
+                    if not speech.cancelled:
+                        speech.started = True
+                        self._current = speech
+                        return speech, index
+                    self._finish(speech)
+                if not self.running or not self._cond.wait(timeout) or timeout == 0:
+                    return None
+
+    def _finish(self, speech):
+        if speech in self._live:
+            self._live.remove(speech)
+        if speech is self._current:
+            self._current = None
+        speech._done.set()
+
+    def _speak(self, speech, index):
+        text = speech.chunks[index]
+        if index == 0:
+            self.start_latency += time.perf_counter() - speech.requested_at
+            self.spoken += 1
+        with self.while_speaking():
+            path = self.cache.get(text) if self.cache else None
+            if path:
+                self.player(path, lambda: speech.cancelled or not self.running)
+            else:
+                self.engine.say(text)
+                self.engine.runAndWait()
+        if speech.cancelled or index == len(speech.chunks) - 1:
+            with self._cond:
+                self._finish(speech)
+
+    def _on_word(self, name, location, length):
+        speech = self._current
+        if speech is not None and (speech.cancelled or not self.running):
+            self.engine.stop()
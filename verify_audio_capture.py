@@ -0,0 +1,148 @@
+import contextlib
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from audio_capture import CHUNK, AudioCaptureService
+from verify_wake_word import OTHER, WAKE, enrolled, phrase, silence
+from wake_word import SAMPLE_RATE, WakeWordListener
+
+
+class FakeStream:
+    """Plays `audio` in real-time-sized reads, then silence; counts opens."""
+    def __init__(self, audio):
+        self.audio = audio
+        self.offset = 0
+        self.opened = 0
+        self.closed = 0
+
+    @contextlib.contextmanager
+    def open(self, rate):
+        self.opened += 1
+        try:
+            yield self
+        finally:
+            self.closed += 1
+
+    def read(self, n):
+        chunk = self.audio[self.offset:self.offset + n]
+        self.offset += n
+        time.sleep(0.001)
+        return np.pad(chunk, (0, n - len(chunk))).tobytes()
+
+
+def feed(service, audio):
+    for i in range(0, len(audio), CHUNK):
+        service.process(audio[i:i + CHUNK])
+
+
+class TestAudioCaptureService(unittest.TestCase):
+    def test_pre_roll_comes_from_the_ring(self):
+        service = AudioCaptureService(open_stream=None)
+        audio = np.concatenate([silence(1.0), phrase(WAKE)])
+        feed(service, audio)
+        with service.subscribe(pre_roll_ms=500) as sub:
+            first = sub.get(timeout=0)
+            self.assertEqual(first.position % service.frame_len, 0)
+            self.assertEqual(first.position + len(first.samples), service.position)
+            self.assertAlmostEqual(len(first.samples) / SAMPLE_RATE, 0.5, delta=0.02)
+            np.testing.assert_array_equal(first.samples, audio[first.position:service.position])
+            self.assertEqual(len(first.flags) * service.frame_len, len(first.samples))
+            feed(service, silence(0.2))
+            block = sub.get(timeout=0)
+            self.assertEqual(block.position, first.position + len(first.samples))
+        self.assertEqual(service.stats()["subscribers"], 0)
+
+    def test_utterance_since_position(self):
+        """A command spoken right after the wake phrase is captured in full."""
+        service = AudioCaptureService(open_stream=None)
+        listener = WakeWordListener(enrolled(), ring=service.ring)
+        wake_sub = service.subscribe()
+        command = phrase(OTHER, seed=5)
+        audio = np.concatenate([silence(1.0), phrase(WAKE, seed=9), silence(0.35, seed=1), command,
+                                silence(1.0, seed=2)])
+        woke_at = None
+        for i in range(0, len(audio), CHUNK):
+            service.process(audio[i:i + CHUNK])
+            block = wake_sub.get(timeout=0)
+            while block is not None and woke_at is None:
+                if listener.feed_block(block):
+                    woke_at = service.position
+                block = wake_sub.get(timeout=0)
+            if woke_at is not None:
+                break
+        self.assertIsNotNone(woke_at)
+        # The command capture starts only now, after the user began speaking it
+        feed(service, audio[i + CHUNK:])
+        with service.subscribe(since=listener.wake_end) as sub:
+            self.assertTrue(sub.wait_for_speech(0))
+            samples = sub.utterance(timeout=0)
+        start = 1.0 + len(phrase(WAKE, seed=9)) / SAMPLE_RATE + 0.35
+        self.assertAlmostEqual(len(samples) / SAMPLE_RATE, len(command) / SAMPLE_RATE + 0.1, delta=0.1)
+        offset = int(start * SAMPLE_RATE) - 1600   # 100 ms pre-roll
+        np.testing.assert_array_equal(samples[:100], audio[offset:offset + 100])
+
+    def test_command_in_the_same_breath_as_the_wake_phrase(self):
+        """No pause after the wake phrase: one segment, still a wake, and the command is captured from its end."""
+        service = AudioCaptureService(open_stream=None)
+        listener = WakeWordListener(enrolled(), ring=service.ring)
+        wake_sub = service.subscribe()
+        wake, command = phrase(WAKE, seed=9), phrase(OTHER * 3, seed=5)
+        audio = np.concatenate([silence(1.0), wake, command, silence(1.0, seed=2)])
+        feed(service, audio)
+        woke = [listener.feed_block(block) for block in iter(lambda: wake_sub.get(timeout=0), None)]
+        self.assertEqual((sum(woke), listener.utterances), (1, 1))
+        wake_end = int((1.0 * SAMPLE_RATE + len(wake)))
+        self.assertAlmostEqual(listener.wake_end / SAMPLE_RATE, wake_end / SAMPLE_RATE, delta=0.08)
+        with service.subscribe(since=listener.wake_end) as sub:
+            self.assertTrue(sub.wait_for_speech(0))
+            samples = sub.utterance(timeout=0)
+        self.assertAlmostEqual(len(samples) / SAMPLE_RATE, len(command) / SAMPLE_RATE, delta=0.1)
+
+    def test_utterance_times_out_in_silence(self):
+        service = AudioCaptureService(open_stream=None)
+        feed(service, silence(1.0))
+        with service.subscribe(pre_roll_ms=300) as sub:
+            self.assertFalse(sub.wait_for_speech(0))
+            self.assertIsNone(sub.utterance(timeout=0))
+
+    def test_muted_audio_is_not_speech(self):
+        service = AudioCaptureService(open_stream=None)
+        feed(service, silence(1.0))
+        floor = service.vad.noise_floor_db
+        sub = service.subscribe()
+        with service.muted():
+            feed(service, np.concatenate([phrase(WAKE), (silence(2.0) * 4).astype(np.int16)]))
+        self.assertEqual(service.vad.noise_floor_db, floor)
+        speech = lambda: any(block.flags.any() for block in iter(lambda: sub.get(timeout=0), None))
+        self.assertFalse(speech())
+        feed(service, phrase(WAKE))
+        self.assertTrue(speech())
+        sub.close()
+
+    def test_thread_shares_one_stream(self):
+        stream = FakeStream(np.concatenate([silence(0.5), phrase(WAKE), silence(1.0)]))
+        service = AudioCaptureService(open_stream=stream.open).open()
+        try:
+            captured = []
+            consumers = [threading.Thread(target=lambda: captured.append(
+                service.subscribe().utterance(timeout=5))) for _ in range(2)]
+            for consumer in consumers:
+                consumer.start()
+            for consumer in consumers:
+                consumer.join(timeout=10)
+            self.assertEqual(len(captured), 2)
+            np.testing.assert_array_equal(captured[0], captured[1])
+            self.assertAlmostEqual(len(captured[0]) / SAMPLE_RATE, len(phrase(WAKE)) / SAMPLE_RATE + 0.1,
+                                   delta=0.1)
+        finally:
+            service.stop()
+        self.assertEqual((stream.opened, stream.closed), (1, 1))
+        late = service.subscribe()
+        self.assertIsNone(late.get(timeout=0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
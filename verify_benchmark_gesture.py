@@ -0,0 +1,23 @@
+import unittest
+
+from benchmark_gesture import compare, run_benchmarks
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_runs_headless(self):
+        """Every scenario runs with the stub detector and null output."""
+        results = run_benchmarks(frames=20, repeat=1, frame_sizes=((320, 240),))
+        self.assertEqual(set(results), {"detect_gesture", "classify_batch", "process_frame@320x240",
+                                        "swipe", "cursor"})
+        for r in results.values():
+            self.assertGreater(r["calls"], 0)
+            self.assertGreater(r["p50_us"], 0)
+
+    def test_compare_flags_slowdowns_only(self):
+        baseline = {"results": {"a": {"p50_us": 100.0}, "b": {"p50_us": 100.0}, "gone": {"p50_us": 1.0}}}
+        results = {"a": {"p50_us": 120.0}, "b": {"p50_us": 130.0}}
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [("b", 100.0, 130.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import contextlib
+import io
+import threading
+import time
+import unittest
+
+from command_executor import CommandExecutor, UIChannel, cancelled
+
+
+class FakeRoot:
+    """Tk root stand-in: after() callbacks run when the test calls pump(), on the test ("Tk") thread."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def pump(self, seconds=0.0):
+        end = time.monotonic() + seconds
+        while True:
+            due, self.scheduled = self.scheduled, []
+            for callback in due:
+                callback()
+            if time.monotonic() >= end:
+                return
+            time.sleep(0.005)
+
+
+class TestUIChannel(unittest.TestCase):
+    def test_worker_posts_run_in_order_on_tk_thread(self):
+        root = FakeRoot()
+        ui = UIChannel(root)
+        seen = []
+        record = lambda i: seen.append((i, threading.current_thread()))
+        worker = threading.Thread(target=lambda: [ui.post(record, i) for i in range(5)])
+        worker.start()
+        worker.join()
+        self.assertEqual(seen, [])                   # nothing touched off the Tk thread
+        root.pump()
+        self.assertEqual([i for i, _ in seen], list(range(5)))
+        self.assertTrue(all(thread is threading.current_thread() for _, thread in seen))
+
+    def test_post_on_tk_thread_runs_at_once(self):
+        ui = UIChannel(FakeRoot())
+        seen = []
+        ui.post(seen.append, 1)
+        self.assertEqual(seen, [1])
+
+    def test_failing_update_does_not_stop_the_loop(self):
+        root = FakeRoot()
+        ui = UIChannel(root)
+        seen = []
+        threading.Thread(target=lambda: (ui.post(lambda: 1 / 0), ui.post(seen.append, "after"))).start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            root.pump(0.05)
+        self.assertEqual(seen, ["after"])
+        self.assertEqual(len(root.scheduled), 1)     # still polling
+
+
+class TestCommandExecutor(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.ui = UIChannel(self.root)
+        self.timed_out = []
+        self.executor = CommandExecutor(workers=2, ui=self.ui, on_timeout=self.timed_out.append)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_slow_command_does_not_block_caller_or_others(self):
+        release = threading.Event()
+        start = time.perf_counter()
+        slow = self.executor.submit(release.wait, 5, name="slow")
+        fast = self.executor.submit(lambda: "done", name="fast")
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(fast.result(timeout=1), "done")
+        self.assertFalse(slow.done)
+        release.set()
+        self.assertTrue(slow.result(timeout=1))
+
+    def test_timeout_cancels_and_reports_on_tk_thread(self):
+        answers = []
+
+        def ask():
+            time.sleep(0.2)                         # a request that outlives its timeout
+            if not cancelled():
+                answers.append("answer")
+
+        command = self.executor.submit(ask, name="ai slow", timeout=0.05)
+        command.result(timeout=1)
+        self.assertTrue(command.timed_out)
+        self.assertEqual(answers, [])
+        self.assertEqual(self.timed_out, [])        # reported through the UI channel...
+        self.root.pump()
+        self.assertEqual(self.timed_out, [command])  # ...on the Tk thread
+        self.assertEqual(self.executor.stats()["timeouts"], 1)
+
+    def test_fast_command_never_times_out(self):
+        self.executor.submit(lambda: None, timeout=0.05).result(timeout=1)
+        time.sleep(0.1)
+        self.root.pump()
+        self.assertEqual(self.timed_out, [])
+
+    def test_cancel_running_and_queued_commands(self):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        ran = []
+
+        def blocking(tag):
+            started.release()
+            release.wait(1)
+            ran.append((tag, cancelled()))
+
+        running = [self.executor.submit(blocking, i) for i in range(2)]
+        queued = self.executor.submit(ran.append, "queued")
+        self.assertTrue(started.acquire(timeout=1) and started.acquire(timeout=1))
+        self.executor.cancel_all()
+        release.set()
+        for command in running:
+            command.result(timeout=1)
+        self.assertTrue(queued.future.cancelled())
+        self.assertEqual(sorted(ran), [(0, True), (1, True)])
+        self.assertEqual(self.executor.pending, [])
+
+    def test_failure_is_reported_and_counted(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            command = self.executor.submit(lambda: 1 / 0, name="broken")
+            with self.assertRaises(ZeroDivisionError):
+                command.result(timeout=1)
+        self.assertIn("'broken' failed", out.getvalue())
+        self.assertEqual(self.executor.stats()["failed"], 1)
+
+    def test_cancelled_is_false_outside_commands(self):
+        self.assertFalse(cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
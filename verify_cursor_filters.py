@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import gesture_controller
+
+from bench_cursor_filters import evaluate, synthetic_trajectories
+from cursor_filters import CURSOR_FILTERS, MovingAverageFilter, make_cursor_filter
+
+
+class TestCursorFilters(unittest.TestCase):
+    def test_moving_average_matches_window_mean(self):
+        """The running-sum average equals the mean of the last `window` points."""
+        f = MovingAverageFilter(window=5)
+        points = np.random.default_rng(1).uniform(0, 1000, (20, 2))
+        for i, (x, y) in enumerate(points):
+            out = f(x, y, i / 30)
+            np.testing.assert_allclose(out, points[max(0, i - 4):i + 1].mean(axis=0))
+
+    def test_filters_hold_still_and_reset(self):
+        """Every filter converges on a constant input and restarts cleanly after reset."""
+        for name in CURSOR_FILTERS:
+            f = make_cursor_filter(name)
+            for i in range(60):
+                x, y = f(500.0, 300.0, i / 30)
+            self.assertAlmostEqual(x, 500.0, places=3, msg=name)
+            self.assertAlmostEqual(y, 300.0, places=3, msg=name)
+            f.reset()
+            self.assertEqual(f(10.0, 20.0, 5.0), (10.0, 20.0), msg=name)
+
+    def test_one_euro_lags_less_than_moving_average(self):
+        """On a moving hand the One Euro filter lags less than the 5-frame average."""
+        _, t, raw, reference = synthetic_trajectories()[1]
+        baseline = evaluate("moving_average", t, raw, reference)
+        one_euro = evaluate("one_euro", t, raw, reference)
+        self.assertLess(one_euro["lag_ms"], baseline["lag_ms"] / 2)
+        self.assertLess(one_euro["jitter_px"], baseline["jitter_px"] * 1.5)
+
+    def test_controller_moving_average_uses_smoothing_buffer_size(self):
+        with mock.patch.object(gesture_controller, "CURSOR_FILTER", "moving_average"), \
+                mock.patch.object(gesture_controller, "SMOOTHING_BUFFER_SIZE", 9):
+            f = gesture_controller.HandState().cursor_filter
+        self.assertIsInstance(f, MovingAverageFilter)
+        self.assertEqual(f.window, 9)
+
+    def test_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            make_cursor_filter("median")
+
+
+if __name__ == '__main__':
+    unittest.main()
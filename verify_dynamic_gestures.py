@@ -0,0 +1,80 @@
+import math
+import unittest
+
+import numpy as np
+
+from dynamic_gestures import DynamicGestureEngine
+from gesture_controller import GestureController, Hand
+from landmark_recording import ActionLog
+
+FPS = 30.0
+
+
+def still(point, n):
+    return np.tile(point, (n, 1))
+
+
+def swipe(dx, dy, n=8, start=(0.6, 0.5)):
+    return np.array([[start[0] + dx * k / n, start[1] + dy * k / n] for k in range(n + 1)])
+
+
+def circle(direction, n=30, radius=0.15, phase=1.0):
+    theta = phase + direction * np.linspace(0, 2 * math.pi, n)
+    return np.stack([0.6 + radius * np.cos(theta), 0.5 + radius * np.sin(theta)], axis=1)
+
+
+def with_rest(path, n=10):
+    """Path preceded and followed by the hand at rest."""
+    return np.vstack([still(path[0], n), path, still(path[-1], n)])
+
+
+class TestDynamicGestures(unittest.TestCase):
+    def run_path(self, path, noise=0.003, seed=0):
+        path = path + np.random.default_rng(seed).normal(0, noise, path.shape)
+        engine = DynamicGestureEngine()
+        return [m[0] for i, (x, y) in enumerate(path) if (m := engine.update(i / FPS, x, y))]
+
+    def test_swipes(self):
+        for name, (dx, dy) in (("Swipe Right", (0.3, 0)), ("Swipe Left", (-0.3, 0)),
+                               ("Swipe Up", (0, -0.3)), ("Swipe Down", (0, 0.3))):
+            self.assertEqual(self.run_path(with_rest(swipe(dx, dy))), [name])
+
+    def test_circles(self):
+        for phase in (0.0, 2.0, 4.0):
+            self.assertEqual(self.run_path(with_rest(circle(1, phase=phase))), ["Circle CW"])
+            self.assertEqual(self.run_path(with_rest(circle(-1, phase=phase))), ["Circle CCW"])
+
+    def test_still_and_small_motions_do_nothing(self):
+        self.assertEqual(self.run_path(still((0.5, 0.5), 90), noise=0.005), [])
+        self.assertEqual(self.run_path(with_rest(swipe(0.08, 0))), [])
+
+    def test_stroke_ending_out_of_view(self):
+        engine = DynamicGestureEngine()
+        for i, (x, y) in enumerate(np.vstack([still((0.6, 0.5), 5), swipe(-0.3, 0)])):
+            self.assertIsNone(engine.update(i / FPS, x, y))
+        self.assertEqual(engine.end_stroke()[0], "Swipe Left")
+
+    def test_ring_buffer_order(self):
+        engine = DynamicGestureEngine(capacity=8)
+        for i in range(20):
+            engine.append(i, i, 0)
+        np.testing.assert_array_equal(engine.trajectory()[:, 0], np.arange(12, 20))
+        np.testing.assert_array_equal(engine.trajectory(seconds=2)[:, 0], [17, 18, 19])
+
+
+class TestControllerDynamicGestures(unittest.TestCase):
+    def test_open_palm_swipe_up_scrolls(self):
+        log = ActionLog()
+        gc = GestureController(output=log)
+        path = with_rest(swipe(0, -0.3))
+        for i, (x, y) in enumerate(path):
+            points = np.zeros((21, 3), dtype=np.float32)
+            points[0] = (x, y, 0)
+            points[[6, 10, 14, 18], 1] = y - 0.3
+            points[[8, 12, 16, 20], 1] = y - 0.5   # all four fingers raised
+            gc.process_hands([Hand(points, "Right", 1.0)], 640, 640, now=10 + i / FPS)
+        self.assertEqual(log.calls, [("scroll", (30,))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from benchmark_gesture import NullOutput, StubHands, make_pose, synthetic_stream
+from frame_sources import (CameraSource, FrameQueue, ImageSequenceSource, LatestFrameBuffer,
+                           VideoFileSource, open_source, process_source)
+from gesture_controller import GestureController, Hand
+from gesture_debounce import DEBOUNCE_ENTER_FRAMES
+from landmark_recording import ActionLog
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in producing numbered frames at a fixed rate."""
+    def __init__(self, fps=200):
+        self.period = 1.0 / fps
+        self.count = 0
+        self.released = False
+
+    def read(self):
+        time.sleep(self.period)
+        self.count += 1
+        return True, self.count
+
+    def release(self):
+        self.released = True
+
+
+class TestLatestFrameBuffer(unittest.TestCase):
+    def test_overwrite_counts_drops(self):
+        """Unread frames are overwritten and counted as dropped."""
+        buf = LatestFrameBuffer()
+        for i in range(5):
+            buf.put(i, float(i))
+        self.assertEqual(buf.get(timeout=0), (4, 4.0))
+        self.assertEqual(buf.dropped, 4)
+
+    def test_get_waits_for_new_frame(self):
+        """A frame is never returned twice; get times out instead."""
+        buf = LatestFrameBuffer()
+        buf.put("a", 1.0)
+        self.assertEqual(buf.get(timeout=0), ("a", 1.0))
+        self.assertEqual(buf.get(timeout=0.01), (None, None))
+        threading.Timer(0.02, buf.put, ("b", 2.0)).start()
+        self.assertEqual(buf.get(timeout=1.0), ("b", 2.0))
+
+    def test_slow_consumer_gets_fresh_frames(self):
+        """With a slow consumer the capture thread keeps running and frames stay fresh."""
+        cap = FakeCapture()
+        capture = CameraSource(cap)
+        capture.start()
+        try:
+            frame, _ = capture.read()
+            time.sleep(0.1)  # simulate an inference hiccup
+            frame2, _ = capture.read()
+            self.assertGreater(frame2 - frame, 5)
+            self.assertGreater(capture.dropped, 0)
+        finally:
+            capture.stop()
+        self.assertTrue(cap.released)
+
+
+class TestFrameQueue(unittest.TestCase):
+    def test_keeps_every_frame_in_order(self):
+        q = FrameQueue(maxsize=2)
+        producer = threading.Thread(target=lambda: [q.put(i, float(i)) for i in range(10)] and q.close())
+        producer.start()
+        time.sleep(0.05)
+        self.assertTrue(producer.is_alive())  # waiting for space
+        got = []
+        while not q.exhausted:
+            frame, _ = q.get(timeout=1.0)
+            if frame is not None:
+                got.append(frame)
+        producer.join()
+        self.assertEqual(got, list(range(10)))
+        self.assertEqual(q.dropped, 0)
+        self.assertEqual(q.get(timeout=0), (None, None))
+
+
+def write_images(directory, count, size=(48, 64)):
+    for i in range(count):
+        cv2.imwrite(os.path.join(directory, f"frame_{i:03d}.png"), np.full(size + (3,), i * 10 % 256, np.uint8))
+
+
+class TestRecordedSources(unittest.TestCase):
+    def test_image_sequence_delivers_every_frame(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_images(tmp, 12)
+            with open(os.path.join(tmp, "notes.txt"), "w") as f:
+                f.write("not an image")
+            source = open_source(tmp, fps=10, prefetch=2)
+            self.assertIsInstance(source, ImageSequenceSource)
+            source.start()
+            values = [int(frame[0, 0, 0]) for frame, _ in source]
+            source.stop()
+        self.assertEqual(values, [i * 10 for i in range(12)])
+        stats = source.stats()
+        self.assertEqual((stats["frames_captured"], stats["frames_dropped"]), (12, 0))
+        self.assertGreater(stats["decode_avg_ms"], 0)
+
+    def test_video_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.avi")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 15, (64, 48))
+            for i in range(20):
+                writer.write(np.full((48, 64, 3), i * 10, np.uint8))
+            writer.release()
+            source = open_source(path)
+            self.assertIsInstance(source, VideoFileSource)
+            self.assertTrue(source.opened)
+            self.assertEqual(source.fps, 15)
+            source.start()
+            frames = [frame for frame, _ in source]
+            source.stop()
+        self.assertEqual(len(frames), 20)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+
+    def test_process_source_at_full_speed(self):
+        """Footage is processed as fast as it decodes, with media time for cooldowns."""
+        with tempfile.TemporaryDirectory() as tmp:
+            write_images(tmp, 30)
+            gc = GestureController(hands=StubHands(synthetic_stream("mixed", 30)), output=NullOutput(), overlay=False)
+            seen = []
+            process_frame = gc.process_frame
+            gc.process_frame = lambda frame, mirror, now: seen.append(now) or process_frame(frame, mirror, now)
+            report = process_source(gc, ImageSequenceSource(tmp, fps=30))
+        self.assertEqual(report["frames"], 30)
+        self.assertEqual(seen, [i / 30 for i in range(30)])
+        self.assertGreater(report["realtime_factor"], 1.0)
+        for key in ("decode_avg_ms", "inference_avg_ms", "pipeline_avg_ms"):
+            self.assertGreater(report[key], 0, key)
+
+    def test_click_on_the_first_frames_of_a_clip(self):
+        """Media time starts at 0; a two-finger click right at the start must not be taken for a cooldown."""
+        with tempfile.TemporaryDirectory() as tmp:
+            write_images(tmp, 10)
+            log = ActionLog()
+            stream = [[Hand(make_pose((1, 2)), "Right", 1.0)]] * 5 + [[Hand(make_pose((4,)), "Right", 1.0)]] * 5
+            gc = GestureController(hands=StubHands(stream), output=log, overlay=False)
+            process_source(gc, ImageSequenceSource(tmp, fps=30))
+        self.assertEqual(log.calls, [("click", ())])
+        self.assertEqual(gc.last_click_time, (DEBOUNCE_ENTER_FRAMES - 1) / 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
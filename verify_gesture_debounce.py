@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark_gesture import make_pose
+from gesture_controller import GestureController, Hand
+from gesture_debounce import GestureDebouncer, debounce_report, recording_labels
+from landmark_recording import ActionLog, LandmarkRecorder, replay
+
+
+class TestGestureDebouncer(unittest.TestCase):
+    def test_single_frame_never_commits(self):
+        d = GestureDebouncer(window=6, enter_frames=3, exit_frames=2)
+        stream = ["Fist"] * 5 + ["Two Fingers"] + ["Fist"] * 5
+        self.assertNotIn("Two Fingers", [d.update(label) for label in stream])
+
+    def test_commit_after_dwell(self):
+        d = GestureDebouncer(window=6, enter_frames=3, exit_frames=2)
+        committed = [d.update("Pinch") for _ in range(4)]
+        self.assertEqual(committed, ["None", "None", "Pinch", "Pinch"])
+
+    def test_exit_hysteresis(self):
+        """A committed gesture survives dropouts that could not have committed it."""
+        d = GestureDebouncer(window=6, enter_frames=4, exit_frames=2)
+        for _ in range(6):
+            d.update("Pinch")
+        for label in ["Unknown", "Fist", "Unknown", "Fist"]:
+            self.assertEqual(d.update(label), "Pinch")
+        # Votes drop below exit_frames: released while nothing else qualifies
+        self.assertEqual(d.update("Unknown"), "None")
+
+    def test_low_confidence_does_not_commit(self):
+        d = GestureDebouncer(window=4, enter_frames=2, exit_frames=1, min_confidence=0.5)
+        for _ in range(4):
+            self.assertEqual(d.update("Two Fingers", 0.2), "None")
+
+    def test_report_counts_flicker(self):
+        t = np.arange(60) / 30.0
+        raw = ["Fist"] * 20 + ["Two Fingers", "Two Fingers"] + ["Fist"] * 38
+        raw_report = debounce_report(raw, t, window=1, enter_frames=1, exit_frames=1)
+        self.assertEqual(raw_report["false_triggers"], 1)
+        debounced = debounce_report(raw, t, window=6, enter_frames=3, exit_frames=2)
+        self.assertEqual(debounced["false_triggers"], 0)
+        self.assertAlmostEqual(debounced["commit_latency_avg_ms"], 2000 / 30, places=3)
+
+    def test_report_uses_truth_labels(self):
+        t = np.arange(10) / 30.0
+        raw = ["Fist"] * 10
+        truth = ["Open Palm"] * 10
+        report = debounce_report(raw, t, truth, window=2, enter_frames=2, exit_frames=1)
+        self.assertEqual((report["commits"], report["false_triggers"]), (1, 1))
+
+
+class TestControllerDebounce(unittest.TestCase):
+    def setUp(self):
+        self.log = ActionLog()
+        self.controller = GestureController(output=self.log)
+        self.now = 100.0    # well past the initial click cooldown
+
+    def run_poses(self, poses):
+        for pose in poses:
+            hands = [] if pose is None else [Hand(pose, "Right", 1.0)]
+            self.controller.process_hands(hands, 640, 480, now=self.now)
+            self.now += 1 / 30.0
+
+    def test_flicker_does_not_click(self):
+        fist, two = make_pose(), make_pose((1, 2))
+        self.run_poses([fist] * 5 + [two] + [fist] * 5)
+        self.assertNotIn("click", [name for name, _ in self.log.calls])
+        self.run_poses([two] * 5)
+        self.assertIn("click", [name for name, _ in self.log.calls])
+
+    def test_drag_released_when_hand_lost(self):
+        pinch = make_pose((1,), pinch=True)
+        self.run_poses([pinch] * 5 + [None] * 10)
+        names = [name for name, _ in self.log.calls]
+        self.assertEqual((names.count("mouseDown"), names.count("mouseUp")), (1, 1))
+        self.assertFalse(self.controller.is_dragging)
+
+    def test_recorded_clip_releases_drag_and_idles(self):
+        """A recorded pinch that leaves the frame ends like the live one: drag released, then idle."""
+        pinch = make_pose((1,), pinch=True)
+        fd, path = tempfile.mkstemp(suffix=".lmk")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with LandmarkRecorder(path) as rec:
+            for i in range(35):
+                rec.append(i / 30.0, [Hand(pinch, "Right", 1.0)] if i < 5 else [])
+
+        raw, t, _, _ = recording_labels(path)
+        self.assertEqual(raw, ["Pinch"] * 5 + ["None"] * 30)
+        self.assertEqual(debounce_report(raw, t)["commits"], 1)
+
+        controller = GestureController(output=ActionLog())
+        replay(path, controller)
+        names = [name for name, _ in controller.output.calls]
+        self.assertEqual((names.count("mouseDown"), names.count("mouseUp")), (1, 1))
+        self.assertFalse(controller.is_dragging)
+        self.assertTrue(controller.idle)
+
+
+if __name__ == "__main__":
+    unittest.main()
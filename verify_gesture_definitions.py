@@ -0,0 +1,166 @@
+import copy
+import unittest
+
+import numpy as np
+
+from gesture_controller import GESTURE_CODES, GESTURE_LABELS, GESTURE_TABLE, classify_batch
+from gesture_definitions import MAX_TEST_BITS, compile_gestures, finger_states
+
+
+def legacy_classify(pose, pinch_threshold=0.05):
+    """The original if-chain (without the unreachable thumb rules)."""
+    up = [pose[tip, 1] < pose[pip, 1] for tip, pip in ((8, 6), (12, 10), (16, 14), (20, 18))]
+    if sum(up) == 0:
+        return "Fist"
+    if sum(up) == 4:
+        return "Open Palm"
+    if np.hypot(*(pose[4, :2] - pose[8, :2])) < pinch_threshold:
+        return "Pinch"
+    if up == [True, True, False, False]:
+        return "Two Fingers"
+    if up == [True, False, False, False]:
+        return "Index Pointing"
+    return "Unknown"
+
+
+def thumb_pose(tip, wrist=(0.5, 0.9)):
+    """Curled fingers with the thumb IP joint at (0.4, 0.6) and its tip at `tip`."""
+    pose = np.zeros((21, 3), dtype=np.float32)
+    pose[0, :2] = wrist
+    pose[[6, 10, 14, 18], 1] = 0.6
+    pose[[8, 12, 16, 20], 1] = 0.8
+    pose[3, :2] = (0.4, 0.6)
+    pose[4, :2] = tip
+    return pose
+
+
+class TestDefaultGestures(unittest.TestCase):
+    def test_matches_legacy_chain(self):
+        """Without thumbs up/down the table classifies like the old if-chain."""
+        rng = np.random.default_rng(0)
+        poses = rng.uniform(0, 1, (2000, 21, 3)).astype(np.float32)
+        poses[:, 4, :2] = poses[:, 8, :2] + rng.normal(0, 0.05, (2000, 2))  # plenty of pinches
+        labels = [GESTURE_LABELS[c] for c in classify_batch(poses)]
+        for pose, label in zip(poses, labels):
+            if label in ("Thumb Up", "Thumb Down"):
+                self.assertEqual(legacy_classify(pose), "Fist")
+            else:
+                self.assertEqual(label, legacy_classify(pose))
+        self.assertIn("Thumb Up", labels)
+        self.assertIn("Pinch", labels)
+
+    def test_small_batches_match_vectorized_path(self):
+        rng = np.random.default_rng(1)
+        poses = rng.uniform(0, 1, (500, 21, 3)).astype(np.float32)
+        poses[:, 4, :2] = poses[:, 8, :2] + rng.normal(0, 0.05, (500, 2))
+        batch = classify_batch(poses)
+        single = np.concatenate([classify_batch(pose) for pose in poses])
+        self.assertEqual(batch.tolist(), single.tolist())
+
+    def test_thumb_up_and_down(self):
+        poses = np.stack([thumb_pose((0.42, 0.3)), thumb_pose((0.45, 0.95), wrist=(0.5, 0.3)),
+                          thumb_pose((0.8, 0.55)), thumb_pose((0.5, 0.7))])
+        self.assertEqual(finger_states(poses).tolist(), [16, 16, 16, 0])
+        self.assertEqual([GESTURE_LABELS[c] for c in classify_batch(poses)],
+                         ["Thumb Up", "Thumb Down", "Fist", "Fist"])
+
+    def test_default_config_has_no_issues(self):
+        from gesture_controller import GESTURE_TABLE
+        self.assertEqual(GESTURE_TABLE.issues, [])
+        self.assertEqual(GESTURE_CODES["None"], 0)
+        self.assertEqual(GESTURE_CODES["Unknown"], 1)
+
+
+class TestCompiler(unittest.TestCase):
+    def test_first_definition_wins(self):
+        table = compile_gestures({"gestures": [
+            {"name": "Point", "fingers": "?1000"},
+            {"name": "Any", "fingers": "?????"},
+        ]})
+        self.assertEqual(table.labels[table.table[0b01000]], "Point")
+        self.assertEqual(table.labels[table.table[0b00000]], "Any")
+        self.assertEqual(table.conditional, [])
+
+    def test_predicate_only_checked_where_it_outranks(self):
+        table = compile_gestures({"parameters": {"near": 0.1}, "gestures": [
+            {"name": "Fist", "fingers": "?0000"},
+            {"name": "Pinch", "fingers": "?????",
+             "when": [{"distance": ["THUMB_TIP", "INDEX_FINGER_TIP"], "max": "near"}]},
+        ]})
+        (code, eligible, _), = table.conditional
+        self.assertEqual(table.labels[code], "Pinch")
+        self.assertFalse(eligible[0b00000])
+        self.assertTrue(eligible[0b01000])
+        pose = np.zeros((1, 21, 3), dtype=np.float32)
+        pose[0, [6, 10, 14, 18], 1] = 0.6
+        pose[0, 8, 1] = 0.3                          # index up
+        pose[0, 4, :2] = pose[0, 8, :2] + (0.06, 0)
+        self.assertEqual(table.labels[table.classify(pose)[0]], "Pinch")
+        self.assertEqual(table.labels[table.classify(pose, near=0.05)[0]], "Unknown")
+
+    def test_flags_unreachable_and_overlapping(self):
+        table = compile_gestures({"gestures": [
+            {"name": "Fist", "fingers": "?0000"},
+            {"name": "Grab", "fingers": "00000"},
+            {"name": "Point", "fingers": "?1000"},
+            {"name": "Gun", "fingers": "11000"},
+            {"name": "Pistol", "fingers": "1?00?"},
+        ]})
+        self.assertIn("unreachable: 'Grab' is always matched by an earlier gesture first", table.issues)
+        self.assertIn("unreachable: 'Gun' is always matched by an earlier gesture first", table.issues)
+        self.assertIn("overlap: 'Pistol' and 'Fist' both match 10000; 'Fist' wins", table.issues)
+
+    def test_predicates_refine_without_overlap(self):
+        table = compile_gestures({"gestures": [
+            {"name": "Up", "fingers": "10000", "when": [{"direction": ["THUMB_IP", "THUMB_TIP"], "is": "up"}]},
+            {"name": "Fist", "fingers": "?0000"},
+            {"name": "Up again", "fingers": "1????", "when": [{"direction": ["THUMB_IP", "THUMB_TIP"], "is": "up"}]},
+        ]})
+        self.assertEqual(table.issues,
+                         ["overlap: 'Up again' and 'Up' both match 10000; 'Up' wins"])
+
+    def test_too_many_tests_skip_the_lookup(self):
+        """Configs with more tests than MAX_TEST_BITS apply the rules to each call's bits instead."""
+        tips = ("INDEX_FINGER_TIP", "MIDDLE_FINGER_TIP", "RING_FINGER_TIP", "PINKY_TIP")
+        gestures = [{"name": f"Near {tip} {i}", "fingers": "?????",
+                     "when": [{"distance": ["THUMB_TIP", tip], "max": 0.02 * (i + 1)}]}
+                    for i in range(MAX_TEST_BITS // 4 + 1) for tip in tips]
+        table = compile_gestures({"gestures": gestures})
+        self.assertIsNone(table._lookup)
+        rng = np.random.default_rng(3)
+        poses = rng.uniform(0.4, 0.6, (300, 21, 3)).astype(np.float32)
+        single = np.concatenate([table.classify(pose[np.newaxis]) for pose in poses])
+        self.assertEqual(table.classify(poses).tolist(), single.tolist())
+
+    def test_malformed_definitions(self):
+        for gestures in ([{"name": "A", "fingers": "1100"}],
+                         [{"name": "A"}, {"name": "A"}],
+                         [{"name": "A", "when": [{"distance": ["THUMB_TIP", "NOSE"], "max": 1}]}],
+                         [{"name": "A", "when": [{"distance": ["THUMB_TIP", "WRIST"], "max": "missing"}]}],
+                         [{"name": "A", "when": [{"direction": ["THUMB_TIP", "WRIST"], "is": "sideways"}]}],
+                         [{"name": "A", "when": [{"speed": 1}]}]):
+            with self.assertRaises(ValueError):
+                compile_gestures({"gestures": gestures})
+
+
+class TestLookup(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.poses = rng.uniform(0, 1, (640, 21, 3)).astype(np.float32)
+        self.poses[:, 4, :2] = self.poses[:, 8, :2] + rng.normal(0, 0.05, (640, 2))
+
+    def test_lookup_matches_rules(self):
+        # The same table applying the rules to every call's bits instead of looking them up
+        direct = copy.copy(GESTURE_TABLE)
+        direct._lookup = None
+        for parameters in ({}, {"pinch_threshold": 0.02}):
+            self.assertEqual(GESTURE_TABLE.classify(self.poses, **parameters).tolist(),
+                             direct.classify(self.poses, **parameters).tolist())
+
+    def test_float64_poses_classify_like_float32(self):
+        """Live and offline callers may pass either; both are compared in float32."""
+        self.assertEqual(classify_batch(self.poses.astype(np.float64)).tolist(), classify_batch(self.poses).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
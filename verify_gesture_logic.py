@@ -1,6 +1,10 @@
 import unittest
+from types import SimpleNamespace
 from unittest.mock import MagicMock
-from gesture_controller import GestureController
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+from gesture_controller import GestureController, GESTURE_LABELS, Hand, classify_batch, landmarks_to_array
+from gesture_overlay import PreviewWindow
 
 # Mock Landmark class
 class MockLandmark:
@@ -83,5 +87,223 @@ class TestGestureLogic(unittest.TestCase):
         gesture = self.gc.detect_gesture(landmarks)
         self.assertEqual(gesture, "Two Fingers")
 
+    def test_landmarks_to_array(self):
+        """Landmarks become a contiguous (21, 3) float32 array; missing joints are zero."""
+        points = landmarks_to_array(self.create_hand(index_open=True))
+        self.assertEqual(points.shape, (21, 3))
+        self.assertEqual(points.dtype, np.float32)
+        self.assertTrue(points.flags['C_CONTIGUOUS'])
+        self.assertAlmostEqual(float(points[8, 1]), 0.3, places=6)
+        self.assertEqual(points[1].tolist(), [0.0, 0.0, 0.0])
+
+    # Expected label per (index, middle, ring, pinky) state, as the original
+    # if/elif rules give it; the thumb does not change any of them
+    FINGER_PATTERN_LABELS = {
+        (0, 0, 0, 0): "Fist",           (0, 0, 0, 1): "Unknown",
+        (0, 0, 1, 0): "Unknown",        (0, 0, 1, 1): "Unknown",
+        (0, 1, 0, 0): "Unknown",        (0, 1, 0, 1): "Unknown",
+        (0, 1, 1, 0): "Unknown",        (0, 1, 1, 1): "Unknown",
+        (1, 0, 0, 0): "Index Pointing", (1, 0, 0, 1): "Unknown",
+        (1, 0, 1, 0): "Unknown",        (1, 0, 1, 1): "Unknown",
+        (1, 1, 0, 0): "Two Fingers",    (1, 1, 0, 1): "Unknown",
+        (1, 1, 1, 0): "Unknown",        (1, 1, 1, 1): "Open Palm",
+    }
+
+    def test_classify_batch_finger_patterns(self):
+        """Every one of the 32 finger patterns gets the label of the original rules."""
+        patterns = list(np.ndindex(2, 2, 2, 2, 2))
+        hands = [self.create_hand(*(bool(bit) for bit in pattern)) for pattern in patterns]
+        codes = classify_batch(np.stack([landmarks_to_array(h) for h in hands]))
+        self.assertEqual(codes.shape, (len(hands),))
+        for pattern, hand, code in zip(patterns, hands, codes):
+            expected = self.FINGER_PATTERN_LABELS[pattern[1:]]
+            self.assertEqual(GESTURE_LABELS[code], expected, pattern)
+            self.assertEqual(self.gc.detect_gesture(hand), expected, pattern)
+
+    def test_classify_batch_pinch_threshold(self):
+        """Re-scoring with a different threshold changes the result."""
+        hand = landmarks_to_array(self.create_hand(index_open=True))
+        hand[4, :2] = hand[8, :2] + (0.03, 0.02)  # thumb tip ~0.036 from index tip
+        self.assertEqual(GESTURE_LABELS[classify_batch(hand)[0]], "Pinch")
+        self.assertEqual(GESTURE_LABELS[classify_batch(hand, pinch_threshold=0.03)[0]], "Index Pointing")
+
+    def test_idle_mode(self):
+        """Controller idles after enough empty frames and wakes on the first hand."""
+        self.gc.idle_after_frames = 3
+        hand = Hand(landmarks_to_array(self.create_hand()), "Right", 1.0)
+        for i in range(3):
+            self.assertFalse(self.gc.idle)
+            self.gc.process_hands([], 640, 480, now=float(i))
+        self.assertTrue(self.gc.idle)
+        self.gc.process_hands([hand], 640, 480, now=2.25)
+        self.assertFalse(self.gc.idle)
+        report = self.gc.idle_report()
+        self.assertEqual(report["wakeups"], 1)
+        self.assertAlmostEqual(report["wake_latency_max_ms"], 250.0)
+
+class BlobHands:
+    """Fake detector: one 'hand' whose landmarks all sit on the white blob in the image."""
+    def __init__(self):
+        self.shapes = []
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape[:2])
+        ys, xs = np.nonzero(rgb[:, :, 0] > 128)
+        if len(xs) == 0:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        h, w = rgb.shape[:2]
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for i in range(21):
+            # spread landmarks over the blob so the hand has a bounding box
+            x = xs.min() + (xs.max() - xs.min()) * (i % 5) / 4
+            y = ys.min() + (ys.max() - ys.min()) * (i // 5) / 4
+            hand.landmark.add(x=(x + 0.5) / w, y=(y + 0.5) / h, z=0.0)
+        handedness = classification_pb2.ClassificationList()
+        handedness.classification.add(label="Right", score=0.9)
+        return SimpleNamespace(multi_hand_landmarks=[hand], multi_handedness=[handedness])
+
+    def close(self):
+        pass
+
+
+class TestRoiTracking(unittest.TestCase):
+    def make_frame(self, x, y, size=60):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        frame[y:y + size, x:x + size] = 255
+        return frame
+
+    def test_roi_matches_full_frame(self):
+        """Crop landmarks are remapped to the same full-frame coordinates."""
+        full = GestureController(hands=BlobHands(), output=MagicMock())
+        tracked = GestureController(hands=BlobHands(), output=MagicMock(), roi_tracking=True)
+        for x in (600, 610, 625, 640):
+            frame = self.make_frame(x, 300)
+            hands_full = full._detect(frame.copy())
+            hands_roi = tracked._detect(frame.copy())
+            np.testing.assert_allclose(hands_roi[0].points, hands_full[0].points, atol=1e-6)
+        self.assertIsNotNone(tracked.roi)
+        self.assertLess(tracked.hands.shapes[-1][0] * tracked.hands.shapes[-1][1], 720 * 1280 / 4)
+        self.assertLess(tracked.roi_report()["pixel_fraction"], 0.5)
+
+    def test_roi_falls_back_when_hand_lost(self):
+        """A hand that leaves the crop is found again by full-frame detection on the same frame."""
+        gc = GestureController(hands=BlobHands(), output=MagicMock(), roi_tracking=True)
+        gc._detect(self.make_frame(100, 100))
+        first_roi = gc.roi
+        hands = gc._detect(self.make_frame(1100, 600))
+        self.assertEqual(len(hands), 1)
+        self.assertGreater(hands[0].points[0, 0], 0.8)
+        self.assertNotEqual(gc.roi, first_roi)
+        hands = gc._detect(self.make_frame(0, 0, size=0))
+        self.assertEqual(hands, [])
+        self.assertIsNone(gc.roi)
+
+    def test_process_frame_with_roi(self):
+        """The full pipeline, including the overlay, runs with ROI tracking."""
+        gc = GestureController(hands=BlobHands(), output=MagicMock(), roi_tracking=True)
+        for _ in range(2):
+            processed, name = gc.process_frame(self.make_frame(600, 300), mirror=False)
+        self.assertEqual(processed.shape, (720, 1280, 3))
+        self.assertNotEqual(gc.raw_gesture, "None")
+
+
+class TestOverlay(unittest.TestCase):
+    def make_frame(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[200:260, 300:340] = 255
+        return frame
+
+    def test_headless_skips_drawing(self):
+        """With overlay off the returned frame is just the mirrored input."""
+        gc = GestureController(hands=BlobHands(), output=MagicMock(), overlay=False)
+        frame = self.make_frame()
+        processed, name = gc.process_frame(frame)
+        np.testing.assert_array_equal(processed, frame[:, ::-1])
+        self.assertNotEqual(gc.raw_gesture, "None")
+
+    def test_preview_submit_is_rate_limited(self):
+        """Only frames due at the preview rate are copied and queued."""
+        preview = PreviewWindow(fps=10)
+        gc = GestureController(hands=BlobHands(), output=MagicMock(), overlay=False)
+        gc.preview = preview
+        for _ in range(20):
+            gc.process_frame(self.make_frame())
+        frame, _ = preview._slot.get(timeout=0)
+        self.assertEqual(preview._slot.dropped, 0)
+        self.assertEqual(frame[0].shape, (480, 640, 3))
+        self.assertEqual(len(frame[1]), 1)
+
+
+class TestFramePreprocessing(unittest.TestCase):
+    def make_frame(self, w, h, x, y):
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+        frame[y:y + 60, x:x + 40] = 255
+        return frame
+
+    def test_steady_state_allocates_nothing(self):
+        """After the first frame no buffers are allocated at 720p or 1080p."""
+        for w, h in ((1280, 720), (1920, 1080)):
+            for roi_tracking in (False, True):
+                gc = GestureController(hands=BlobHands(), output=MagicMock(), roi_tracking=roi_tracking)
+                outputs = []
+                for i in range(5):
+                    processed, _ = gc.process_frame(self.make_frame(w, h, 400 + i, 300))
+                    outputs.append(processed)
+                self.assertGreater(gc.preprocessor.total_bytes_allocated, 0)
+                self.assertEqual(gc.preprocessor.report()["bytes_last_frame"], 0)
+                self.assertTrue(np.shares_memory(outputs[-1], outputs[-2]))
+
+    def test_landmark_mirroring_matches_pixel_flip(self):
+        """Skipping the pixel flip and mirroring landmarks gives the same hands."""
+        flip = GestureController(hands=BlobHands(), output=MagicMock())
+        no_flip = GestureController(hands=BlobHands(), output=MagicMock(), flip_pixels=False)
+        recorded = []
+        for gc in (flip, no_flip):
+            gc.process_hands = lambda hands, *args, **kwargs: (recorded.append(hands), ("None", None))[1]
+            gc.process_frame(self.make_frame(640, 480, 100, 200))
+        flipped, mirrored = recorded[0][0], recorded[1][0]
+        # BlobHands spreads landmarks left to right, so compare the hands' extents
+        extent = lambda points: np.concatenate([points[:, :2].min(axis=0), points[:, :2].max(axis=0)])
+        np.testing.assert_allclose(extent(mirrored.points), extent(flipped.points), atol=1e-6)
+        self.assertEqual(mirrored.handedness, "Left")
+
+class TestWarmUp(unittest.TestCase):
+    def test_warm_up_runs_blank_inferences(self):
+        """warm_up builds the detector on demand and feeds it blank frames without touching gesture state."""
+        hands = BlobHands()
+        hands.wait_ready = MagicMock(return_value=True)
+        gc = GestureController(output=MagicMock())
+        gc._create_hands = lambda: hands
+        seconds = gc.warm_up(frames=2, frame_size=(320, 240))
+        self.assertIs(gc.hands, hands)
+        hands.wait_ready.assert_called_once()
+        self.assertEqual(hands.shapes, [(240, 320)] * 2)
+        self.assertEqual(gc.idle_report()["warm_up_ms"], 1000 * seconds)
+        self.assertEqual(gc.current_gesture, "None")
+        self.assertEqual(gc.timing.frames, 0)
+
+class TestScreenSize(unittest.TestCase):
+    def test_headless_falls_back_to_fixed_size(self):
+        """Without a usable pyautogui (no display) the cursor maps onto FALLBACK_SCREEN_SIZE."""
+        import io, sys
+        from contextlib import redirect_stdout
+        from unittest import mock
+        import gesture_controller
+        with mock.patch.object(gesture_controller, "SCREEN_SIZE", None), \
+                mock.patch.dict(sys.modules, {"pyautogui": None}), redirect_stdout(io.StringIO()):
+            self.assertEqual(gesture_controller.screen_size(), gesture_controller.FALLBACK_SCREEN_SIZE)
+
+    def test_controller_screen_size(self):
+        """A controller given a screen size maps the cursor onto it, whatever the primary screen."""
+        output = MagicMock()
+        gc = GestureController(output=output, debounce=False, screen_size=(1000, 500))
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[[6, 10, 14, 18], 1] = 0.6
+        points[[12, 16, 20], 1] = 0.8
+        points[8] = (0.8, 0.2, 0)     # index pointing at the far corner of the active area
+        points[4] = (0.5, 0.7, 0)
+        gc.process_hands([Hand(points, "Right", 1.0)], 640, 480, now=0.0)
+        output.moveTo.assert_called_once_with(1000, 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from gesture_controller import GestureController, hands_from_results
+from inference_worker import RemoteHands
+
+CRASH_VALUE = 13
+HANG_VALUE = 14
+
+
+class FakeHands:
+    """Detector run in the worker: one hand whose landmarks encode the frame it saw."""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def process(self, rgb):
+        marker = int(rgb[0, 0, 0])
+        if marker == CRASH_VALUE:
+            os._exit(1)
+        if marker == HANG_VALUE:
+            time.sleep(30)
+        if marker == 0:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[:, 0] = rgb.shape[1] / 10000   # frame width
+        points[:, 1] = marker / 255           # pixel value
+        points[:, 2] = float(rgb.mean())
+        category = SimpleNamespace(label="Left", score=0.75)
+        return SimpleNamespace(multi_hand_landmarks=[points],
+                               multi_handedness=[SimpleNamespace(classification=[category])])
+
+    def close(self):
+        pass
+
+
+def frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+class TestRemoteHands(unittest.TestCase):
+    def setUp(self):
+        self.hands = RemoteHands(factory=FakeHands, max_frame_shape=(48, 64, 3), timeout=2.0)
+        self.hands.restart_backoff = 0.0
+        self.assertTrue(self.hands.wait_ready())
+
+    def tearDown(self):
+        self.hands.close()
+
+    def test_frames_round_trip(self):
+        for value in (50, 200):
+            hands = hands_from_results(self.hands.process(frame(value)))
+            self.assertEqual(len(hands), 1)
+            self.assertAlmostEqual(float(hands[0].points[0, 1]), value / 255, places=5)
+            self.assertAlmostEqual(float(hands[0].points[0, 2]), value)
+            self.assertEqual((hands[0].handedness, hands[0].score), ("Left", 0.75))
+        self.assertEqual(hands_from_results(self.hands.process(frame(0))), [])
+        self.assertEqual(self.hands.stats()["inference_frames"], 3)
+
+    def test_larger_frame_grows_the_ring(self):
+        big = frame(80, (96, 128, 3))
+        self.assertEqual(hands_from_results(self.hands.process(big)), [])  # worker restarting
+        self.assertTrue(self.hands.wait_ready())
+        hands = hands_from_results(self.hands.process(big))
+        self.assertAlmostEqual(float(hands[0].points[0, 0]), 128 / 10000, places=5)
+
+    def test_restart_after_crash(self):
+        self.assertEqual(hands_from_results(self.hands.process(frame(CRASH_VALUE))), [])
+        self.assertTrue(self.hands.wait_ready())
+        self.assertEqual(self.hands.restarts, 1)
+        self.assertEqual(len(hands_from_results(self.hands.process(frame(90)))), 1)
+        self.assertEqual(self.hands.failures, 0)
+
+    def test_restart_after_hang(self):
+        self.hands.timeout = 0.3
+        self.assertEqual(hands_from_results(self.hands.process(frame(HANG_VALUE))), [])
+        self.assertTrue(self.hands.wait_ready())
+        self.assertEqual(len(hands_from_results(self.hands.process(frame(90)))), 1)
+
+    def test_controller_api_unchanged(self):
+        gc = GestureController(hands=self.hands, output=MagicMock())
+        processed, _ = gc.process_frame(frame(120), mirror=False)
+        self.assertEqual(processed.shape, (48, 64, 3))
+        self.assertEqual(gc.raw_gesture, "Fist")
+
+
+if __name__ == "__main__":
+    unittest.main()
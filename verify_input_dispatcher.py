@@ -0,0 +1,126 @@
+import contextlib
+import io
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from input_dispatcher import MAX_QUEUE_DEPTH, InputDispatcher
+
+
+class SlowBackend:
+    """pyautogui stand-in that takes `delay` seconds per call and logs it."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.gate.wait()
+            time.sleep(self.delay)
+            self.calls.append((name, args))
+        return call
+
+
+class TestInputDispatcher(unittest.TestCase):
+    def test_moves_coalesce_and_actions_keep_order(self):
+        """Queued moves collapse to the latest target; clicks and keys are never dropped."""
+        backend = SlowBackend()
+        backend.gate.clear()  # hold the actuator so everything queues up
+        d = InputDispatcher(backend)
+        d.start()
+        d.moveTo(0, 0)
+        time.sleep(0.05)  # the actuator has taken this one and is blocked on it
+        for i in range(1, 50):
+            d.moveTo(i, i)
+        d.click()
+        d.moveTo(100, 100)
+        d.moveTo(200, 200)
+        d.press("volumeup")
+        d.hotkey("ctrl", "tab")
+        backend.gate.set()
+        d.stop()
+        self.assertEqual(backend.calls, [
+            ("moveTo", (0, 0)), ("moveTo", (49, 49)), ("click", ()),
+            ("moveTo", (200, 200)), ("press", ("volumeup",)), ("hotkey", ("ctrl", "tab")),
+        ])
+        stats = d.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["dispatched"], 6)
+        self.assertEqual(stats["moves_coalesced"], 49)
+
+    def test_producer_never_blocks_on_slow_injection(self):
+        """Calls return immediately even when each injection takes 50 ms."""
+        backend = SlowBackend(delay=0.05)
+        d = InputDispatcher(backend)
+        d.start()
+        start = time.perf_counter()
+        for i in range(100):
+            d.moveTo(i, i)
+        d.click()
+        elapsed = time.perf_counter() - start
+        d.stop(timeout=2.0)
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(backend.calls[-1], ("click", ()))
+        self.assertLessEqual(len(backend.calls), 4)
+        self.assertGreater(d.stats()["dispatch_latency_max_ms"], 0)
+
+    def test_coalesced_move_latency_counts_from_oldest_move(self):
+        """A retargeted move reports the wait of the first move it replaced, not the last."""
+        backend = SlowBackend()
+        backend.gate.clear()
+        d = InputDispatcher(backend)
+        d.start()
+        d.click()
+        time.sleep(0.02)      # the actuator is blocked on the click
+        d.moveTo(0, 0)
+        time.sleep(0.1)
+        d.moveTo(1, 1)        # coalesced into the first move
+        backend.gate.set()
+        d.stop()
+        self.assertEqual(backend.calls, [("click", ()), ("moveTo", (1, 1))])
+        self.assertGreaterEqual(d.stats()["dispatch_latency_max_ms"], 100)
+
+    def test_missing_pyautogui_is_reported_and_calls_dropped(self):
+        """When pyautogui cannot load, the failure is recorded and the queue does not grow."""
+        d = InputDispatcher()
+        with mock.patch.dict(sys.modules, {"pyautogui": None}), contextlib.redirect_stdout(io.StringIO()):
+            d.start()
+            d.join(1.0)
+        self.assertFalse(d.is_alive())
+        self.assertIsInstance(d.error, ImportError)
+        for i in range(10):
+            d.moveTo(i, i)
+            d.click()
+        stats = d.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreaterEqual(stats["dispatch_dropped"], 20)
+        self.assertIn("pyautogui", stats["dispatch_error"])
+
+    def test_stuck_actuator_drops_moves_but_keeps_actions(self):
+        """Past MAX_QUEUE_DEPTH only cursor moves are dropped; every click and the mouseUp still run."""
+        backend = SlowBackend()
+        d = InputDispatcher(backend)     # not started yet: stuck until everything is queued
+        for i in range(MAX_QUEUE_DEPTH):
+            d.moveTo(i, 0)
+            d.click()
+        d.mouseDown()
+        for i in range(50):
+            d.moveTo(i, 1)
+            d.press("a")
+        d.mouseUp()
+        self.assertEqual(d.stats()["dispatch_dropped"], MAX_QUEUE_DEPTH // 2 + 50)
+        d.start()
+        d.stop(timeout=2.0)
+        names = [name for name, _ in backend.calls]
+        self.assertEqual(names.count("click"), MAX_QUEUE_DEPTH)
+        self.assertEqual(names.count("press"), 50)
+        self.assertEqual(names[-1], "mouseUp")
+        self.assertEqual(names.count("mouseDown"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
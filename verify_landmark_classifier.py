@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from benchmark_gesture import make_pose
+from gesture_controller import GestureController, Hand
+from landmark_classifier import LandmarkClassifier, class_report, landmark_features, main, train
+from landmark_recording import LandmarkRecorder
+
+VOCABULARY = {
+    "Fist": (),
+    "Index Pointing": (1,),
+    "Two Fingers": (1, 2),
+    "Three Fingers": (1, 2, 3),   # not expressible without a longer rule list
+    "Open Palm": (1, 2, 3, 4),
+}
+
+
+def dataset(n, seed):
+    """Noisy poses of VOCABULARY at random positions and scales."""
+    rng = np.random.default_rng(seed)
+    names = list(VOCABULARY)
+    labels = [names[i] for i in rng.integers(len(names), size=n)]
+    poses = []
+    for label in labels:
+        pose = make_pose(VOCABULARY[label])
+        wrist = pose[0].copy()
+        pose = wrist + (pose - wrist) * rng.uniform(0.5, 1.5)
+        pose[:, :2] += rng.uniform(-0.2, 0.2, 2)
+        poses.append(pose + rng.normal(0, 0.01, pose.shape))
+    return np.array(poses, dtype=np.float32), labels
+
+
+class TestLandmarkClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        poses, labels = dataset(600, seed=0)
+        cls.model = train(poses, labels, epochs=40)
+
+    def test_features_ignore_position_and_scale(self):
+        pose = make_pose((1, 2))
+        moved = pose.copy()
+        moved[:, :2] = (pose[:, :2] - pose[0, :2]) * 2 + (0.1, -0.2)
+        np.testing.assert_allclose(landmark_features(pose), landmark_features(moved), atol=1e-5)
+        self.assertEqual(landmark_features(np.stack([pose, moved])).shape, (2, 42))
+
+    def test_held_out_precision_and_recall(self):
+        poses, labels = dataset(300, seed=1)
+        report = class_report(labels, self.model.predict(poses))
+        self.assertGreater(report["accuracy"], 0.95)
+        self.assertEqual(set(report["classes"]), set(VOCABULARY))
+        for r in report["classes"].values():
+            self.assertGreater(r["precision"], 0.9)
+            self.assertGreater(r["recall"], 0.9)
+
+    def test_low_confidence_is_unknown(self):
+        pose = make_pose((1, 2))
+        self.model.min_probability = 1.01
+        try:
+            self.assertEqual(self.model.predict(pose), ["Unknown"])
+        finally:
+            self.model.min_probability = 0.6
+
+    def test_class_report(self):
+        report = class_report(["A", "A", "B", "B"], ["A", "B", "B", "B"])
+        self.assertEqual(report["accuracy"], 0.75)
+        self.assertEqual(report["classes"]["A"], {"precision": 1.0, "recall": 0.5, "support": 2})
+        self.assertAlmostEqual(report["classes"]["B"]["precision"], 2 / 3)
+
+    def test_saved_model_loads_lazily(self):
+        poses, _ = dataset(20, seed=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.npz")
+            self.model.save(path)
+            self.assertLess(os.path.getsize(path), 16 * 1024)
+            loaded = LandmarkClassifier(path)
+            self.assertIsNone(loaded._weights)
+            self.assertEqual(loaded.predict(poses), self.model.predict(poses))
+            np.testing.assert_allclose(loaded.predict_proba(poses).sum(axis=1), 1.0, rtol=1e-5)
+
+    def test_controller_uses_classifier(self):
+        gc = GestureController(output=MagicMock(), debounce=False, classifier=self.model)
+        pose = make_pose((1, 2, 3))
+        self.assertEqual(gc.detect_gesture(pose), "Three Fingers")
+        self.assertEqual(gc.process_hands([Hand(pose, "Right", 0.9)], 640, 480, now=1.0)[0], "Three Fingers")
+
+
+class TestTrainCommand(unittest.TestCase):
+    def test_train_and_eval_from_recordings(self):
+        poses, labels = dataset(200, seed=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            recording = os.path.join(tmp, "labeled.lmk")
+            with LandmarkRecorder(recording, labels=list(VOCABULARY)) as recorder:
+                for i, (pose, label) in enumerate(zip(poses, labels)):
+                    recorder.append(100.0 + i / 30, [Hand(pose, "Right", 0.9)], label=label)
+            model = os.path.join(tmp, "model.npz")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(main(["train", model, recording, "--epochs", "30"]), 0)
+                self.assertEqual(main(["eval", model, recording]), 0)
+            text = out.getvalue()
+            self.assertIn("Held-out frames (40)", text)
+            self.assertIn("Three Fingers", text)
+            self.assertIn("gestures.json rules", text)
+            self.assertEqual(sorted(LandmarkClassifier(model).labels), sorted(VOCABULARY))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+import gesture_controller
+from benchmark_gesture import StubHands, make_pose
+from gesture_controller import GESTURE_LABELS, GestureController, Hand
+from gesture_debounce import DEBOUNCE_ENTER_FRAMES
+from landmark_recording import RECORD_DTYPE, ActionLog, LandmarkRecorder, LandmarkRecording, main, replay
+
+
+def pinch_then_leave(pinch_frames=5, empty_frames=30):
+    """(timestamp, hands) at 30 fps: a pinch (drag), then the hand out of view."""
+    stream = [(i / 30.0, [Hand(make_pose((1,), pinch=True), "Right", 1.0)]) for i in range(pinch_frames)]
+    return stream + [((pinch_frames + i) / 30.0, []) for i in range(empty_frames)]
+
+
+class TestLandmarkRecording(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".lmk")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        """Landmarks, handedness, scores and labels survive a round trip."""
+        pose = make_pose((1,))
+        with LandmarkRecorder(self.path, frame_size=(640, 480)) as rec:
+            rec.append(100.0, [Hand(pose, "Right", 0.9)], label="Index Pointing")
+            rec.append(100.5, [Hand(pose, "Left", 0.8)])
+
+        recording = LandmarkRecording(self.path)
+        self.assertEqual(len(recording), 2)
+        self.assertEqual(recording.frame_size, (640, 480))
+        frames = list(recording)
+        self.assertEqual(frames[1][0], 100.5)
+        hand = frames[0][1][0]
+        self.assertEqual(hand.handedness, "Right")
+        self.assertAlmostEqual(hand.score, 0.9, places=2)
+        np.testing.assert_allclose(hand.points, pose, atol=1e-3)
+
+        poses, frame_index, labels = recording.poses()
+        self.assertEqual(poses.shape, (2, 21, 3))
+        self.assertEqual(frame_index.tolist(), [0, 1])
+        self.assertEqual([recording.labels[labels[0]], labels[1]], ["Index Pointing", -1])
+
+    def test_frames_take_one_record_per_hand(self):
+        """Records are sized to the hands present; two hands in a frame read back in order."""
+        left, right = make_pose(wrist=(0.3, 0.8)), make_pose((1,), wrist=(0.7, 0.8))
+        with LandmarkRecorder(self.path, max_hands=2) as rec:
+            rec.append(0.0, [Hand(left, "Left", 0.8), Hand(right, "Right", 0.9)])
+            rec.append(0.1, [Hand(right, "Right", 0.9)])
+        recording = LandmarkRecording(self.path)
+        self.assertEqual((len(recording), recording.frame_count), (3, 2))
+        self.assertEqual(RECORD_DTYPE.itemsize, 130)
+        self.assertEqual(os.path.getsize(self.path) - recording.records.offset, 3 * RECORD_DTYPE.itemsize)
+        frames = [hands for _, hands in recording]
+        self.assertEqual([[hand.handedness for hand in hands] for hands in frames], [["Left", "Right"], ["Right"]])
+        np.testing.assert_allclose(frames[0][0].points, left, atol=1e-4)
+        np.testing.assert_allclose(frames[1][0].points, right, atol=1e-4)
+        _, frame_index, _ = recording.poses()
+        self.assertEqual(frame_index.tolist(), [0, 0, 2])
+
+    def test_idle_frames_are_collapsed(self):
+        """A run of empty frames is stored as one record but read back frame by frame."""
+        with LandmarkRecorder(self.path) as rec:
+            rec.append(0.0, [Hand(make_pose(), "Right", 1.0)])
+            for i in range(100):
+                rec.append(0.1 + i * 0.03, [])
+            rec.append(5.0, [Hand(make_pose(), "Right", 1.0)])
+        recording = LandmarkRecording(self.path)
+        self.assertEqual(len(recording), 3)
+        self.assertEqual(recording.frame_count, 102)
+        frames = list(recording)
+        self.assertEqual([len(hands) for _, hands in frames], [1] + [0] * 100 + [1])
+        np.testing.assert_allclose([t for t, _ in frames[1:-1]], 0.1 + np.arange(100) * 0.03, atol=1e-9)
+        self.assertEqual(recording.duration, 5.0)
+
+    def test_replay_matches_live_when_the_hand_leaves(self):
+        """Drag release and idle entry, which count empty frames, replay as they happened live."""
+        live = GestureController(output=ActionLog())
+        with LandmarkRecorder(self.path) as rec:
+            for timestamp, hands in pinch_then_leave():
+                rec.append(timestamp, hands)
+                live.process_hands(hands, 640, 480, now=timestamp)
+        replayed = GestureController(output=ActionLog())
+        stats = replay(self.path, replayed)
+
+        self.assertEqual(stats["frames"], 35)
+        names = [name for name, _ in live.output.calls if name in ("mouseDown", "mouseUp")]
+        self.assertEqual(names, ["mouseDown", "mouseUp"])
+        # Same actions in the same order; stored landmarks are quantized, so a cursor target may round 1 px apart
+        self.assertEqual([name for name, _ in replayed.output.calls], [name for name, _ in live.output.calls])
+        for (_, replayed_args), (_, live_args) in zip(replayed.output.calls, live.output.calls):
+            np.testing.assert_allclose(replayed_args, live_args, atol=1)
+        for gc in (live, replayed):
+            self.assertFalse(gc.is_dragging)
+            self.assertTrue(gc.idle)
+
+    def test_replay_is_deterministic(self):
+        """Replaying drives the same actions every time, using recorded timestamps."""
+        with LandmarkRecorder(self.path) as rec:
+            for i in range(30):
+                # Open palm moving right fast enough to swipe, then held still
+                pose = make_pose((1, 2, 3, 4), wrist=(0.3 + min(i, 20) * 0.02, 0.8))
+                rec.append(i / 30.0, [Hand(pose, "Right", 1.0)])
+            for i in range(10):
+                rec.append(1.0 + i / 30.0, [Hand(make_pose((1,)), "Right", 1.0)])
+
+        runs = []
+        for _ in range(2):
+            log = ActionLog()
+            stats = replay(self.path, GestureController(output=log))
+            self.assertEqual(stats["frames"], 40)
+            runs.append(log.calls)
+        self.assertEqual(runs[0], runs[1])
+        self.assertIn(("hotkey", ("ctrl", "tab")), runs[0])
+        # The pointing gesture commits after the debounce dwell
+        self.assertEqual(sum(name == "moveTo" for name, _ in runs[0]), 10 - (DEBOUNCE_ENTER_FRAMES - 1))
+
+    def test_new_label_is_added_to_the_header(self):
+        self.assertNotIn("Three Fingers", GESTURE_LABELS)
+        with LandmarkRecorder(self.path) as rec:
+            rec.append(0.0, [Hand(make_pose(), "Right", 1.0)], label="Three Fingers")
+            rec.append(0.1, [Hand(make_pose(), "Right", 1.0)], label="Fist")
+            with self.assertRaises(ValueError):
+                rec.append(0.2, [Hand(make_pose(), "Right", 1.0)], label="Four Fingers")
+        recording = LandmarkRecording(self.path)
+        _, _, labels = recording.poses()
+        self.assertEqual([recording.labels[l] for l in labels], ["Three Fingers", "Fist"])
+
+    def test_record_command_with_new_vocabulary_label(self):
+        """`record --label "Three Fingers"` labels every frame, though no gestures.json rule has that name."""
+        self._record_two_finger_take(["--label", "Three Fingers"])
+        recording = LandmarkRecording(self.path)
+        _, _, labels = recording.poses()
+        self.assertEqual(recording.frame_count, 10)
+        self.assertEqual([recording.labels[l] for l in labels], ["Three Fingers"] * 10)
+
+    def test_record_command_does_not_touch_the_desktop(self):
+        """A two-finger take is logged as a click, not injected through pyautogui."""
+        controllers = self._record_two_finger_take([])
+        self.assertIsInstance(controllers[0].output, ActionLog)
+        self.assertIn(("click", ()), controllers[0].output.calls)
+
+    def _record_two_finger_take(self, options):
+        """Run `record` from a 10-image directory, a stub detector seeing two raised fingers; returns the controllers built."""
+        pose = make_pose((1, 2))
+        hands = StubHands([[Hand(pose, "Right", 1.0)]])
+        controllers = []
+
+        def controller(**kwargs):
+            controllers.append(GestureController(hands=hands, overlay=False, **kwargs))
+            return controllers[-1]
+
+        with tempfile.TemporaryDirectory() as frames:
+            for i in range(10):
+                cv2.imwrite(os.path.join(frames, f"frame_{i:03d}.png"), np.zeros((48, 64, 3), np.uint8))
+            with mock.patch.multiple("cv2", imshow=mock.Mock(), waitKey=mock.Mock(return_value=0),
+                                     destroyAllWindows=mock.Mock()), \
+                    mock.patch.object(gesture_controller, "GestureController", controller), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                main(["record", self.path, "--source", frames] + options)
+        return controllers
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from benchmark_gesture import make_pose
+from gesture_controller import ROI_REDETECT_FRAMES, GestureController, Hand
+from landmark_recording import ActionLog
+from verify_gesture_logic import BlobHands
+
+
+def pinch(x):
+    return make_pose((1,), wrist=(x, 0.9), tip=(x, 0.4), pinch=True)
+
+
+class TestMultiHand(unittest.TestCase):
+    def setUp(self):
+        self.log = ActionLog()
+        self.gc = GestureController(output=self.log)
+        self.now = 100.0
+
+    def run_frames(self, frames):
+        results = []
+        for hands in frames:
+            results.append(self.gc.process_hands(hands, 640, 480, now=self.now))
+            self.now += 1 / 30.0
+        return results
+
+    def calls(self, name):
+        return [args for call, args in self.log.calls if call == name]
+
+    def test_per_hand_state(self):
+        """Right hand moves the cursor while the left hand swipes, each with its own state."""
+        frames = []
+        for i in range(40):
+            x = 0.2 + 0.3 * min(max(i - 10, 0), 10) / 10   # left palm swipes right in frames 10..20
+            frames.append([Hand(make_pose((1,), tip=(0.6, 0.5)), "Right", 0.9),
+                           Hand(make_pose((1, 2, 3, 4), wrist=(x, 0.9)), "Left", 0.9)])
+        self.run_frames(frames)
+        self.assertEqual(set(self.gc.hand_states), {"Left", "Right"})
+        self.assertEqual(self.gc.hand_states["Left"].gesture, "Open Palm")
+        self.assertEqual(self.gc.cursor_hand, "Right")
+        self.assertIn(("ctrl", "tab"), self.calls("hotkey"))
+        self.assertGreater(len(self.calls("moveTo")), 30)
+
+    def test_one_hand_owns_the_cursor(self):
+        frames = [[Hand(make_pose((1,), tip=(0.3, 0.5)), "Right", 0.9),
+                   Hand(make_pose((1,), tip=(0.7, 0.5)), "Left", 0.9)]] * 10
+        self.run_frames(frames)
+        xs = {x for x, _ in self.calls("moveTo")}
+        self.assertEqual(len(xs), 1)   # only the owner's (still) fingertip
+
+    def test_two_hand_pinch_zoom(self):
+        frames = [[Hand(pinch(0.4 - d), "Right", 0.9), Hand(pinch(0.6 + d), "Left", 0.9)]
+                  for d in list(np.linspace(0, 0.15, 10)) + list(np.linspace(0.15, -0.05, 10))]
+        results = self.run_frames(frames)
+        self.assertEqual(results[-1][0], "Pinch Zoom")
+        self.assertIn(("ctrl", "+"), self.calls("hotkey"))
+        self.assertIn(("ctrl", "-"), self.calls("hotkey"))
+        self.assertFalse(self.gc.is_dragging)
+        self.assertEqual(len(self.calls("mouseDown")), len(self.calls("mouseUp")))
+
+    def test_duplicate_handedness_gets_separate_state(self):
+        self.run_frames([[Hand(make_pose(), "Right", 0.9), Hand(make_pose(), "Right", 0.9)]])
+        self.assertEqual(set(self.gc.hand_states), {"Left", "Right"})
+
+    def test_roi_rechecks_full_frame_for_second_hand(self):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        frame[300:360, 600:660] = 255
+        for max_hands, full_frames in ((1, 1), (2, 2)):
+            gc = GestureController(hands=BlobHands(), output=MagicMock(), roi_tracking=True,
+                                   max_num_hands=max_hands)
+            for _ in range(ROI_REDETECT_FRAMES + 2):
+                gc._detect(frame)
+            self.assertEqual(gc.hands.shapes.count((720, 1280)), full_frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from gesture_controller import GestureController
+from pipeline_timing import LatencyHistogram, PipelineTimer
+from verify_gesture_logic import BlobHands
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_width(self):
+        h = LatencyHistogram()
+        samples = np.random.default_rng(0).uniform(0.001, 0.050, 5000)
+        for s in samples:
+            h.record(s)
+        for p in (50, 95, 99):
+            exact = np.percentile(samples, p)
+            self.assertGreaterEqual(h.percentile(p), exact * 0.99)
+            self.assertLessEqual(h.percentile(p), exact * 1.13)
+        self.assertEqual(h.count, 5000)
+
+    def test_fixed_size(self):
+        h = LatencyHistogram()
+        size = len(h.counts)
+        for s in (0.0, 1e-9, 0.5, 1e6):
+            h.record(s)
+        self.assertEqual(len(h.counts), size)
+        self.assertEqual(h.percentile(100), 1e6)
+
+
+class TestPipelineTimer(unittest.TestCase):
+    def test_stage_time_is_summed_per_frame(self):
+        timer = PipelineTimer()
+        for _ in range(3):
+            timer.begin_frame()
+            with timer.stage("detect"):
+                pass
+            with timer.stage("detect"):  # e.g. ROI miss and full-frame retry
+                pass
+            timer.end_frame()
+        report = timer.report()
+        self.assertEqual(report["detect"]["count"], 3)
+        self.assertEqual(report["total"]["count"], 3)
+        self.assertNotIn("overlay", report)
+
+    def test_record_and_jsonl(self):
+        timer = PipelineTimer()
+        timer.record("capture", 0.004)
+        out = io.StringIO()
+        timer.write_jsonl(out, host="test")
+        timer.write_jsonl(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        line = json.loads(lines[0])
+        self.assertEqual(line["host"], "test")
+        self.assertAlmostEqual(line["stages"]["capture"]["max_ms"], 4.0)
+        self.assertEqual(len(timer.percentiles("capture")), 3)
+
+
+class TestControllerTiming(unittest.TestCase):
+    def test_process_frame_records_stages(self):
+        gc = GestureController(hands=BlobHands(), output=MagicMock())
+        gc.show_timing = True
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[200:260, 300:340] = 255
+        for _ in range(5):
+            gc.process_frame(frame)
+        report = gc.timing.report()
+        for stage in ("preprocess", "detect", "classify", "dispatch", "overlay", "total"):
+            self.assertEqual(report[stage]["count"], 5, stage)
+        self.assertLessEqual(report["detect"]["p50_ms"], report["total"]["max_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from audio_capture import CHUNK, AudioCaptureService
+from speech_backends import (CommandPrefixes, PartialStabilizer, RecognizerBackend, ScriptedBackend, make_backend,
+                             recognize_stream)
+from verify_wake_word import OTHER, WAKE, phrase, silence
+from wake_word import SAMPLE_RATE
+
+COMMANDS = CommandPrefixes(["volume up", "volume down", "mute", "turn on", "turn on wifi"])
+
+
+def spoken(*parts):
+    """Subscription to a capture service that has already heard `parts`."""
+    service = AudioCaptureService(open_stream=None)
+    subscription = service.subscribe()
+    audio = np.concatenate([silence(0.5), *parts, silence(1.0, seed=1)])
+    for i in range(0, len(audio), CHUNK):
+        service.process(audio[i:i + CHUNK])
+    return subscription
+
+
+class TestEarlyDispatch(unittest.TestCase):
+    def test_stable_prefix(self):
+        stabilizer = PartialStabilizer(repeats=2)
+        self.assertEqual(stabilizer.update("volume"), ())
+        self.assertEqual(stabilizer.update("volume up"), ("volume",))
+        self.assertEqual(stabilizer.update("volume up"), ("volume", "up"))
+        self.assertEqual(stabilizer.update("Volume upper"), ("volume",))
+
+    def test_command_prefixes(self):
+        self.assertEqual(COMMANDS.match(("volume", "up")), "volume up")
+        self.assertEqual(COMMANDS.match(("volume", "up", "please")), "volume up")
+        self.assertEqual(COMMANDS.match(("mute",)), "mute")
+        self.assertIsNone(COMMANDS.match(("volume",)))
+        self.assertIsNone(COMMANDS.match(("turn", "on")))              # "turn on wifi" still possible
+        self.assertEqual(COMMANDS.match(("turn", "on", "wifi")), "turn on wifi")
+        self.assertEqual(COMMANDS.match(("turn", "on", "the")), "turn on")
+        self.assertIsNone(COMMANDS.match(("open", "mute")))
+        self.assertIsNone(COMMANDS.match(()))
+
+
+class TestRecognizeStream(unittest.TestCase):
+    def test_dispatches_before_the_utterance_ends(self):
+        words = np.concatenate([phrase(WAKE), phrase(OTHER, seed=1)])   # 1.3 s of "speech"
+        backend = ScriptedBackend(SAMPLE_RATE, [(0.2, "volume"), (0.4, "volume up"), (1.0, "volume up please")])
+        result = recognize_stream(spoken(words), backend, timeout=0, early=COMMANDS)
+        self.assertEqual(result, ("volume up", True))
+        self.assertLess(backend.fed / SAMPLE_RATE, 0.7)
+
+    def test_waits_for_final_when_ambiguous(self):
+        partials = []
+        backend = ScriptedBackend(SAMPLE_RATE, [(0.2, "open"), (0.4, "open spotify")], final="open spotify")
+        result = recognize_stream(spoken(phrase(WAKE)), backend, timeout=0, early=COMMANDS,
+                                  on_partial=partials.append)
+        self.assertEqual(result, ("open spotify", False))
+        self.assertAlmostEqual(backend.fed / SAMPLE_RATE, len(phrase(WAKE)) / SAMPLE_RATE + 0.1, delta=0.1)
+        self.assertEqual(partials[-1], "open spotify")
+
+    def test_one_shot_backend_gets_whole_utterance(self):
+        class Echo(RecognizerBackend):
+            def finish(self):
+                return f"{sum(len(p) for p in self.pieces)} samples"
+        result = recognize_stream(spoken(phrase(WAKE)), Echo(SAMPLE_RATE), timeout=0, early=COMMANDS)
+        self.assertFalse(result.early)
+        self.assertAlmostEqual(int(result.text.split()[0]) / SAMPLE_RATE, 0.75, delta=0.1)
+
+    def test_silence_is_empty(self):
+        backend = ScriptedBackend(SAMPLE_RATE, [(0.0, "phantom")])
+        self.assertEqual(recognize_stream(spoken(), backend, timeout=0), ("", False))
+        self.assertEqual(backend.fed, 0)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            make_backend("nope", SAMPLE_RATE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import gui_assistant
+from gui_assistant import StartupTimeline, app_path
+
+HEAVY_MODULES = ("cv2", "mediapipe", "numpy", "pyttsx3", "speech_recognition", "pyautogui", "requests",
+                 "gesture_controller")
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_loads_no_heavy_modules(self):
+        """Importing the GUI module (also what a spawned worker does) stays cheap."""
+        code = ("import sys, gui_assistant; "
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "")
+
+    def test_app_paths_resolve_user_on_first_use(self):
+        gui_assistant._username.cache_clear()
+        with patch("os.getlogin", return_value="alice") as getlogin:
+            self.assertEqual(app_path("notepad"), "notepad.exe")
+            self.assertIn("alice", app_path("vscode"))
+            self.assertIn("alice", app_path("spotify"))
+            self.assertIsNone(app_path("no such app"))
+        self.assertEqual(getlogin.call_count, 1)
+        gui_assistant._username.cache_clear()
+
+
+class TestStartupTimeline(unittest.TestCase):
+    def test_subsystems_settle(self):
+        timeline = StartupTimeline(subsystems=("tts", "speech", "gestures"))
+        self.assertEqual(timeline.pending(), ["tts", "speech", "gestures"])
+        worker = threading.Thread(target=timeline.ready, args=("gestures",), name="gestures")
+        worker.start()
+        worker.join()
+        timeline.ready("tts")
+        timeline.ready("tts")
+        self.assertEqual(timeline.pending(), ["speech"])
+        timeline.failed("speech", "no microphone")
+        self.assertEqual(timeline.pending(), [])
+        self.assertEqual(timeline.unavailable(), ["speech"])
+
+        report = timeline.report().splitlines()
+        self.assertEqual(len(report), 4)   # header + three events, "tts ready" once
+        self.assertIn("[gestures]", report[1])
+        self.assertIn("speech failed: no microphone", report[3])
+
+    def test_failure_after_ready_keeps_ready(self):
+        timeline = StartupTimeline(subsystems=("gestures",))
+        timeline.ready("gestures")
+        timeline.failed("gestures", "late error")
+        self.assertEqual(timeline.unavailable(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
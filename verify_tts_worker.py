@@ -0,0 +1,169 @@
+import contextlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+import wave
+
+from tts_worker import LOW, NORMAL, URGENT, TTSWorker, split_sentences
+
+
+class FakeEngine:
+    """pyttsx3 stand-in: 'speaks' one word per `word_time` seconds, honouring stop() between words."""
+    def __init__(self, word_time=0.005):
+        self.word_time = word_time
+        self.gate = threading.Event()
+        self.gate.set()
+        self.queued = []
+        self.words = []          # every word actually spoken
+        self.utterances = []     # texts whose speaking started
+        self.saved = []
+        self.callbacks = {}
+        self._stopped = False
+
+    def connect(self, name, callback):
+        self.callbacks[name] = callback
+
+    def getProperty(self, name):
+        return {"voice": "fake", "rate": 160}[name]
+
+    def say(self, text):
+        self.queued.append(text)
+
+    def save_to_file(self, text, path):
+        self.saved.append(text)
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b"\0\0" * 400)
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        self.gate.wait()
+        self._stopped = False
+        queued, self.queued = self.queued, []
+        for text in queued:
+            self.utterances.append(text)
+            for word in text.split():
+                self.callbacks["started-word"]("started-word", 0, len(word))
+                if self._stopped:
+                    return
+                self.words.append(word)
+                time.sleep(self.word_time)
+
+
+def wait_idle(worker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with worker._cond:
+            if not worker._live and not worker._queue:
+                return
+        time.sleep(0.005)
+    raise AssertionError("TTS worker did not go idle")
+
+
+class TestTTSWorker(unittest.TestCase):
+    def start(self, **kwargs):
+        self.engine = FakeEngine()
+        kwargs.setdefault("cache_dir", None)
+        worker = TTSWorker(engine_factory=lambda: self.engine, **kwargs)
+        worker.start()
+        self.assertTrue(worker.wait_ready(2))
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_say_does_not_block(self):
+        worker = self.start()
+        self.engine.gate.clear()
+        started = time.perf_counter()
+        speech = worker.say("Volume up")
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertFalse(speech.wait(0.05))
+        self.engine.gate.set()
+        self.assertTrue(speech.wait(2))
+        self.assertEqual(self.engine.words, ["Volume", "up"])
+
+    def test_priority_order(self):
+        worker = self.start()
+        self.engine.gate.clear()
+        first = worker.say("first", LOW)
+        time.sleep(0.05)              # the worker has taken it and waits in runAndWait
+        worker.say("later", LOW, interrupt=False)
+        worker.say("urgent", URGENT, interrupt=False)
+        worker.say("normal", NORMAL, interrupt=False)
+        self.engine.gate.set()
+        wait_idle(worker)
+        self.assertTrue(first.done)
+        self.assertEqual(self.engine.utterances, ["first", "urgent", "normal", "later"])
+
+    def test_repeated_text_is_coalesced(self):
+        worker = self.start()
+        self.engine.gate.clear()
+        handles = [worker.say("Volume up") for _ in range(5)]
+        self.engine.gate.set()
+        wait_idle(worker)
+        self.assertTrue(all(h is handles[0] for h in handles))
+        self.assertEqual(self.engine.utterances, ["Volume up"])
+        self.assertEqual(worker.stats()["coalesced"], 4)
+
+    def test_barge_in_cancels_stale_speech(self):
+        worker = self.start()
+        self.engine.word_time = 0.02
+        answer = " ".join(f"Sentence {i} has a few words in it." for i in range(5))
+        long = worker.say(answer, LOW)
+        prompt = worker.say("Yes?", URGENT)
+        time.sleep(0.05)
+        worker.say("Volume up", NORMAL)        # does not cancel the more urgent prompt
+        wait_idle(worker)
+        self.assertTrue(long.cancelled and long.done and not prompt.cancelled)
+        self.assertLess(len(self.engine.words), 8)
+        self.assertEqual(self.engine.utterances[-2:], ["Yes?", "Volume up"])
+        self.assertEqual(worker.stats()["interrupted"], 1)
+
+    def test_long_text_is_spoken_by_sentence(self):
+        self.assertEqual(split_sentences("One. Two? Three! Four"), ["One.", "Two?", "Three!", "Four"])
+        self.assertEqual(split_sentences("no breaks"), ["no breaks"])
+        worker = self.start()
+        worker.say("First one. Second one.", LOW).wait(2)
+        self.assertEqual(self.engine.utterances, ["First one.", "Second one."])
+
+    def test_cached_phrases_play_from_disk(self):
+        played = []
+        speaking = []
+
+        @contextlib.contextmanager
+        def while_speaking():
+            speaking.append(True)
+            yield
+
+        with tempfile.TemporaryDirectory() as tmp:
+            worker = self.start(cache_dir=tmp, phrases=("Yes?", "Listening"),
+                                player=lambda path, cancelled: played.append(path) or True,
+                                while_speaking=while_speaking)
+            deadline = time.monotonic() + 2
+            while worker.cache.missing() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(sorted(self.engine.saved), ["Listening", "Yes?"])
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            worker.say("Yes?").wait(2)
+            worker.say("Not cached").wait(2)
+        self.assertEqual(played, [worker.cache.path("Yes?")])
+        self.assertEqual(self.engine.utterances, ["Not cached"])
+        self.assertEqual(worker.stats()["cache_hits"], 1)
+        self.assertEqual(len(speaking), 2)
+
+    def test_engine_failure_is_reported(self):
+        def broken():
+            raise RuntimeError("no voices")
+        worker = TTSWorker(engine_factory=broken, cache_dir=None)
+        worker.start()
+        self.assertFalse(worker.wait_ready(2))
+        self.assertIn("no voices", str(worker.error))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from wake_word import (SAMPLE_RATE, AudioRingBuffer, UtteranceSegmenter, VoiceActivityDetector, WakeWordDetector,
+                       WakeWordListener, enroll, main)
+
+CHUNK = 1024
+# Stand-ins for spoken phrases: sequences of (pitch Hz, seconds) harmonic tones
+WAKE = [(300, 0.15), (800, 0.2), (500, 0.15), (1200, 0.15)]
+OTHER = [(1200, 0.15), (500, 0.2), (800, 0.15), (300, 0.15)]
+
+
+def phrase(parts, stretch=1.0, gain=0.3, seed=0):
+    """int16 audio of a tone sequence, time-stretched, with slight pitch jitter and noise."""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    for pitch, seconds in parts:
+        t = np.arange(int(seconds * stretch * SAMPLE_RATE)) / SAMPLE_RATE
+        pitch *= rng.uniform(0.97, 1.03)
+        tone = sum(np.sin(2 * np.pi * k * pitch * t) / k for k in (1, 2, 3))
+        pieces.append(tone * np.hanning(len(t)) ** 0.3)
+    audio = np.concatenate(pieces) * gain * 32767 / 1.9
+    return (audio + rng.normal(0, 100, len(audio))).astype(np.int16)
+
+
+def silence(seconds, seed=0):
+    return np.random.default_rng(seed).normal(0, 60, int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+def chunks(audio):
+    return [audio[i:i + CHUNK] for i in range(0, len(audio), CHUNK)]
+
+
+def enrolled():
+    return enroll([phrase(WAKE, stretch, seed=i) for i, stretch in enumerate((0.9, 1.0, 1.1))])
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_reads_by_absolute_position_across_wraparound(self):
+        ring = AudioRingBuffer(seconds=1, rate=100)
+        stream = np.arange(250, dtype=np.int16)
+        for piece in np.array_split(stream, 7):
+            ring.write(piece)
+        self.assertEqual(ring.written, 250)
+        np.testing.assert_array_equal(ring.read(180, 220), stream[180:220])
+        np.testing.assert_array_equal(ring.read(100), stream[150:])   # older samples are gone
+        ring.write(np.arange(1000, 1300, dtype=np.int16))             # larger than the ring
+        np.testing.assert_array_equal(ring.read(450), np.arange(1200, 1300))
+
+
+class TestVoiceActivity(unittest.TestCase):
+    def test_segments_one_utterance(self):
+        audio = np.concatenate([silence(1.0), phrase(WAKE), silence(1.0, seed=1)])
+        vad = VoiceActivityDetector()
+        segmenter = UtteranceSegmenter(vad.frame_len)
+        utterances = []
+        for chunk in chunks(audio):
+            utterances += segmenter.feed(vad.feed(chunk))
+        self.assertEqual(len(utterances), 1)
+        start, end = utterances[0]
+        self.assertAlmostEqual(start / SAMPLE_RATE, 0.9, delta=0.1)      # onset minus pre-roll
+        self.assertAlmostEqual(end / SAMPLE_RATE, 1.0 + len(phrase(WAKE)) / SAMPLE_RATE, delta=0.1)
+        self.assertLess(vad.noise_floor_db, -50)
+
+    def test_noise_floor_follows_louder_background(self):
+        vad = VoiceActivityDetector()
+        for chunk in chunks(silence(1.0)):
+            vad.feed(chunk)
+        quiet_floor = vad.noise_floor_db
+        louder = (silence(5.0, seed=2) * 3).astype(np.int16)   # +9.5 dB, below the speech margin
+        flags = np.concatenate([vad.feed(chunk) for chunk in chunks(louder)])
+        self.assertFalse(flags.any())
+        self.assertAlmostEqual(vad.noise_floor_db, quiet_floor + 9.5, delta=1.5)
+
+
+class TestWakeWordDetector(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = enrolled()
+
+    def test_matches_wake_phrase_only(self):
+        for stretch in (0.85, 1.0, 1.15):
+            self.assertTrue(self.detector.match(phrase(WAKE, stretch, gain=0.1, seed=7))[0])
+            self.assertFalse(self.detector.match(phrase(OTHER, stretch, gain=0.1, seed=7))[0])
+
+    def test_implausible_length_skips_features(self):
+        self.assertEqual(self.detector.distance(phrase(WAKE[:1])), float("inf"))
+
+    def test_wake_phrase_run_on_into_a_command(self):
+        """A long utterance is matched by its start; the phrase's end is found, the command follows."""
+        wake = phrase(WAKE, seed=6)
+        distance, end = self.detector.locate(np.concatenate([wake, phrase(OTHER * 2, seed=8)]))
+        self.assertLessEqual(distance, self.detector.threshold)
+        self.assertAlmostEqual(end / SAMPLE_RATE, len(wake) / SAMPLE_RATE, delta=0.08)
+        self.assertFalse(self.detector.match(np.concatenate([phrase(OTHER, seed=8), wake]))[0])
+
+    def test_templates_load_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wake.npz")
+            self.assertFalse(WakeWordDetector(path).enrolled)
+            self.detector.save(path)
+            loaded = WakeWordDetector(path)
+            self.assertTrue(loaded.enrolled)
+            self.assertIsNone(loaded._templates)
+            sample = phrase(WAKE, seed=5)
+            self.assertAlmostEqual(loaded.distance(sample), self.detector.distance(sample), places=3)
+            self.assertAlmostEqual(loaded.threshold, self.detector.threshold, places=5)
+
+    def test_enroll_needs_two_takes(self):
+        with self.assertRaises(ValueError):
+            enroll([phrase(WAKE)])
+
+
+class TestWakeWordListener(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def recognize(self, samples):
+        self.calls.append(len(samples))
+        return "hey assistant"
+
+    def stream(self):
+        return np.concatenate([silence(2.0), phrase(WAKE, seed=9), silence(1.0, seed=1),
+                               phrase(OTHER, seed=3), silence(1.0, seed=2),
+                               phrase(WAKE, 1.05, seed=4), silence(1.0, seed=3)])
+
+    def test_local_detector_gates_recognizer(self):
+        listener = WakeWordListener(enrolled(), recognize=self.recognize)
+        wakes = [i for i, chunk in enumerate(chunks(self.stream())) if listener.feed(chunk)]
+        self.assertEqual(len(wakes), 2)
+        self.assertEqual(self.calls, [])
+        stats = listener.stats()
+        self.assertEqual((stats["utterances"], stats["local_checks"], stats["local_hits"]), (3, 3, 2))
+        self.assertEqual(stats["recognizer_calls_per_hour"], 0.0)
+
+    def test_confirm_calls_recognizer_on_hits_only(self):
+        listener = WakeWordListener(enrolled(), recognize=lambda samples: self.recognize(samples) and "",
+                                    confirm=True)
+        self.assertFalse(any(listener.feed(chunk) for chunk in chunks(self.stream())))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_silence_never_reaches_recognizer(self):
+        listener = WakeWordListener(None, recognize=self.recognize)
+        for chunk in chunks(silence(10.0)):
+            self.assertFalse(listener.feed(chunk))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(listener.stats()["utterances"], 0)
+
+    def test_without_templates_every_utterance_goes_online(self):
+        listener = WakeWordListener(WakeWordDetector(path=None), recognize=self.recognize)
+        wakes = sum(listener.feed(chunk) for chunk in chunks(self.stream()))
+        self.assertEqual(wakes, 3)
+        self.assertEqual(len(self.calls), 3)
+
+
+class TestEnrollCommand(unittest.TestCase):
+    def write_wav(self, path, samples):
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(samples.tobytes())
+
+    def test_enroll_and_check_wav_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            takes = []
+            for i, stretch in enumerate((0.9, 1.0, 1.1)):
+                takes.append(os.path.join(tmp, f"take{i}.wav"))
+                self.write_wav(takes[-1], np.concatenate([silence(0.3), phrase(WAKE, stretch, seed=i), silence(0.3)]))
+            other = os.path.join(tmp, "other.wav")
+            self.write_wav(other, phrase(OTHER, seed=4))
+            templates = os.path.join(tmp, "wake.npz")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(main(["enroll", *takes, "--templates", templates]), 0)
+                self.assertEqual(main(["check", takes[1], other, "--templates", templates]), 0)
+            lines = out.getvalue().splitlines()
+            self.assertIn("Enrolled 3 takes", lines[3])
+            self.assertTrue(lines[4].endswith("WAKE"))
+            self.assertTrue(lines[5].endswith("-"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,541 @@
+"""
+Local wake-word detection on an always-open microphone stream.
+
+The microphone stays open (see audio_capture.py) and every chunk goes through
+
+    AudioRingBuffer         the last few seconds of audio, by absolute sample position
+    VoiceActivityDetector   per-frame energy against an adaptive noise floor (NumPy, vectorized)
+    UtteranceSegmenter      speech frames -> finished utterances (start, end)
+    WakeWordDetector        MFCC + DTW against templates of the enrolled wake phrase,
+                            at the start of the utterance when it runs on into a command
+
+so silence costs one energy computation per chunk, and the remote speech
+recognizer only runs once the local detector has heard the wake phrase.
+Until the wake phrase is enrolled, utterances of plausible length go to the
+recognizer instead (still none during silence).
+
+Enroll the wake phrase (a few repetitions, in your own voice):
+
+    python wake_word.py enroll                   # from the microphone
+    python wake_word.py enroll take1.wav take2.wav take3.wav
+    python wake_word.py check                    # print the distance of each utterance heard
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000            # Hz, 16-bit mono
+RING_SECONDS = 10              # audio kept in the ring buffer
+
+# Voice activity detection
+FRAME_MS = 20                  # VAD frame
+VAD_MARGIN_DB = 12.0           # speech: frame energy this far above the noise floor...
+VAD_MIN_DB = -55.0             # ...and above this absolute level (dBFS)
+NOISE_ADAPT = 0.02             # per frame: how fast the noise floor rises with non-speech frames
+HANGOVER_MS = 300              # silence that ends an utterance
+PRE_ROLL_MS = 100              # audio kept before the first speech frame
+MIN_UTTERANCE_MS = 250         # shorter bursts (clicks, knocks) are ignored
+MAX_UTTERANCE_MS = 2500        # wake-phrase utterances are cut here
+
+# Features and matching
+WIN_MS = 25
+HOP_MS = 10
+N_MELS = 26
+N_MFCC = 13
+TRIM_DB = 30.0                 # matching ignores leading/trailing frames this far below the utterance's peak
+FEATURES = "mfcc13-cmn-v1"     # feature layout stored in (and checked against) template files
+TEMPLATE_FILE = "wake_word.npz"
+ENROLL_COUNT = 3
+MATCH_MARGIN = 1.3             # threshold = margin * largest distance between enrolled takes
+DURATION_RANGE = (0.6, 1.6)    # utterance length relative to the templates, checked before MFCC
+PREFIX_STEP_FRAMES = 3         # longer utterances: wake phrase end points tried, every this many feature frames
+
+
+# --- Ring buffer ---
+class AudioRingBuffer:
+    """Fixed-size ring of samples (or per-frame values); positions are absolute counts since the stream started."""
+
+    def __init__(self, seconds=RING_SECONDS, rate=SAMPLE_RATE, dtype=np.int16):
+        self.rate = rate
+        self.data = np.zeros(int(seconds * rate), dtype=dtype)
+        self.written = 0   # samples ever written = position of the next sample
+
+    def write(self, samples):
+        size = len(self.data)
+        n = len(samples)
+        if n >= size:
+            samples = samples[-size:]
+            self.written += n - size
+            n = size
+        start = self.written % size
+        first = min(n, size - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.written += n
+
+    def read(self, start, end=None):
+        """Samples [start, end) as a copy; clipped to what the ring still holds."""
+        end = self.written if end is None else min(end, self.written)
+        start = max(start, self.written - len(self.data), 0)
+        if start >= end:
+            return np.zeros(0, dtype=self.data.dtype)
+        return np.take(self.data, np.arange(start, end), mode="wrap")
+
+
+# --- Voice activity ---
+def frame_energy_db(samples, frame_len):
+    """Energy in dBFS of each complete frame of int16 `samples`."""
+    n = len(samples) // frame_len
+    frames = samples[:n * frame_len].reshape(n, frame_len).astype(np.float32)
+    power = np.einsum("ij,ij->i", frames, frames) / (frame_len * 32768.0 ** 2)
+    return 10 * np.log10(power + 1e-10)
+
+
+class VoiceActivityDetector:
+    """
+    Frame-level speech/non-speech decisions. The noise floor drops at once to
+    quieter non-speech frames and rises slowly (NOISE_ADAPT) with louder ones.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, frame_ms=FRAME_MS, margin_db=VAD_MARGIN_DB, min_db=VAD_MIN_DB,
+                 adapt=NOISE_ADAPT):
+        self.frame_len = rate * frame_ms // 1000
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.adapt = adapt
+        self.noise_floor_db = None
+        self.frames = 0      # frames decided so far; frame i covers samples [i, i + 1) * frame_len
+        self._pending = np.zeros(0, dtype=np.int16)   # partial frame carried to the next chunk
+
+    @property
+    def threshold_db(self):
+        return max(self.noise_floor_db + self.margin_db, self.min_db)
+
+    def feed(self, samples, adapt=True):
+        """
+        Speech flag per complete frame; frames continue across calls.
+        adapt=False leaves the noise floor alone (e.g. while the assistant talks).
+        """
+        samples = np.concatenate([self._pending, samples]) if len(self._pending) else samples
+        n = len(samples) // self.frame_len * self.frame_len
+        self._pending = samples[n:].copy()
+        energy = frame_energy_db(samples[:n], self.frame_len)
+        self.frames += len(energy)
+        if not len(energy):
+            return np.zeros(0, dtype=bool)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(energy.min())
+        speech = energy > self.threshold_db
+        quiet = energy[~speech]
+        if len(quiet) and adapt:
+            floor = self.noise_floor_db
+            if quiet.min() < floor:
+                floor = float(quiet.min())
+            # len(quiet) exponential steps towards their mean at once
+            rate = 1.0 - (1.0 - self.adapt) ** len(quiet)
+            self.noise_floor_db = floor + rate * max(0.0, float(quiet.mean()) - floor)
+        return speech
+
+
+class UtteranceSegmenter:
+    """Turns per-frame VAD flags into utterances: (start, end) sample positions in the stream."""
+
+    def __init__(self, frame_len, rate=SAMPLE_RATE, hangover_ms=HANGOVER_MS, pre_roll_ms=PRE_ROLL_MS,
+                 min_ms=MIN_UTTERANCE_MS, max_ms=MAX_UTTERANCE_MS):
+        self.frame_len = frame_len
+        frames = lambda ms: max(1, int(ms * rate / 1000) // frame_len)
+        self.hangover = frames(hangover_ms)
+        self.pre_roll = frames(pre_roll_ms)
+        self.min_frames = frames(min_ms)
+        self.max_frames = frames(max_ms)
+        self.frame = 0          # index of the next frame
+        self.start = None       # first speech frame of the current utterance
+        self.last_speech = None
+
+    @property
+    def active(self):
+        return self.start is not None
+
+    def feed(self, flags):
+        """Utterances finished within these frames."""
+        done = []
+        for speech in flags:
+            if speech:
+                if self.start is None:
+                    self.start = self.frame
+                self.last_speech = self.frame
+            if self.start is not None:
+                ended = self.frame - self.last_speech >= self.hangover
+                if ended or self.frame + 1 - self.start >= self.max_frames:
+                    if self.last_speech + 1 - self.start >= self.min_frames:
+                        done.append((max(0, self.start - self.pre_roll) * self.frame_len,
+                                     (self.last_speech + 1) * self.frame_len))
+                    self.start = self.last_speech = None
+            self.frame += 1
+        return done
+
+
+# --- Features ---
+@functools.lru_cache(maxsize=4)
+def _mel_filters(rate, n_fft, n_mels):
+    """(n_fft // 2 + 1, n_mels) triangular mel filterbank."""
+    mel = lambda hz: 2595 * np.log10(1 + hz / 700)
+    hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+    edges = hz(np.linspace(mel(0), mel(rate / 2), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1 / rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).T.astype(np.float32)
+
+
+@functools.lru_cache(maxsize=4)
+def _dct_matrix(n_mels, n_mfcc):
+    n = np.arange(n_mels)
+    return np.cos(np.pi / n_mels * (n[:, None] + 0.5) * np.arange(n_mfcc)[None]).astype(np.float32)
+
+
+def loud_bounds(samples, rate=SAMPLE_RATE, trim_db=TRIM_DB):
+    """(start, end) of `samples` without the leading and trailing frames more than `trim_db` below the loudest one."""
+    frame_len = rate * HOP_MS // 1000
+    energy = frame_energy_db(samples, frame_len)
+    if not len(energy):
+        return 0, len(samples)
+    loud = np.flatnonzero(energy >= energy.max() - trim_db)
+    return loud[0] * frame_len, (loud[-1] + 1) * frame_len
+
+
+def trim_silence(samples, rate=SAMPLE_RATE, trim_db=TRIM_DB):
+    """`samples` without the leading and trailing frames more than `trim_db` below the loudest one."""
+    start, end = loud_bounds(samples, rate, trim_db)
+    return samples[start:end]
+
+
+def mfcc(samples, rate=SAMPLE_RATE, n_mfcc=N_MFCC, normalize=True):
+    """
+    (frames, n_mfcc) mel-frequency cepstral coefficients of int16 audio,
+    mean-normalized per utterance unless `normalize` is False.
+    """
+    x = np.asarray(samples, dtype=np.float32) / 32768.0
+    x = np.append(x[:1], x[1:] - 0.97 * x[:-1])   # pre-emphasis
+    win = rate * WIN_MS // 1000
+    hop = rate * HOP_MS // 1000
+    if len(x) < win:
+        x = np.pad(x, (0, win - len(x)))
+    frames = np.lib.stride_tricks.sliding_window_view(x, win)[::hop] * np.hamming(win).astype(np.float32)
+    n_fft = 1 << (win - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2
+    log_mel = np.log(power.astype(np.float32) @ _mel_filters(rate, n_fft, N_MELS) + 1e-10)
+    coefficients = log_mel @ _dct_matrix(N_MELS, n_mfcc)
+    return coefficients - coefficients.mean(axis=0) if normalize else coefficients
+
+
+def dtw_distance(a, b):
+    """
+    Length-normalized dynamic time warping distance between feature
+    sequences a (n, d) and b (m, d). Each frame of `a` advances 0, 1 or 2
+    frames through `b`, so one row of the cost table is computed per frame
+    of `a` with array operations.
+    """
+    cost = np.sqrt(np.maximum(
+        (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None] - 2 * a @ b.T, 0))
+    acc = np.full(len(b), np.inf)
+    acc[0] = cost[0, 0]
+    for row in cost[1:]:
+        best = acc.copy()
+        best[1:] = np.minimum(best[1:], acc[:-1])
+        best[2:] = np.minimum(best[2:], acc[:-2])
+        acc = row + best
+    return float(acc[-1] / len(a))
+
+
+# --- Wake phrase matching ---
+class WakeWordDetector:
+    """Wake phrase templates; a template file is loaded on first use."""
+
+    def __init__(self, path=TEMPLATE_FILE, templates=None, threshold=None, rate=SAMPLE_RATE):
+        """
+        Args:
+            path: template file written by save() / the enroll command.
+            templates: list of (frames, N_MFCC) arrays (instead of a path).
+            threshold: DTW distance below which an utterance is the wake phrase.
+        """
+        self.path = path
+        self._templates = templates
+        self.threshold = threshold
+        self.rate = rate
+        self._lengths = None
+
+    @property
+    def enrolled(self):
+        return self._templates is not None or bool(self.path and os.path.exists(self.path))
+
+    def _loaded(self):
+        if self._templates is None:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["features"]) != FEATURES:
+                    raise ValueError(f"{self.path}: templates use features {data['features']}, expected {FEATURES}")
+                self._templates = np.split(data["frames"], np.cumsum(data["lengths"])[:-1])
+                self.threshold = self.threshold or float(data["threshold"])
+                self.rate = int(data["rate"])
+        if self._lengths is None:
+            self._lengths = np.array([len(t) for t in self._templates])
+        return self._templates
+
+    def locate(self, samples):
+        """
+        (distance, end) of the wake phrase at the start of one utterance of
+        int16 audio. distance is the smallest DTW distance to a template (inf
+        when the utterance is too short for the phrase); end is the sample
+        offset where the phrase stops. An utterance of plausible length is
+        matched whole and ends with it. A longer one is the phrase with a
+        command said in the same breath: its prefixes are matched, each
+        mean-normalized on its own, and end is that of the best one.
+        """
+        templates = self._loaded()
+        start, stop = loud_bounds(samples, self.rate)
+        hop = self.rate * HOP_MS // 1000
+        frames = (stop - start) // hop
+        low, high = DURATION_RANGE
+        shortest, longest = int(np.ceil(low * self._lengths.min())), int(high * self._lengths.max())
+        if frames < shortest:
+            return float("inf"), len(samples)
+        if frames <= longest:
+            features = mfcc(samples[start:stop], self.rate)
+            return min(dtw_distance(features, template) for template in templates), len(samples)
+        win = self.rate * WIN_MS // 1000
+        coefficients = mfcc(samples[start:start + (longest - 1) * hop + win], self.rate, normalize=False)
+        best = float("inf"), len(samples)
+        for n in range(shortest, len(coefficients) + 1, PREFIX_STEP_FRAMES):
+            prefix = coefficients[:n] - coefficients[:n].mean(axis=0)
+            distance = min(dtw_distance(prefix, template) for template in templates)
+            if distance < best[0]:
+                best = distance, start + (n - 1) * hop + win
+        return best
+
+    def distance(self, samples):
+        """Smallest DTW distance to a template of the start of one utterance (see locate)."""
+        return self.locate(samples)[0]
+
+    def match(self, samples):
+        """(is the wake phrase, distance) for one utterance of int16 audio."""
+        distance = self.distance(samples)
+        return distance <= self.threshold, distance
+
+    def save(self, path):
+        templates = self._loaded()
+        np.savez_compressed(path, features=FEATURES, frames=np.concatenate(templates).astype(np.float32),
+                            lengths=np.array([len(t) for t in templates]), threshold=self.threshold,
+                            rate=self.rate)
+
+
+def enroll(utterances, rate=SAMPLE_RATE, margin=MATCH_MARGIN):
+    """
+    WakeWordDetector from a few recordings of the wake phrase. The threshold
+    is `margin` times the largest DTW distance between two of them.
+    """
+    if len(utterances) < 2:
+        raise ValueError("enrolling needs at least two recordings of the wake phrase")
+    templates = [mfcc(trim_silence(u, rate), rate) for u in utterances]
+    spread = max(dtw_distance(a, b) for i, a in enumerate(templates) for j, b in enumerate(templates) if i != j)
+    return WakeWordDetector(path=None, templates=templates, threshold=margin * spread, rate=rate)
+
+
+# --- Stream listener ---
+class WakeWordListener:
+    """
+    Consumes microphone audio and reports the wake phrase. `recognize` is the
+    full (remote) recognizer, samples -> text; it only runs on an utterance
+    the local detector accepted, or, while nothing is enrolled, on utterances
+    of plausible length.
+
+    Audio comes either as raw chunks (feed), with the listener's own ring
+    buffer and VAD, or as AudioBlocks from an AudioCaptureService
+    (feed_block, see audio_capture.py), reading utterances from its ring.
+    """
+
+    def __init__(self, detector=None, recognize=None, wake_word="hey assistant", rate=SAMPLE_RATE,
+                 confirm=False, ring=None):
+        """
+        Args:
+            detector: WakeWordDetector; without enrolled templates every
+                utterance goes to `recognize`.
+            confirm: also run `recognize` on local hits and require the wake
+                word in its text (fewer false wakes, one recognizer call each).
+            ring: the capture service's AudioRingBuffer when fed blocks.
+        """
+        self.detector = detector
+        self.recognize = recognize
+        self.wake_word = wake_word
+        self.rate = rate
+        self.confirm = confirm
+        self.ring = ring if ring is not None else AudioRingBuffer(rate=rate)
+        self.vad = VoiceActivityDetector(rate)
+        self.segmenter = UtteranceSegmenter(self.vad.frame_len, rate)
+        self.wake_end = None       # stream position where the last wake phrase ended
+        self.match_end = None      # offset of that end in the utterance last checked
+        self.samples_seen = 0
+        self.utterances = 0
+        self.local_checks = 0
+        self.local_hits = 0
+        self.recognizer_calls = 0
+        self.check_time = 0.0
+        self.feed_time = 0.0
+
+    def feed(self, chunk):
+        """Process one chunk of int16 samples; returns whether it completed the wake phrase."""
+        start = time.perf_counter()
+        position = self.vad.frames * self.vad.frame_len
+        self.ring.write(chunk)
+        flags = self.vad.feed(chunk)
+        self.feed_time += time.perf_counter() - start
+        return self.feed_frames(position, flags)
+
+    def feed_block(self, block):
+        """Process one AudioBlock (position, samples, flags); returns whether it completed the wake phrase."""
+        return self.feed_frames(block.position, block.flags)
+
+    def feed_frames(self, position, flags):
+        """VAD flags of the frames starting at stream `position`, whose samples are in self.ring."""
+        start = time.perf_counter()
+        self.segmenter.frame = position // self.segmenter.frame_len
+        self.samples_seen += len(flags) * self.segmenter.frame_len
+        woke = False
+        for begin, end in self.segmenter.feed(flags):
+            self.utterances += 1
+            if self.check(self.ring.read(begin, end)):
+                woke = True
+                self.wake_end = begin + self.match_end
+        self.feed_time += time.perf_counter() - start
+        return woke
+
+    def reset(self):
+        """Forget a partly heard utterance, e.g. after skipping audio."""
+        self.segmenter.start = self.segmenter.last_speech = None
+
+    def check(self, samples):
+        """
+        Whether one utterance is or starts with the wake phrase; match_end is
+        then where in `samples` it ended, and any command said straight on
+        follows from there.
+        """
+        start = time.perf_counter()
+        self.match_end = len(samples)
+        try:
+            if self.detector is not None and self.detector.enrolled:
+                self.local_checks += 1
+                distance, self.match_end = self.detector.locate(samples)
+                if not distance <= self.detector.threshold:
+                    return False
+                self.local_hits += 1
+                if not self.confirm:
+                    return True
+            elif len(samples) > MAX_UTTERANCE_MS * self.rate // 1000:
+                return False
+            return self._recognized(samples)
+        finally:
+            self.check_time += time.perf_counter() - start
+
+    def _recognized(self, samples):
+        if self.recognize is None:
+            return False
+        self.recognizer_calls += 1
+        return self.wake_word in (self.recognize(samples) or "").lower()
+
+    def stats(self):
+        audio_s = self.samples_seen / self.rate
+        return {
+            "audio_s": round(audio_s, 1),
+            "cpu_percent": round(100 * self.feed_time / audio_s, 2) if audio_s else 0.0,
+            "utterances": self.utterances,
+            "local_checks": self.local_checks,
+            "local_hits": self.local_hits,
+            "check_avg_ms": round(1000 * self.check_time / self.utterances, 2) if self.utterances else 0.0,
+            "recognizer_calls": self.recognizer_calls,
+            "recognizer_calls_per_hour": round(3600 * self.recognizer_calls / audio_s, 1) if audio_s else 0.0,
+            "noise_floor_db": round(self.vad.noise_floor_db, 1) if self.vad.noise_floor_db is not None else None,
+        }
+
+
+# --- Command line ---
+def read_wav(path):
+    """int16 mono samples and sample rate of a 16-bit WAV file (first channel)."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit samples")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        return samples[::f.getnchannels()].copy(), f.getframerate()
+
+
+def microphone_utterances(count=None):
+    """Yield utterances from the default microphone, segmented as the wake thread does."""
+    import speech_recognition as sr
+
+    vad = VoiceActivityDetector()
+    segmenter = UtteranceSegmenter(vad.frame_len)
+    ring = AudioRingBuffer()
+    heard = 0
+    with sr.Microphone(sample_rate=SAMPLE_RATE) as source:
+        while count is None or heard < count:
+            chunk = np.frombuffer(source.stream.read(source.CHUNK), dtype=np.int16)
+            ring.write(chunk)
+            for begin, end in segmenter.feed(vad.feed(chunk)):
+                heard += 1
+                yield ring.read(begin, end)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Enroll or check the local wake-word detector.")
+    parser.add_argument("command", choices=["enroll", "check"])
+    parser.add_argument("wavs", nargs="*", help="16-bit mono WAV files (default: the microphone)")
+    parser.add_argument("--templates", default=TEMPLATE_FILE, help="template file")
+    parser.add_argument("--count", type=int, default=ENROLL_COUNT, help="recordings to enroll from the microphone")
+    args = parser.parse_args(argv)
+
+    if args.wavs:
+        recordings = [read_wav(path) for path in args.wavs]
+        if len({rate for _, rate in recordings}) > 1:
+            print("All recordings must have the same sample rate")
+            return 1
+        rate = recordings[0][1]
+        utterances = (samples for samples, _ in recordings)
+    else:
+        rate = SAMPLE_RATE
+        utterances = microphone_utterances(args.count if args.command == "enroll" else None)
+
+    if args.command == "enroll":
+        if not args.wavs:
+            print(f"Say the wake phrase {args.count} times, pausing in between.")
+        takes = []
+        for samples in utterances:
+            takes.append(samples)
+            print(f"  take {len(takes)}: {len(samples) / rate:.2f} s")
+        try:
+            detector = enroll(takes, rate)
+        except ValueError as e:
+            print(e)
+            return 1
+        detector.save(args.templates)
+        print(f"Enrolled {len(takes)} takes -> {args.templates} (threshold {detector.threshold:.2f})")
+        return 0
+
+    detector = WakeWordDetector(args.templates)
+    if not detector.enrolled:
+        print(f"No templates at {args.templates}; run the enroll command first")
+        return 1
+    try:
+        for samples in utterances:
+            hit, distance = detector.match(samples)
+            print(f"{len(samples) / rate:5.2f} s  distance {distance:7.2f}  {'WAKE' if hit else '-'}")
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))